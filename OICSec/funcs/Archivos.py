@@ -0,0 +1,232 @@
+import hashlib
+import os
+import tempfile
+import zipfile
+from io import BytesIO
+
+from OICSec.models import Archivo
+
+MEDIA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.dirname(__file__)), '../media'))
+
+# Partes de un documento Office que cambian en cada guardado aunque el contenido sea el mismo
+VOLATILE_PARTS = {'docProps/core.xml'}
+
+
+class ArchivoSubido:
+    """
+    Clase que guarda un archivo subido (PAA, PACI, PINT o IMC) en la carpeta de media una sola vez por carga y
+    obtiene un único registro Archivo para relacionarlo con todas las actividades que provienen de él.
+
+    El archivo se escribe y el registro se busca o crea hasta que se necesitan, de modo que una carga que no
+    relaciona ninguna actividad no escribe en disco ni consulta la base de datos.
+
+    Atributos:
+        upload (UploadedFile): Archivo subido.
+        nombre (str): Nombre del archivo.
+        path (str): Ruta en la que se guarda el archivo.
+    """
+
+    def __init__(self, upload, media_dir):
+        self.upload = upload
+        self.nombre = upload.name
+        self.path = os.path.join(MEDIA_DIR, media_dir, self.nombre)
+        self._guardado = False
+        self._archivo = None
+
+    def save(self):
+        """
+        Escribe el archivo en disco si todavía no se ha escrito en esta carga.
+
+        Returns:
+            str: Ruta en la que se guardó el archivo.
+        """
+        if not self._guardado:
+            # Se crea el directorio si no existe
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'wb+') as destination:
+                for chunk in self.upload.chunks():
+                    destination.write(chunk)
+            self._guardado = True
+        return self.path
+
+    def get_archivo(self):
+        """
+        Obtiene el registro Archivo del archivo subido, reutilizando uno existente con el mismo nombre o creándolo.
+
+        Returns:
+            Archivo: Registro del archivo.
+        """
+        if self._archivo is None:
+            self.save()
+            self._archivo = Archivo.objects.filter(nombre=self.nombre).first()
+            if not self._archivo:
+                self._archivo = Archivo.objects.create(archivo=self.path, nombre=self.nombre)
+        return self._archivo
+
+    def link(self, archivos_model, field_name, actividades, tipo=0, mismo_tipo=False):
+        """
+        Guarda el archivo y lo relaciona con las actividades que todavía no tienen un archivo relacionado.
+
+        Args:
+            archivos_model (Model): Modelo de la relación (AuditoriaArchivos, ControlArchivos o IntervencionArchivos).
+            field_name (str): Nombre de la llave foránea hacia la actividad en 'archivos_model'.
+            actividades (list): Actividades a relacionar.
+            tipo (int): Tipo de archivo de la relación (PAA, Incorporación, Cancelación, etc.).
+            mismo_tipo (bool): Si es True, solo se omiten las actividades que ya tienen un archivo del mismo tipo;
+                               si es False, las que tienen un archivo de cualquier tipo.
+
+        Returns:
+            int: Número de relaciones creadas.
+        """
+        self.save()
+        if not actividades:
+            return 0
+
+        existentes = archivos_model.objects.filter(**{f'{field_name}__in': actividades})
+        if mismo_tipo:
+            existentes = existentes.filter(tipo=tipo)
+        con_archivo = set(existentes.values_list(field_name, flat=True))
+        sin_archivo = [actividad for actividad in actividades if actividad.pk not in con_archivo]
+        if not sin_archivo:
+            return 0
+
+        archivo_obj = self.get_archivo()
+        archivos_model.objects.bulk_create([
+            archivos_model(tipo=tipo, id_archivo=archivo_obj, **{field_name: actividad})
+            for actividad in sin_archivo
+        ])
+        return len(sin_archivo)
+
+
+def document_digest(content):
+    """
+    Calcula la huella del contenido de un documento generado (.xlsx o .docx).
+
+    Los documentos Office son archivos zip cuya fecha de modificación y la de cada parte cambian en cada guardado,
+    por lo que la huella se calcula sobre el nombre y el contenido de cada parte, sin las partes de VOLATILE_PARTS.
+    Cualquier otro archivo se compara byte por byte.
+
+    Args:
+        content (bytes): Contenido del documento.
+
+    Returns:
+        str: Huella SHA-256 en hexadecimal.
+    """
+    digest = hashlib.sha256()
+    try:
+        with zipfile.ZipFile(BytesIO(content)) as document:
+            for name in sorted(document.namelist()):
+                if name in VOLATILE_PARTS:
+                    continue
+                digest.update(name.encode('utf-8'))
+                digest.update(hashlib.sha256(document.read(name)).digest())
+    except zipfile.BadZipFile:
+        return hashlib.sha256(content).hexdigest()
+    return digest.hexdigest()
+
+
+def save_generated(content, media_dir, nombre):
+    """
+    Guarda un documento generado (cédula o minuta) en la carpeta de media solo si su contenido cambió.
+
+    El documento se escribe en un archivo temporal de la misma carpeta y después se renombra, de modo que una
+    descarga simultánea del mismo documento nunca encuentra un archivo a medio escribir.
+
+    Args:
+        content (bytes): Contenido del documento.
+        media_dir (str): Carpeta dentro de media donde se guarda.
+        nombre (str): Nombre del archivo.
+
+    Returns:
+        tuple: Ruta del archivo y True si se escribió, o False si ya tenía el mismo contenido.
+    """
+    path = os.path.join(MEDIA_DIR, media_dir, nombre)
+    try:
+        with open(path, 'rb') as existing:
+            existing_content = existing.read()
+        # Un documento tomado de la caché de documentos es idéntico byte por byte al que se guardó
+        if existing_content == content or document_digest(existing_content) == document_digest(content):
+            return path, False
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as destination:
+            destination.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return path, True
+
+
+class ZipStream:
+    """
+    Destino de escritura sin posicionamiento para zipfile, que acumula lo escrito hasta que se consume; permite
+    enviar un archivo zip mientras se construye, sin escribirlo en disco.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def consume(self):
+        """
+        Obtiene lo escrito desde la última llamada.
+
+        Returns:
+            bytes: Datos escritos.
+        """
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def unique_name(nombre, usados):
+    """
+    Obtiene un nombre que no se repita dentro del zip, agregando un número si ya existe.
+
+    Args:
+        nombre (str): Nombre del archivo.
+        usados (set): Nombres ya usados; se agrega el nombre obtenido.
+
+    Returns:
+        str: Nombre único.
+    """
+    base, extension = nombre.rsplit('.', 1) if '.' in nombre else (nombre, '')
+    candidato = nombre
+    numero = 2
+    while candidato in usados:
+        candidato = f'{base} ({numero}).{extension}' if extension else f'{base} ({numero})'
+        numero += 1
+    usados.add(candidato)
+    return candidato
+
+
+def stream_zip(archivos):
+    """
+    Construye un archivo zip a partir de varios archivos y lo entrega por partes conforme se agrega cada uno.
+
+    Args:
+        archivos (iterable): Nombre y contenido de cada archivo.
+
+    Yields:
+        bytes: Partes consecutivas del archivo zip.
+    """
+    stream = ZipStream()
+    usados = set()
+    # Los archivos .xlsx y .docx ya están comprimidos, por lo que se guardan sin volver a comprimirlos
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED) as archivo_zip:
+        for nombre, content in archivos:
+            archivo_zip.writestr(unique_name(nombre, usados), content)
+            yield stream.consume()
+    yield stream.consume()
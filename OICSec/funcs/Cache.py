@@ -0,0 +1,307 @@
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import threading
+
+from django.conf import settings
+
+from OICSec.funcs.Catalogo import fingerprint_catalogos
+
+logger = logging.getLogger(__name__)
+
+# Número de escrituras tras las que se vuelve a recorrer la carpeta de la caché aunque el tamaño estimado no supere
+# el máximo, para contar lo que escribieron otros procesos
+ESCRITURAS_REVISION = 100
+
+# Tamaño estimado de cada carpeta de caché en este proceso, o None si no se ha recorrido, y escrituras desde el
+# último recorrido
+_tamanos = {}
+_tamanos_lock = threading.Lock()
+
+
+class ParseCache:
+    """
+    Caché en disco de los resultados de las funciones de extracción (extract_paa, extract_paci, extract_pint y
+    read_format_a3), para que un archivo idéntico a uno ya subido no se vuelva a procesar.
+
+    La llave de cada resultado combina el SHA-256 del contenido del archivo, la función y su EXTRACTOR_VERSION, y la
+    huella de los catálogos de los que depende el resultado (EXTRACTOR_CATALOGOS), de modo que un cambio en la
+    extracción o en los catálogos descarta los resultados anteriores. Cuando el tamaño total supera 'max_bytes' se
+    eliminan los resultados usados hace más tiempo; el tamaño se lleva como un total acumulado por carpeta y la
+    carpeta solo se recorre cuando lo supera o cada ESCRITURAS_REVISION escrituras.
+
+    Atributos:
+        directory (str): Carpeta donde se guardan los resultados.
+        max_bytes (int): Tamaño máximo de la carpeta en bytes.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, func, content):
+        """
+        Calcula la llave del resultado de una función de extracción sobre el contenido de un archivo.
+
+        Args:
+            func (callable): Función de extracción.
+            content (bytes): Contenido del archivo.
+
+        Returns:
+            str: Llave SHA-256 en hexadecimal.
+        """
+        module = sys.modules[func.__module__]
+        version = getattr(module, 'EXTRACTOR_VERSION', 0)
+        catalogos = getattr(module, 'EXTRACTOR_CATALOGOS', [])
+        digest = hashlib.sha256(content).hexdigest()
+        partes = [f'{func.__module__}.{func.__qualname__}', str(version), digest]
+        if catalogos:
+            partes.append(fingerprint_catalogos(catalogos))
+        return hashlib.sha256(':'.join(partes).encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        """
+        Obtiene la ruta del archivo de un resultado; se reparten en subcarpetas por los dos primeros caracteres.
+
+        Args:
+            key (str): Llave del resultado.
+
+        Returns:
+            str: Ruta del archivo.
+        """
+        return os.path.join(self.directory, key[:2], f'{key}.pickle')
+
+    def get(self, key):
+        """
+        Obtiene un resultado guardado.
+
+        Args:
+            key (str): Llave del resultado.
+
+        Returns:
+            tuple: (True, resultado) si la llave está en la caché, o (False, None) si no.
+        """
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as cache_file:
+                data = pickle.load(cache_file)
+        except FileNotFoundError:
+            return False, None
+        except Exception as e:
+            logger.warning(f'No se pudo leer el resultado {key} de la caché: {e}')
+            return False, None
+
+        # Se actualiza la fecha de modificación para que la eliminación descarte primero los menos usados
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True, data
+
+    def set(self, key, data):
+        """
+        Guarda un resultado y, si la caché supera su tamaño máximo, elimina los resultados usados hace más tiempo.
+
+        Args:
+            key (str): Llave del resultado.
+            data: Resultado de la función de extracción.
+        """
+        path = self.path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Se escribe en un archivo temporal y se renombra para que una lectura simultánea no vea un archivo a medias
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as cache_file:
+                pickle.dump(data, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+                size = cache_file.tell()
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f'No se pudo guardar el resultado {key} en la caché: {e}')
+            return
+        self.track(size)
+
+    def track(self, size):
+        """
+        Suma un resultado guardado al tamaño estimado de la carpeta y elimina resultados si lo supera. La carpeta se
+        recorre la primera vez, cuando el tamaño estimado supera 'max_bytes' y cada ESCRITURAS_REVISION escrituras.
+
+        Args:
+            size (int): Tamaño en bytes del resultado guardado.
+        """
+        with _tamanos_lock:
+            total, escrituras = _tamanos.get(self.directory, (None, 0))
+            escrituras += 1
+            if total is not None:
+                total += size
+            revisar = total is None or total > self.max_bytes or escrituras >= ESCRITURAS_REVISION
+            _tamanos[self.directory] = (total, 0 if revisar else escrituras)
+        if not revisar:
+            return
+        total = self.evict()
+        with _tamanos_lock:
+            _tamanos[self.directory] = (total, 0)
+
+    def evict(self):
+        """
+        Elimina los resultados usados hace más tiempo hasta que el tamaño total no supere 'max_bytes'.
+
+        Returns:
+            int: Tamaño total de la carpeta después de eliminar.
+        """
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.pickle'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total <= self.max_bytes:
+            return total
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+        return total
+
+
+def get_parse_cache():
+    """
+    Obtiene la caché de resultados configurada con PARSE_CACHE_DIR y PARSE_CACHE_MAX_BYTES en settings.
+
+    Returns:
+        ParseCache or None: Caché de resultados, o None si PARSE_CACHE_DIR no está configurado.
+    """
+    directory = getattr(settings, 'PARSE_CACHE_DIR', None)
+    if not directory:
+        return None
+    return ParseCache(directory, getattr(settings, 'PARSE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+
+class DocumentCache(ParseCache):
+    """
+    Caché en disco de los documentos generados (cédulas y minutas), para que un documento con los mismos datos que
+    uno ya generado no se vuelva a generar.
+
+    La llave de cada documento es el SHA-256 de todo lo que determina su contenido: el tipo de documento y su
+    RENDER_VERSION, la versión de la plantilla y los datos con los que se llena. El valor guardado es el contenido
+    del documento.
+    """
+
+    def document_key(self, *partes):
+        """
+        Calcula la llave de un documento a partir de los datos con los que se genera.
+
+        Args:
+            *partes: Datos del documento; las dataclasses se convierten a diccionarios.
+
+        Returns:
+            str: Llave SHA-256 en hexadecimal.
+        """
+        datos = [dataclasses.asdict(parte) if dataclasses.is_dataclass(parte) else parte for parte in partes]
+        texto = json.dumps(datos, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def render(self, partes, render_func):
+        """
+        Obtiene un documento de la caché o, si no está, lo genera y lo guarda.
+
+        Args:
+            partes (list): Datos del documento, para calcular su llave.
+            render_func (callable): Función sin argumentos que genera el documento y regresa un BytesIO, o None si
+                                    no se pudo generar.
+
+        Returns:
+            bytes or None: Contenido del documento.
+        """
+        key = self.document_key(*partes)
+        hit, content = self.get(key)
+        if hit:
+            return content
+        buffer = render_func()
+        if buffer is None:
+            return None
+        content = buffer.getvalue()
+        self.set(key, content)
+        return content
+
+
+def document_cache_config():
+    """
+    Obtiene la configuración de la caché de documentos de settings, para enviarla a los procesos del pool junto con
+    cada documento que generan.
+
+    Returns:
+        tuple: Carpeta de la caché (DOCUMENT_CACHE_DIR), o None si está desactivada, y su tamaño máximo en bytes
+               (DOCUMENT_CACHE_MAX_BYTES).
+    """
+    return (getattr(settings, 'DOCUMENT_CACHE_DIR', None),
+            getattr(settings, 'DOCUMENT_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+
+def get_document_cache(cache_config=None):
+    """
+    Obtiene la caché de documentos configurada con DOCUMENT_CACHE_DIR y DOCUMENT_CACHE_MAX_BYTES en settings.
+
+    Args:
+        cache_config (tuple, optional): Configuración obtenida con document_cache_config en el proceso principal; si
+                                        no se indica se lee de settings.
+
+    Returns:
+        DocumentCache or None: Caché de documentos, o None si DOCUMENT_CACHE_DIR no está configurado.
+    """
+    directory, max_bytes = cache_config if cache_config is not None else document_cache_config()
+    if not directory:
+        return None
+    return DocumentCache(directory, max_bytes)
+
+
+def render_cached(partes, render_func, cache_config=None):
+    """
+    Genera un documento usando la caché de documentos si está configurada.
+
+    Args:
+        partes (list): Datos del documento, para calcular su llave.
+        render_func (callable): Función sin argumentos que genera el documento y regresa un BytesIO, o None.
+        cache_config (tuple, optional): Configuración de la caché, ver get_document_cache.
+
+    Returns:
+        bytes or None: Contenido del documento.
+    """
+    cache = get_document_cache(cache_config)
+    if cache is None:
+        buffer = render_func()
+        return buffer.getvalue() if buffer is not None else None
+    return cache.render(partes, render_func)
+
+
+def file_version(path):
+    """
+    Obtiene la fecha de modificación y el tamaño de un archivo, para saber si cambió desde que se leyó.
+
+    Args:
+        path (str): Ruta del archivo.
+
+    Returns:
+        tuple: Fecha de modificación en nanosegundos y tamaño en bytes.
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe.
+    """
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
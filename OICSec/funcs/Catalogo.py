@@ -0,0 +1,338 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from django.db import transaction
+from rapidfuzz import process, fuzz, utils
+
+from OICSec.models import Oic
+
+
+def normalize_text(text):
+    """
+    Normaliza una cadena para su comparación difusa: minúsculas, sin acentos ni signos de puntuación.
+
+    Args:
+        text (str): Cadena de texto a normalizar.
+
+    Returns:
+        str: Cadena normalizada.
+    """
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return utils.default_process(text)
+
+
+def clean_oic_text(organo):
+    """
+    Elimina de un nombre de OIC las frases comunes que no ayudan a distinguirlo.
+
+    Args:
+        organo (str): Nombre del órgano tal como aparece en el documento.
+
+    Returns:
+        str: Nombre en minúsculas sin las frases comunes.
+    """
+    phrases_to_remove = [
+        'órgano interno de control en',
+        'de la ciudad de méxico'
+    ]
+
+    text = organo.lower()
+
+    for phrase in phrases_to_remove:
+        text = re.sub(re.escape(phrase), '', text)
+
+    return text.strip()
+
+
+def normalize_oic_text(organo):
+    """
+    Normaliza un nombre de OIC para su comparación difusa.
+
+    Args:
+        organo (str): Nombre del órgano.
+
+    Returns:
+        str: Nombre sin frases comunes, acentos ni signos de puntuación.
+    """
+    return ' '.join(normalize_text(clean_oic_text(str(organo))).split())
+
+
+class CatalogoIndex:
+    """
+    Índice en memoria de un catálogo de referencia (Materia, Programacion, Enfoque, Temporalidad, etc.).
+
+    Guarda las opciones ya normalizadas junto con su llave primaria, de manera que cada búsqueda se
+    resuelve con rapidfuzz sin consultar la base de datos.
+
+    Atributos:
+        ids (list[int]): Llaves primarias de los registros del catálogo.
+        tipos (list[str]): Texto original del campo 'tipo' de cada registro.
+        choices (list[str]): Texto normalizado de cada registro, en el mismo orden que 'ids'.
+    """
+
+    def __init__(self, entries):
+        self.ids = []
+        self.tipos = []
+        self.choices = []
+        for pk, tipo in entries:
+            if tipo is None:
+                continue
+            self.ids.append(pk)
+            self.tipos.append(tipo)
+            self.choices.append(normalize_text(tipo))
+
+    def fingerprint(self):
+        """
+        Calcula una huella del contenido del catálogo, que cambia si se agrega, elimina o modifica un registro.
+
+        Returns:
+            str: Huella SHA-256 en hexadecimal.
+        """
+        return hashlib.sha256(repr(list(zip(self.ids, self.tipos))).encode('utf-8')).hexdigest()
+
+    def match(self, text):
+        """
+        Busca el registro del catálogo más parecido al texto proporcionado.
+
+        Args:
+            text (str): Texto a buscar.
+
+        Returns:
+            int or None: Llave primaria del registro más parecido o None si el catálogo está vacío.
+        """
+        if not text or not self.choices:
+            return None
+        match = process.extractOne(normalize_text(text), self.choices, scorer=fuzz.WRatio, processor=None)
+        return self.ids[match[2]] if match else None
+
+
+class OicIndex:
+    """
+    Índice en memoria de los nombres de los OIC para resolver el nombre escrito en un documento al Oic registrado.
+
+    Los nombres se normalizan una sola vez al construir el índice; las búsquedas se califican con rapidfuzz y los
+    resultados se memorizan por texto original en una caché LRU.
+
+    Atributos:
+        oics (list[Oic]): OIC registrados.
+        choices (list[str]): Nombre normalizado de cada OIC, en el mismo orden que 'oics'.
+        cache_size (int): Número máximo de textos memorizados.
+    """
+
+    def __init__(self, oics, cache_size=1024):
+        self.oics = []
+        self.choices = []
+        for oic in oics:
+            if oic.nombre is None:
+                continue
+            self.oics.append(oic)
+            self.choices.append(normalize_oic_text(oic.nombre))
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # El candado no se puede serializar; la caché se descarta para enviar el índice a otros procesos
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_cache'] = OrderedDict()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def fingerprint(self):
+        """
+        Calcula una huella de los OIC registrados, que cambia si se agrega, elimina o renombra un OIC.
+
+        Returns:
+            str: Huella SHA-256 en hexadecimal.
+        """
+        return hashlib.sha256(repr([(oic.pk, oic.nombre) for oic in self.oics]).encode('utf-8')).hexdigest()
+
+    def resolve_many(self, texts):
+        """
+        Resuelve varios nombres de OIC a la vez, calificando los que no están en caché en una sola operación.
+
+        Args:
+            texts (list[str]): Nombres de OIC tal como aparecen en los documentos.
+
+        Returns:
+            list[tuple]: Para cada texto, una tupla con el Oic más parecido (o None si no hay OIC registrados) y
+                         la similitud entre 0 y 1.
+        """
+        results = {}
+        pending = []
+        with self._lock:
+            for text in texts:
+                if text in results:
+                    continue
+                if text in self._cache:
+                    self._cache.move_to_end(text)
+                    results[text] = self._cache[text]
+                else:
+                    results[text] = None
+                    pending.append(text)
+
+        if pending:
+            if self.choices:
+                queries = [normalize_oic_text(text) if text is not None else '' for text in pending]
+                scores = process.cdist(queries, self.choices, scorer=fuzz.ratio, processor=None)
+                best = scores.argmax(axis=1)
+                for row, text in enumerate(pending):
+                    results[text] = (self.oics[best[row]], float(scores[row, best[row]]) / 100)
+            else:
+                for text in pending:
+                    results[text] = (None, 0.0)
+
+            with self._lock:
+                for text in pending:
+                    self._cache[text] = results[text]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return [results[text] for text in texts]
+
+    def resolve(self, text):
+        """
+        Resuelve un nombre de OIC.
+
+        Args:
+            text (str): Nombre del OIC tal como aparece en el documento.
+
+        Returns:
+            tuple: Oic más parecido (o None si no hay OIC registrados) y la similitud entre 0 y 1.
+        """
+        return self.resolve_many([text])[0]
+
+
+_catalogos = {}
+_catalogos_lock = threading.Lock()
+
+
+def build_index(model):
+    """
+    Construye el índice en memoria de un modelo a partir de la base de datos.
+
+    Args:
+        model (Model): Modelo del catálogo.
+
+    Returns:
+        CatalogoIndex or OicIndex: Índice del modelo.
+    """
+    if model is Oic:
+        return OicIndex(model.objects.order_by('pk'))
+    return CatalogoIndex(model.objects.order_by('pk').values_list('pk', 'tipo'))
+
+
+def get_catalogo(model):
+    """
+    Obtiene el índice en memoria del catálogo de un modelo, cargándolo de la base de datos la primera vez.
+
+    Args:
+        model (Model): Clase del modelo de Django con un campo 'tipo', o el modelo Oic.
+
+    Returns:
+        CatalogoIndex or OicIndex: Índice del catálogo, compartido por todo el proceso.
+    """
+    index = _catalogos.get(model)
+    if index is None:
+        with _catalogos_lock:
+            index = _catalogos.get(model)
+            if index is None:
+                index = build_index(model)
+                _catalogos[model] = index
+    return index
+
+
+def get_oic_index():
+    """
+    Obtiene el índice en memoria de los OIC, cargándolo de la base de datos la primera vez.
+
+    Returns:
+        OicIndex: Índice de los OIC, compartido por todo el proceso.
+    """
+    return get_catalogo(Oic)
+
+
+def resolve_oic(text):
+    """
+    Resuelve el nombre de un OIC escrito en un documento al Oic registrado más parecido.
+
+    Args:
+        text (str): Nombre del OIC tal como aparece en el documento.
+
+    Returns:
+        tuple: Oic más parecido (o None si no hay OIC registrados) y la similitud entre 0 y 1.
+    """
+    return get_oic_index().resolve(text)
+
+
+def snapshot_catalogos(models):
+    """
+    Obtiene los índices en memoria de varios modelos para enviarlos a otro proceso.
+
+    Args:
+        models (list[Model]): Modelos cuyos índices se incluyen.
+
+    Returns:
+        dict: Índice de cada modelo.
+    """
+    return {model: get_catalogo(model) for model in models}
+
+
+def fingerprint_catalogos(models):
+    """
+    Calcula una huella combinada del contenido de varios catálogos.
+
+    Args:
+        models (list[Model]): Modelos de los catálogos.
+
+    Returns:
+        str: Huella SHA-256 en hexadecimal.
+    """
+    huellas = [f'{model._meta.label}:{get_catalogo(model).fingerprint()}' for model in models]
+    return hashlib.sha256('|'.join(huellas).encode('utf-8')).hexdigest()
+
+
+def install_catalogos(snapshot):
+    """
+    Reemplaza los índices en memoria del proceso por los recibidos, de modo que las búsquedas no consulten la base
+    de datos.
+
+    Args:
+        snapshot (dict): Índice de cada modelo, obtenido con snapshot_catalogos.
+    """
+    with _catalogos_lock:
+        _catalogos.update(snapshot)
+
+
+def invalidate_catalogo(model=None):
+    """
+    Descarta el índice de un catálogo para que se vuelva a cargar en la siguiente búsqueda.
+
+    Args:
+        model (Model, optional): Modelo cuyo índice se descarta. Si es None se descartan todos.
+    """
+    with _catalogos_lock:
+        if model is None:
+            _catalogos.clear()
+        else:
+            _catalogos.pop(model, None)
+
+
+def schedule_invalidate_catalogo(model):
+    """
+    Descarta el índice de un catálogo de inmediato y de nuevo al confirmar la transacción en curso, para que
+    otros hilos no conserven una versión cargada antes del commit.
+
+    Args:
+        model (Model): Modelo cuyo índice se descarta.
+    """
+    invalidate_catalogo(model)
+    transaction.on_commit(lambda: invalidate_catalogo(model))
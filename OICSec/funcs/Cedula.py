@@ -1,12 +1,31 @@
 import os
+import pickle
+import threading
 from copy import copy
+from io import BytesIO
 from dataclasses import dataclass
 from typing import List, Optional
 
-from openpyxl import load_workbook
+from openpyxl import Workbook, load_workbook
 from openpyxl.cell import Cell
 from openpyxl.worksheet.worksheet import Worksheet
 
+from OICSec.funcs.Archivos import save_generated
+from OICSec.funcs.Cache import file_version, render_cached
+
+SHEET_NAMES = {
+    1: 'Auditoria',
+    2: 'Intervención',
+    3: 'Control interno'
+}
+
+# Versión de la generación de cédulas; se incrementa cuando cambia el documento generado con los mismos datos, para
+# descartar las cédulas de la caché de documentos
+RENDER_VERSION = 1
+
+TEMPLATE_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__),
+                                              '../../media/templatedocs/supervision-plantilla.xlsx'))
+
 
 @dataclass
 class SupervisionData:
@@ -222,41 +241,118 @@ def write_conceptos(conceptos: ConceptosLista, sheet: Worksheet, kind: str, styl
             write_concepto(sheet=sheet, concepto=concepto, cell_row=cell_row, styles=styles)
 
 
-def cedula(kind: int, data: SupervisionData, conceptos: ConceptosLista) -> Optional[str]:
+class PlantillaSupervision:
+    """
+    Clase que almacena la plantilla de supervisión ya procesada, para no leer el archivo .xlsx en cada cédula.
+
+    El libro se lee una sola vez y, por cada tipo de supervisión, se guarda serializado con las hojas de los otros
+    tipos ya ocultas; cada cédula parte de una copia independiente que se obtiene deserializándolo, lo cual es mucho
+    más rápido que volver a leer el archivo.
+
+    Atributos:
+        path (str): Ruta de la plantilla.
+        version (tuple): Fecha de modificación y tamaño del archivo cuando se leyó.
+        plantillas (dict): Libro serializado de cada tipo de supervisión.
+    """
+
+    def __init__(self, path: str, version: tuple):
+        self.path = path
+        self.version = version
+        workbook = load_workbook(filename=path)
+        self.plantillas = {}
+        for kind, sheet_name in SHEET_NAMES.items():
+            for sheet_title in SHEET_NAMES.values():
+                workbook[sheet_title].sheet_state = "visible" if sheet_title == sheet_name else "hidden"
+            self.plantillas[kind] = pickle.dumps(workbook, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def workbook(self, kind: int) -> Optional[Workbook]:
+        """
+        Obtiene una copia de la plantilla de un tipo de supervisión que se puede modificar libremente.
+
+        Args:
+            kind (int): Tipo de supervisión (1: Auditoria, 2: Intervención, 3: Control interno).
+
+        Returns:
+            Optional[Workbook]: Copia del libro, o None si el tipo no existe.
+        """
+        plantilla = self.plantillas.get(kind)
+        if plantilla is None:
+            return None
+        return pickle.loads(plantilla)
+
+
+_plantillas = {}
+_plantillas_lock = threading.Lock()
+
+
+def get_plantilla(path: str = TEMPLATE_PATH) -> PlantillaSupervision:
     """
-    Genera una hoja de cálculo de supervisión, rellenando datos generales y conceptos evaluados,
-    y ocultando las hojas que no son relevantes.
+    Obtiene la plantilla de supervisión procesada, leyéndola la primera vez y cada vez que el archivo cambia.
+
+    Args:
+        path (str): Ruta de la plantilla.
+
+    Returns:
+        PlantillaSupervision: Plantilla compartida por todo el proceso.
+
+    Raises:
+        FileNotFoundError: Si la plantilla no existe.
+    """
+    version = file_version(path)
+    plantilla = _plantillas.get(path)
+    if plantilla is None or plantilla.version != version:
+        with _plantillas_lock:
+            plantilla = _plantillas.get(path)
+            if plantilla is None or plantilla.version != version:
+                plantilla = PlantillaSupervision(path, version)
+                _plantillas[path] = plantilla
+    return plantilla
+
+
+def invalidate_plantilla():
+    """
+    Descarta las plantillas procesadas para que se vuelvan a leer en la siguiente cédula.
+    """
+    with _plantillas_lock:
+        _plantillas.clear()
+
+
+def cedula_file_name(data: SupervisionData) -> str:
+    """
+    Obtiene el nombre del archivo de la cédula de una supervisión.
 
     Args:
-        kind (int): Tipo de supervisión (1: Auditoria, 2: Intervención, 3: Control interno).
         data (SupervisionData): Datos generales de la supervisión.
-        conceptos (List[Concepto]): Lista de conceptos con estado y comentario.
 
     Returns:
-        Optional[str]: Ruta del archivo generado.
+        str: Nombre del archivo.
     """
+    file_name = f"Supervision - {data.Numero} - {data.OIC} - {data.Anyo_Trimestre}.xlsx"
+    return file_name.replace('/', '_')
 
-    # Obtén la ruta absoluta al directorio del script
-    script_dir = os.path.dirname(__file__)
 
-    # Construye la ruta relativa al archivo Excel
-    rel_path = '../../media/templatedocs/supervision-plantilla.xlsx'
-    abs_file_path = os.path.normpath(os.path.join(script_dir, rel_path))
+def render_cedula(kind: int, data: SupervisionData, conceptos: ConceptosLista) -> Optional[BytesIO]:
+    """
+    Genera en memoria una hoja de cálculo de supervisión, rellenando datos generales y conceptos evaluados,
+    con las hojas que no son relevantes ocultas.
 
-    try:
-        workbook = load_workbook(filename=abs_file_path)
-    except FileNotFoundError:
-        return None
+    Args:
+        kind (int): Tipo de supervisión (1: Auditoria, 2: Intervención, 3: Control interno).
+        data (SupervisionData): Datos generales de la supervisión.
+        conceptos (List[Concepto]): Lista de conceptos con estado y comentario.
 
-    sheet_names = {
-        1: 'Auditoria',
-        2: 'Intervención',
-        3: 'Control interno'
-    }
-    sheet_name = sheet_names.get(kind)
+    Returns:
+        Optional[BytesIO]: Contenido del archivo generado, al inicio del buffer, o None si no se pudo generar.
+    """
+    sheet_name = SHEET_NAMES.get(kind)
     if not sheet_name:
         return None
 
+    try:
+        workbook = get_plantilla().workbook(kind)
+    except FileNotFoundError:
+        return None
+
     sheet = workbook[sheet_name]
 
     write_data(data=data, sheet=sheet, kind=kind)
@@ -265,16 +361,51 @@ def cedula(kind: int, data: SupervisionData, conceptos: ConceptosLista) -> Optio
 
     write_conceptos(conceptos=conceptos, sheet=sheet, kind=sheet_name, styles=estilos)
 
-    for sheet_kind, sheet_title in sheet_names.items():
-        if sheet_kind != kind:
-            workbook[sheet_title].sheet_state = "hidden"
+    buffer = BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
 
-    file_name = f"Supervision - {data.Numero} - {data.OIC} - {data.Anyo_Trimestre}.xlsx"
-    file_name = file_name.replace('/', '_')
-    output_dir = os.path.normpath(os.path.join(script_dir, '../../media/cedulas'))
-    abs_output_path = os.path.join(output_dir, file_name)
-    os.makedirs(os.path.dirname(abs_output_path), exist_ok=True)
-    workbook.save(abs_output_path)
 
-    return abs_output_path
+def render_cedula_cached(kind: int, data: SupervisionData, conceptos: ConceptosLista,
+                         cache_config: Optional[tuple] = None) -> Optional[BytesIO]:
+    """
+    Obtiene una cédula de la caché de documentos si ya se generó con los mismos datos, conceptos y versión de la
+    plantilla, o la genera con render_cedula.
+
+    Args:
+        kind (int): Tipo de supervisión (1: Auditoria, 2: Intervención, 3: Control interno).
+        data (SupervisionData): Datos generales de la supervisión.
+        conceptos (ConceptosLista): Lista de conceptos con estado y comentario.
+        cache_config (tuple, optional): Configuración de la caché de documentos, ver get_document_cache.
+
+    Returns:
+        Optional[BytesIO]: Contenido del archivo, al inicio del buffer, o None si no se pudo generar.
+    """
+    try:
+        version = file_version(TEMPLATE_PATH)
+    except FileNotFoundError:
+        return None
+    content = render_cached(['cedula', RENDER_VERSION, version, kind, data, conceptos],
+                            lambda: render_cedula(kind=kind, data=data, conceptos=conceptos), cache_config)
+    return BytesIO(content) if content is not None else None
 
+
+def cedula(kind: int, data: SupervisionData, conceptos: ConceptosLista) -> Optional[str]:
+    """
+    Genera una hoja de cálculo de supervisión con render_cedula_cached y la guarda en media/cedulas si su
+    contenido cambió.
+
+    Args:
+        kind (int): Tipo de supervisión (1: Auditoria, 2: Intervención, 3: Control interno).
+        data (SupervisionData): Datos generales de la supervisión.
+        conceptos (List[Concepto]): Lista de conceptos con estado y comentario.
+
+    Returns:
+        Optional[str]: Ruta del archivo generado.
+    """
+    buffer = render_cedula_cached(kind=kind, data=data, conceptos=conceptos)
+    if buffer is None:
+        return None
+    abs_output_path, _ = save_generated(buffer.getvalue(), 'cedulas', cedula_file_name(data))
+    return abs_output_path
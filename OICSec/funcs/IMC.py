@@ -1,6 +1,13 @@
 import docx
 import pandas as pd
 
+from OICSec.funcs.LectorDocx import read_docx, rewind
+
+# Versión del resultado de read_format_a3; se incrementa al cambiar la extracción para descartar la caché
+EXTRACTOR_VERSION = 1
+# process_dfs lee hasta la cuarta tabla, contando las del encabezado
+NUM_TABLAS = 4
+
 
 def tables_data(tables):
     dfs = []
@@ -78,7 +85,7 @@ def process_dfs(dfs):
     data.update(extract_kind(dfs[2]))
     return data
 
-def read_format_a3(path):
+def read_format_a3_docx(path):
     try:
         document = docx.Document(path)
         dfs = extract_header(document)
@@ -88,3 +95,14 @@ def read_format_a3(path):
     except Exception as e:
         print(e)
         return None
+
+
+def read_format_a3(path):
+    # Se leen del XML solo las tablas del encabezado y las primeras del cuerpo; con otra estructura se usa python-docx
+    try:
+        contenido = read_docx(path, max_tablas=NUM_TABLAS, encabezado=True)
+        dfs = [pd.DataFrame(tabla) for tabla in contenido.tablas_encabezado + contenido.tablas]
+        return process_dfs(dfs)
+    except Exception:
+        rewind(path)
+        return read_format_a3_docx(path)
@@ -0,0 +1,653 @@
+from dataclasses import dataclass, field
+from typing import Dict
+
+from django.db import connection, transaction
+from django.db.models import Max, Q
+
+from OICSec.funcs.Archivos import ArchivoSubido
+from OICSec.funcs.Catalogo import resolve_oic
+from OICSec.models import ActividadFiscalizacion, Archivo, Auditoria, AuditoriaArchivos, Cedula, ConceptoCedula, \
+    ControlArchivos, ControlInterno, Intervencion, IntervencionArchivos, Oic
+
+
+@dataclass
+class TipoActividad:
+    """
+    Clase que describe cómo se guarda un tipo de actividad (auditoría o control interno) a partir de las filas
+    extraídas de un archivo.
+
+    Atributos:
+        model (Model): Modelo de la actividad.
+        archivos_model (Model): Modelo que relaciona la actividad con el archivo de origen.
+        archivos_field (str): Nombre de la llave foránea hacia la actividad en 'archivos_model'.
+        media_dir (str): Carpeta dentro de media donde se guarda el archivo de origen.
+        num_celdas (int): Número de conceptos de la cédula de la actividad.
+        campos (Dict[str, str]): Campo del modelo y clave de la fila de la que se obtiene su valor.
+        campos_creacion (Dict[str, object]): Valores fijos que se asignan solo al crear la actividad.
+    """
+    model: type
+    archivos_model: type
+    archivos_field: str
+    media_dir: str
+    num_celdas: int
+    campos: Dict[str, str]
+    campos_creacion: Dict[str, object] = field(default_factory=dict)
+
+
+AUDITORIA = TipoActividad(
+    model=Auditoria,
+    archivos_model=AuditoriaArchivos,
+    archivos_field='id_auditoria',
+    media_dir='auditoria',
+    num_celdas=60,
+    campos={
+        'denominacion': 'Denominacion',
+        'objetivo': 'Objetivo',
+        'alcance': 'Alcance',
+        'ejercicio': 'Ejercicio',
+        'unidad': 'Unidad',
+        'id_materia_id': 'Materia',
+        'id_programacion_id': 'Programacion',
+        'id_enfoque_id': 'Enfoque',
+        'id_temporalidad_id': 'Temporalidad',
+    },
+    campos_creacion={'estado': 1},
+)
+
+CONTROL_INTERNO = TipoActividad(
+    model=ControlInterno,
+    archivos_model=ControlArchivos,
+    archivos_field='id_control',
+    media_dir='controlinterno',
+    num_celdas=55,
+    campos={
+        'area': 'Area',
+        'denominacion': 'Denominacion',
+        'objetivo': 'Objetivo',
+        'id_tipo_revision_id': 'tipo_revision',
+        'id_programa_revision_id': 'programa_revision',
+    },
+)
+
+INTERVENCION = TipoActividad(
+    model=Intervencion,
+    archivos_model=IntervencionArchivos,
+    archivos_field='id_intervencion',
+    media_dir='intervenciones',
+    num_celdas=54,
+    campos={
+        'unidad': 'Área',
+        'denominacion': 'Denominación',
+        'ejercicio': 'Ejercicio',
+        'alcance': 'Alcance y periodo',
+        'antecedentes': 'Antecedentes',
+        'fuerza_auditores': 'Auditores',
+        'fuerza_responsables': 'Responsable',
+        'fuerza_supervision': 'Supervisión',
+        'inicio': 'Inicio',
+        'termino': 'Termino',
+        'objetivo': 'Objetivo',
+        'id_tipo_intervencion_id': 'tipo_intervencion',
+    },
+)
+
+
+def to_field_value(model, attname, value):
+    """
+    Convierte un valor extraído del archivo al tipo del campo del modelo, para compararlo con el valor guardado.
+
+    Args:
+        model (Model): Modelo al que pertenece el campo.
+        attname (str): Nombre del atributo del campo (por ejemplo 'numero' o 'id_materia_id').
+        value: Valor extraído del archivo.
+
+    Returns:
+        Valor convertido, o None si el valor está vacío.
+    """
+    if value is None:
+        return None
+    model_field = next(f for f in model._meta.concrete_fields if f.attname == attname)
+    if model_field.is_relation:
+        model_field = model_field.target_field
+    return model_field.to_python(value)
+
+
+def q_in(field_name, values):
+    """
+    Construye un filtro 'field_name IN values' que también incluye los registros con el campo vacío si None está
+    entre los valores.
+
+    Args:
+        field_name (str): Nombre del campo.
+        values (set): Valores buscados.
+
+    Returns:
+        Q: Filtro de la consulta.
+    """
+    query = Q(**{f'{field_name}__in': [value for value in values if value is not None]})
+    if None in values:
+        query |= Q(**{f'{field_name}__isnull': True})
+    return query
+
+
+class InsercionConcurrente(Exception):
+    """
+    Indica que otra conexión creó registros del mismo modelo durante una inserción múltiple, por lo que no se pueden
+    asignar las llaves de los registros creados.
+    """
+
+
+def bulk_create_returning(model, objs):
+    """
+    Crea varios registros y asigna su llave primaria a cada objeto.
+
+    En los motores que devuelven las llaves de una inserción múltiple (PostgreSQL, MariaDB, SQLite) se usa una sola
+    consulta. En MySQL, donde bulk_create no asigna las llaves, se obtiene la última llave antes de insertar y,
+    después de la inserción múltiple, las llaves mayores a ella: cada sentencia INSERT asigna llaves crecientes en el
+    orden de las filas, así que si hay tantas como objetos son exactamente las creadas y se asignan en orden. Si otra
+    conexión creó registros al mismo tiempo, la inserción se deshace y los registros se crean uno por uno.
+
+    Args:
+        model (Model): Modelo de los registros.
+        objs (list): Objetos a crear.
+
+    Returns:
+        list: Los mismos objetos, con su llave primaria asignada.
+    """
+    if not objs:
+        return objs
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objs)
+    try:
+        with transaction.atomic():
+            ultima = model.objects.aggregate(ultima=Max('pk'))['ultima']
+            model.objects.bulk_create(objs, batch_size=1000)
+            query = model.objects.order_by('pk')
+            if ultima is not None:
+                query = query.filter(pk__gt=ultima)
+            llaves = list(query.values_list('pk', flat=True))
+            if len(llaves) != len(objs):
+                raise InsercionConcurrente
+    except InsercionConcurrente:
+        for obj in objs:
+            obj.pk = None
+            obj.save(force_insert=True)
+        return objs
+    for obj, pk in zip(objs, llaves):
+        obj.pk = pk
+    return objs
+
+
+def find_actividades(keys):
+    """
+    Busca con una sola consulta las actividades de fiscalización de varias combinaciones de año, trimestre y OIC.
+
+    Args:
+        keys (set): Tuplas (anyo, trimestre, id_oic).
+
+    Returns:
+        dict: Actividad de fiscalización existente de cada tupla; las tuplas sin actividad no se incluyen.
+    """
+    actividades = {}
+    if not keys:
+        return actividades
+
+    query = ActividadFiscalizacion.objects.filter(
+        q_in('id_oic', {key[2] for key in keys}),
+        q_in('anyo', {key[0] for key in keys}),
+        q_in('trimestre', {key[1] for key in keys}),
+    ).order_by('pk')
+    for actividad in query:
+        key = (actividad.anyo, actividad.trimestre, actividad.id_oic_id)
+        if key in keys:
+            actividades.setdefault(key, actividad)
+    return actividades
+
+
+@dataclass
+class PlanIngesta:
+    """
+    Clase que almacena los cambios que produciría guardar las filas de un archivo, calculados sin escribir en la
+    base de datos.
+
+    Atributos:
+        tipo (TipoActividad): Tipo de actividad.
+        filas (dict): Valores de cada fila, por (anyo, trimestre, id_oic, numero).
+        actividades_fiscalizacion (dict): Actividades de fiscalización existentes, por (anyo, trimestre, id_oic).
+        actividades_faltantes (list): Tuplas (anyo, trimestre, id_oic) de las actividades de fiscalización a crear.
+        existentes (dict): Actividades existentes, por (anyo, trimestre, id_oic, numero).
+        nuevas (list): Pares (llave, valores) de las actividades a crear.
+        modificadas (list): Pares (actividad, cambios) de las actividades a actualizar; 'cambios' relaciona cada
+                            atributo modificado con sus valores (anterior, nuevo).
+        sin_cambios (list): Actividades existentes cuyos valores no cambian.
+    """
+    tipo: TipoActividad
+    filas: dict
+    actividades_fiscalizacion: dict
+    actividades_faltantes: list
+    existentes: dict
+    nuevas: list
+    modificadas: list
+    sin_cambios: list
+
+
+def row_key(model, oic, row):
+    """
+    Obtiene la llave (anyo, trimestre, id_oic, numero) de una fila extraída, con cada valor convertido al tipo de su
+    campo.
+
+    Args:
+        model (Model): Modelo de la actividad.
+        oic (Oic or None): OIC de la fila.
+        row (dict): Valores de la fila.
+
+    Returns:
+        tuple: Llave de la fila.
+    """
+    return (
+        to_field_value(ActividadFiscalizacion, 'anyo', row['Año']),
+        to_field_value(ActividadFiscalizacion, 'trimestre', row['Trimestre']),
+        oic.pk if oic else None,
+        to_field_value(model, 'numero', row['Numero']),
+    )
+
+
+def group_rows(tipo, data):
+    """
+    Agrupa las filas extraídas por (anyo, trimestre, id_oic, numero) y convierte sus valores al tipo de cada campo.
+    Si varias filas tienen la misma llave, se conservan los valores de la última.
+
+    Args:
+        tipo (TipoActividad): Tipo de actividad.
+        data (list): Lista de pares [nombre del OIC, filas].
+
+    Returns:
+        dict: Valores de cada fila, por llave.
+    """
+    model = tipo.model
+    filas = {}
+    for organo, rows in data:
+        oic, _ = resolve_oic(organo)
+        for row in rows:
+            key = row_key(model, oic, row)
+            filas.pop(key, None)
+            filas[key] = {attname: to_field_value(model, attname, row.get(clave))
+                          for attname, clave in tipo.campos.items()}
+    return filas
+
+
+def plan_rows(tipo, data):
+    """
+    Calcula, sin escribir en la base de datos, qué actividades de fiscalización y actividades se crearían y qué
+    campos se actualizarían al guardar las filas extraídas de un archivo. Usa una consulta para las actividades de
+    fiscalización y otra para las actividades existentes.
+
+    Args:
+        tipo (TipoActividad): Tipo de actividad.
+        data (list): Lista de pares [nombre del OIC, filas].
+
+    Returns:
+        PlanIngesta: Cambios a aplicar.
+    """
+    model = tipo.model
+    filas = group_rows(tipo, data)
+
+    keys = {key[:3] for key in filas}
+    actividades_fiscalizacion = find_actividades(keys)
+    actividades_faltantes = [key for key in keys if key not in actividades_fiscalizacion]
+
+    existentes = {}
+    if actividades_fiscalizacion:
+        query = model.objects.filter(
+            id_actividad_fiscalizacion__in=list(actividades_fiscalizacion.values()),
+        ).filter(q_in('numero', {key[3] for key in filas})).order_by('pk')
+        ids_actividades = {actividad.pk: key for key, actividad in actividades_fiscalizacion.items()}
+        for obj in query:
+            key = ids_actividades[obj.id_actividad_fiscalizacion_id] + (obj.numero,)
+            existentes.setdefault(key, obj)
+
+    nuevas = []
+    modificadas = []
+    sin_cambios = []
+    for key, valores in filas.items():
+        obj = existentes.get(key)
+        if obj is None:
+            nuevas.append((key, valores))
+            continue
+        cambios = {attname: (getattr(obj, attname), value) for attname, value in valores.items()
+                   if getattr(obj, attname) != value}
+        if cambios:
+            modificadas.append((obj, cambios))
+        else:
+            sin_cambios.append(obj)
+
+    return PlanIngesta(tipo=tipo, filas=filas, actividades_fiscalizacion=actividades_fiscalizacion,
+                       actividades_faltantes=actividades_faltantes, existentes=existentes, nuevas=nuevas,
+                       modificadas=modificadas, sin_cambios=sin_cambios)
+
+
+def save_plan(plan):
+    """
+    Aplica los cambios de un plan: crea las actividades de fiscalización, actividades, cédulas y conceptos que
+    faltan con inserciones múltiples y actualiza solo los campos que cambiaron.
+
+    Args:
+        plan (PlanIngesta): Cambios calculados con plan_rows.
+
+    Returns:
+        dict: Actividad creada o actualizada de cada llave (anyo, trimestre, id_oic, numero); primero las existentes
+              y después las creadas.
+    """
+    tipo = plan.tipo
+    model = tipo.model
+    if not plan.filas:
+        return {}
+
+    actividades_fiscalizacion = dict(plan.actividades_fiscalizacion)
+    creadas = bulk_create_returning(ActividadFiscalizacion, [
+        ActividadFiscalizacion(anyo=anyo, trimestre=trimestre, id_oic_id=id_oic)
+        for anyo, trimestre, id_oic in plan.actividades_faltantes
+    ])
+    actividades_fiscalizacion.update(zip(plan.actividades_faltantes, creadas))
+
+    if plan.modificadas:
+        campos_modificados = set()
+        for obj, cambios in plan.modificadas:
+            for attname, (_, value) in cambios.items():
+                setattr(obj, attname, value)
+            campos_modificados.update(cambios)
+        # bulk_update recibe el nombre del campo (id_materia) y no el del atributo (id_materia_id)
+        nombres = [f.name for f in model._meta.concrete_fields if f.attname in campos_modificados]
+        model.objects.bulk_update([obj for obj, _ in plan.modificadas], nombres, batch_size=500)
+
+    cedulas = bulk_create_returning(Cedula, [Cedula() for _ in plan.nuevas])
+    creadas = bulk_create_returning(model, [
+        model(numero=key[3], id_actividad_fiscalizacion=actividades_fiscalizacion[key[:3]], id_cedula=cedula,
+              **tipo.campos_creacion, **valores)
+        for (key, valores), cedula in zip(plan.nuevas, cedulas)
+    ])
+    ConceptoCedula.objects.bulk_create([
+        ConceptoCedula(celda=str(i), id_cedula=cedula)
+        for cedula in cedulas
+        for i in range(tipo.num_celdas)
+    ], batch_size=1000)
+
+    guardadas = {key: plan.existentes[key] for key in plan.filas if key in plan.existentes}
+    guardadas.update(zip([key for key, _ in plan.nuevas], creadas))
+    return guardadas
+
+
+def apply_plan(plan, excel_file):
+    """
+    Aplica los cambios de un plan con save_plan y relaciona el archivo de origen con las actividades.
+
+    Args:
+        plan (PlanIngesta): Cambios calculados con plan_rows.
+        excel_file (UploadedFile): Archivo de origen.
+
+    Returns:
+        list: Actividades creadas o actualizadas.
+    """
+    guardadas = list(save_plan(plan).values())
+    if not guardadas:
+        return []
+
+    # El archivo se guarda una sola vez y un único Archivo se relaciona con todas las actividades
+    tipo = plan.tipo
+    ArchivoSubido(excel_file, tipo.media_dir).link(tipo.archivos_model, tipo.archivos_field, guardadas)
+    return guardadas
+
+
+def link_archivos(tipo, pares, archivo_tipo=0, mismo_tipo=False):
+    """
+    Guarda varios archivos subidos y relaciona cada uno con su actividad, con una consulta por paso para todo el
+    lote: las relaciones existentes, los registros Archivo existentes, los que faltan y las relaciones nuevas.
+
+    Igual que ArchivoSubido.link, una actividad que ya tiene un archivo relacionado no se vuelve a relacionar; si
+    varias entradas son de la misma actividad, se relaciona el primer archivo.
+
+    Args:
+        tipo (TipoActividad): Tipo de actividad.
+        pares (list): Pares (archivo subido, actividad).
+        archivo_tipo (int): Tipo de archivo de la relación.
+        mismo_tipo (bool): Si es True, solo se omiten las actividades que ya tienen un archivo del mismo tipo;
+                           si es False, las que tienen un archivo de cualquier tipo.
+
+    Returns:
+        int: Número de relaciones creadas.
+    """
+    field_name = tipo.archivos_field
+    subidos = {}
+    for upload, _ in pares:
+        if upload.name not in subidos:
+            subidos[upload.name] = ArchivoSubido(upload, tipo.media_dir)
+    for subido in subidos.values():
+        subido.save()
+    if not pares:
+        return 0
+
+    existentes = tipo.archivos_model.objects.filter(**{f'{field_name}__in': [actividad for _, actividad in pares]})
+    if mismo_tipo:
+        existentes = existentes.filter(tipo=archivo_tipo)
+    con_archivo = set(existentes.values_list(field_name, flat=True))
+    pendientes = {}
+    for upload, actividad in pares:
+        if actividad.pk not in con_archivo and actividad.pk not in pendientes:
+            pendientes[actividad.pk] = (subidos[upload.name], actividad)
+    if not pendientes:
+        return 0
+
+    nombres = {subido.nombre for subido, _ in pendientes.values()}
+    archivos = {}
+    for archivo in Archivo.objects.filter(nombre__in=nombres).order_by('pk'):
+        archivos.setdefault(archivo.nombre, archivo)
+    nuevos = bulk_create_returning(Archivo, [Archivo(archivo=subidos[nombre].path, nombre=nombre)
+                                             for nombre in nombres if nombre not in archivos])
+    archivos.update((archivo.nombre, archivo) for archivo in nuevos)
+
+    tipo.archivos_model.objects.bulk_create([
+        tipo.archivos_model(tipo=archivo_tipo, id_archivo=archivos[subido.nombre], **{field_name: actividad})
+        for subido, actividad in pendientes.values()
+    ])
+    return len(pendientes)
+
+
+def ingest_rows(tipo, data, excel_file):
+    """
+    Guarda en conjunto todas las filas extraídas de un archivo PAA o PACI: crea las actividades de fiscalización,
+    actividades, cédulas y conceptos que faltan con inserciones múltiples, y actualiza solo los campos que
+    cambiaron de las actividades existentes.
+
+    Si el archivo contiene varias filas con el mismo número y actividad de fiscalización, se conservan los valores
+    de la última.
+
+    Args:
+        tipo (TipoActividad): Tipo de actividad (AUDITORIA o CONTROL_INTERNO).
+        data (list): Lista de pares [nombre del OIC, filas] devuelta por extract_paa o extract_paci.
+        excel_file (UploadedFile): Archivo de origen.
+
+    Returns:
+        list: Actividades creadas o actualizadas.
+    """
+    return apply_plan(plan_rows(tipo, data), excel_file)
+
+
+def get_verbose_name(model, attname):
+    """
+    Obtiene el nombre con el que se muestra un campo, sin el prefijo 'id' de las llaves foráneas.
+
+    Args:
+        model (Model): Modelo de la actividad.
+        attname (str): Nombre del atributo del campo.
+
+    Returns:
+        str: Nombre del campo.
+    """
+    model_field = next(f for f in model._meta.concrete_fields if f.attname == attname)
+    return str(model_field.verbose_name).removeprefix('id ').capitalize()
+
+
+def display_value(model, attname, value, nombres):
+    """
+    Obtiene el texto con el que se muestra el valor de un campo en la vista previa.
+
+    Args:
+        model (Model): Modelo de la actividad.
+        attname (str): Nombre del atributo del campo.
+        value: Valor del campo.
+        nombres (dict): Texto de los registros relacionados, por (modelo relacionado, llave primaria).
+
+    Returns:
+        str: Texto del valor, o cadena vacía si no tiene valor.
+    """
+    if value is None:
+        return ''
+    model_field = next(f for f in model._meta.concrete_fields if f.attname == attname)
+    if model_field.is_relation:
+        return nombres.get((model_field.related_model, value), str(value))
+    return str(value)
+
+
+def describe_plan(plan):
+    """
+    Resume un plan para mostrarlo en la vista previa de una carga. Los nombres de los registros relacionados
+    (materia, enfoque, tipo de revisión, etc.) se obtienen con una consulta por catálogo.
+
+    Args:
+        plan (PlanIngesta): Cambios calculados con plan_rows.
+
+    Returns:
+        dict: Diccionario con las actividades de fiscalización a crear, las actividades nuevas, las modificadas
+              (con el valor anterior y el nuevo de cada campo) y el número de actividades sin cambios.
+    """
+    model = plan.tipo.model
+
+    # Se buscan los nombres de todos los registros relacionados que aparecen en el plan
+    ids = {}
+    for obj, cambios in plan.modificadas:
+        for attname, valores in cambios.items():
+            model_field = next(f for f in model._meta.concrete_fields if f.attname == attname)
+            if model_field.is_relation:
+                ids.setdefault(model_field.related_model, set()).update(v for v in valores if v is not None)
+    nombres = {}
+    for related_model, pks in ids.items():
+        for obj in related_model.objects.filter(pk__in=pks):
+            nombres[(related_model, obj.pk)] = str(getattr(obj, 'tipo', None) or obj)
+
+    oics = {oic.pk: oic.nombre for oic in Oic.objects.filter(pk__in={key[2] for key in plan.actividades_faltantes})}
+
+    return {
+        'actividades_fiscalizacion': [
+            f'{oics.get(id_oic)} | 0{trimestre}/{anyo}' for anyo, trimestre, id_oic in plan.actividades_faltantes
+        ],
+        'nuevas': [
+            {'numero': key[3], 'denominacion': valores.get('denominacion')} for key, valores in plan.nuevas
+        ],
+        'modificadas': [
+            {
+                'numero': obj.numero,
+                'denominacion': obj.denominacion,
+                'cambios': [
+                    {
+                        'campo': get_verbose_name(model, attname),
+                        'anterior': display_value(model, attname, anterior, nombres),
+                        'nuevo': display_value(model, attname, nuevo, nombres),
+                    }
+                    for attname, (anterior, nuevo) in cambios.items()
+                ],
+            }
+            for obj, cambios in plan.modificadas
+        ],
+        'sin_cambios': len(plan.sin_cambios),
+    }
+
+
+def ingest_auditorias(data, excel_file):
+    """
+    Guarda las auditorías extraídas de un archivo PAA.
+
+    Args:
+        data (list): Resultado de extract_paa.
+        excel_file (UploadedFile): Archivo de origen.
+
+    Returns:
+        list: Auditorías creadas o actualizadas.
+    """
+    return ingest_rows(AUDITORIA, data, excel_file)
+
+
+def ingest_controles_internos(data, excel_file):
+    """
+    Guarda los controles internos extraídos de un archivo PACI.
+
+    Args:
+        data (list): Resultado de extract_paci.
+        excel_file (UploadedFile): Archivo de origen.
+
+    Returns:
+        list: Controles internos creados o actualizados.
+    """
+    return ingest_rows(CONTROL_INTERNO, data, excel_file)
+
+
+def preview_auditorias(data):
+    """
+    Calcula la vista previa de las auditorías extraídas de un archivo PAA, sin escribir en la base de datos.
+
+    Args:
+        data (list): Resultado de extract_paa.
+
+    Returns:
+        dict: Resumen de los cambios, ver describe_plan.
+    """
+    return describe_plan(plan_rows(AUDITORIA, data))
+
+
+def preview_controles_internos(data):
+    """
+    Calcula la vista previa de los controles internos extraídos de un archivo PACI, sin escribir en la base de datos.
+
+    Args:
+        data (list): Resultado de extract_paci.
+
+    Returns:
+        dict: Resumen de los cambios, ver describe_plan.
+    """
+    return describe_plan(plan_rows(CONTROL_INTERNO, data))
+
+
+def ingest_intervenciones(documentos):
+    """
+    Guarda en conjunto las intervenciones extraídas de varios archivos PINT: resuelve las actividades de
+    fiscalización e intervenciones existentes con una consulta cada una, crea las que faltan junto con sus cédulas y
+    conceptos con inserciones múltiples y relaciona cada archivo con su intervención.
+
+    Si varios archivos corresponden a la misma intervención, se conservan los valores del último.
+
+    Args:
+        documentos (list): Pares (datos de la intervención, archivo de origen); los datos tienen las fechas
+                           convertidas y la llave 'tipo_intervencion', ver get_pint_row.
+
+    Returns:
+        list: Intervención de cada documento, en el mismo orden.
+    """
+    model = INTERVENCION.model
+    guardadas = save_plan(plan_rows(INTERVENCION, [[row.get('Ente Público'), [row]] for row, _ in documentos]))
+    intervenciones = [guardadas[row_key(model, resolve_oic(row.get('Ente Público'))[0], row)]
+                      for row, _ in documentos]
+    link_archivos(INTERVENCION, [(upload, intervencion)
+                                 for (_, upload), intervencion in zip(documentos, intervenciones)])
+    return intervenciones
+
+
+def preview_intervencion(row):
+    """
+    Calcula la vista previa de la intervención extraída de un archivo PINT, sin escribir en la base de datos.
+
+    Args:
+        row (dict): Datos de la intervención, con las fechas convertidas y la llave 'tipo_intervencion'.
+
+    Returns:
+        dict: Resumen de los cambios, ver describe_plan.
+    """
+    return describe_plan(plan_rows(INTERVENCION, [[row.get('Ente Público'), [row]]]))
@@ -0,0 +1,124 @@
+from dataclasses import dataclass
+from typing import Iterator, List
+
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+
+
+@dataclass
+class HojaActividades:
+    """
+    Clase que almacena las filas completas (sin celdas vacías) de una hoja de cálculo de PAA o PACI.
+
+    Atributos:
+        nombre (str): Nombre de la hoja.
+        filas (pd.DataFrame): Filas completas, con el mismo índice que tendrían al leerse con pd.read_excel.
+        anteriores (List): Primer valor de la fila inmediatamente anterior a cada fila completa, de donde se
+                           obtiene el nombre del órgano.
+    """
+    nombre: str
+    filas: pd.DataFrame
+    anteriores: List
+
+
+def read_sheets_pandas(path) -> Iterator[HojaActividades]:
+    """
+    Lee todas las hojas del archivo con pandas y obtiene sus filas completas.
+
+    Carga todas las hojas en memoria antes de devolver la primera; se conserva como alternativa a
+    read_sheets_streaming.
+
+    Args:
+        path (str or file): Ruta o archivo Excel.
+
+    Returns:
+        Iterator[HojaActividades]: Filas completas de cada hoja, en el orden del libro.
+    """
+    sheets = pd.read_excel(path, sheet_name=None)
+    for nombre, df in sheets.items():
+        filas = df[df.notnull().all(axis=1)]
+        anteriores = [df.iloc[index - 1, 0] for index in filas.index]
+        anteriores = [None if pd.isna(anterior) else anterior for anterior in anteriores]
+        yield HojaActividades(nombre=nombre, filas=filas, anteriores=anteriores)
+
+
+def convert_cell(value):
+    """
+    Convierte el valor de una celda de la misma forma que pd.read_excel.
+
+    Args:
+        value: Valor de la celda leído por openpyxl.
+
+    Returns:
+        Valor convertido, o None si la celda está vacía o contiene un error.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, str) and value in ERROR_CODES:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def read_sheet_streaming(sheet) -> HojaActividades:
+    """
+    Recorre una hoja en modo de solo lectura y conserva únicamente sus filas completas.
+
+    Una fila es completa cuando no tiene celdas vacías hasta la última columna con datos de la hoja, igual que
+    df.notnull().all(axis=1) sobre el DataFrame de pd.read_excel. Como esa columna solo se conoce al terminar la
+    hoja, se guardan las filas candidatas del ancho máximo visto hasta el momento.
+
+    Args:
+        sheet (ReadOnlyWorksheet): Hoja abierta con read_only=True.
+
+    Returns:
+        HojaActividades: Filas completas de la hoja.
+    """
+    sheet.reset_dimensions()
+    width = 0
+    candidatas = []
+    anterior = None
+
+    for numero, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+        values = [convert_cell(value) for value in row]
+        while values and values[-1] is None:
+            values.pop()
+
+        if len(values) > width:
+            width = len(values)
+            candidatas = []
+
+        # La primera fila es el encabezado en pd.read_excel, por lo que el índice es el número de fila menos 2
+        if numero > 1 and values and len(values) == width and all(value is not None for value in values):
+            candidatas.append((numero - 2, anterior, values))
+
+        anterior = values[0] if values else None
+
+    filas = pd.DataFrame([values for _, _, values in candidatas],
+                         index=[index for index, _, _ in candidatas],
+                         columns=range(width))
+    anteriores = [anterior for _, anterior, _ in candidatas]
+    return HojaActividades(nombre=sheet.title, filas=filas, anteriores=anteriores)
+
+
+def read_sheets_streaming(path) -> Iterator[HojaActividades]:
+    """
+    Lee el archivo con openpyxl en modo de solo lectura, una hoja a la vez.
+
+    La memoria utilizada se limita a las filas completas de la hoja en curso, y las filas de la primera hoja se
+    pueden procesar antes de leer el resto del archivo.
+
+    Args:
+        path (str or file): Ruta o archivo Excel.
+
+    Returns:
+        Iterator[HojaActividades]: Filas completas de cada hoja, en el orden del libro.
+    """
+    workbook = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        for sheet in workbook.worksheets:
+            yield read_sheet_streaming(sheet)
+    finally:
+        workbook.close()
@@ -0,0 +1,265 @@
+import posixpath
+import zipfile
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from lxml import etree
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+R = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+DOCUMENT_PART = 'word/document.xml'
+DOCUMENT_RELS = 'word/_rels/document.xml.rels'
+
+
+class FormatoDocxError(ValueError):
+    """
+    Error que indica que el documento no tiene la estructura que espera la lectura directa del XML; en ese caso se
+    debe leer con python-docx.
+    """
+
+
+@dataclass
+class ContenidoDocx:
+    """
+    Clase que almacena el texto de las tablas de un documento .docx leído directamente de su XML, con el mismo
+    contenido que se obtendría con python-docx a partir de 'cell.text' de cada celda de 'table.rows'.
+
+    Atributos:
+        primer_parrafo (str or None): Texto del primer párrafo del cuerpo (document.paragraphs[0]), o None si el
+                                      cuerpo no tiene párrafos.
+        tablas (List): Tablas del cuerpo (document.tables), hasta el máximo solicitado; cada tabla es una lista de
+                       filas y cada fila la lista del texto de sus celdas.
+        tablas_encabezado (List): Tablas del encabezado de la primera sección (document.sections[0].header.tables).
+    """
+    primer_parrafo: Optional[str] = None
+    tablas: List = field(default_factory=list)
+    tablas_encabezado: List = field(default_factory=list)
+
+
+def run_text(run):
+    """
+    Obtiene el texto de un elemento w:r igual que python-docx: texto, tabuladores, saltos de línea y guiones.
+
+    Args:
+        run (etree._Element): Elemento w:r.
+
+    Returns:
+        str: Texto del elemento.
+    """
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == W + 't':
+            parts.append(child.text or '')
+        elif tag == W + 'tab' or tag == W + 'ptab':
+            parts.append('\t')
+        elif tag == W + 'br':
+            parts.append('\n' if child.get(W + 'type', 'textWrapping') == 'textWrapping' else '')
+        elif tag == W + 'cr':
+            parts.append('\n')
+        elif tag == W + 'noBreakHyphen':
+            parts.append('-')
+    return ''.join(parts)
+
+
+def paragraph_text(paragraph):
+    """
+    Obtiene el texto de un elemento w:p a partir de sus elementos w:r y w:hyperlink, igual que python-docx.
+
+    Args:
+        paragraph (etree._Element): Elemento w:p.
+
+    Returns:
+        str: Texto del párrafo.
+    """
+    parts = []
+    for child in paragraph:
+        if child.tag == W + 'r':
+            parts.append(run_text(child))
+        elif child.tag == W + 'hyperlink':
+            parts.extend(run_text(run) for run in child.iterchildren(W + 'r'))
+    return ''.join(parts)
+
+
+def get_int(element, path, default):
+    """
+    Obtiene el atributo w:val numérico de un elemento descendiente.
+
+    Args:
+        element (etree._Element or None): Elemento donde se busca.
+        path (str): Ruta del elemento descendiente.
+        default (int): Valor si el elemento no existe.
+
+    Returns:
+        int: Valor del atributo.
+    """
+    if element is None:
+        return default
+    child = element.find(path)
+    if child is None:
+        return default
+    return int(child.get(W + 'val', default))
+
+
+def table_rows(table):
+    """
+    Obtiene el texto de las celdas de un elemento w:tbl, fila por fila, igual que 'cell.text' de 'table.rows' en
+    python-docx: una celda combinada horizontalmente se repite en cada columna que ocupa, y una combinada
+    verticalmente toma el texto de la celda superior.
+
+    Args:
+        table (etree._Element): Elemento w:tbl.
+
+    Returns:
+        list: Lista de filas con el texto de sus celdas.
+
+    Raises:
+        FormatoDocxError: Si una celda combinada verticalmente no tiene una celda superior en la misma columna.
+    """
+    rows = []
+    previous = {}
+    for tr in table.iterchildren(W + 'tr'):
+        grid_offset = get_int(tr.find(W + 'trPr'), W + 'gridBefore', 0)
+        cells = []
+        current = {}
+        for tc in tr.iterchildren(W + 'tc'):
+            tc_pr = tc.find(W + 'tcPr')
+            span = get_int(tc_pr, W + 'gridSpan', 1)
+            v_merge = tc_pr.find(W + 'vMerge') if tc_pr is not None else None
+            if v_merge is not None and v_merge.get(W + 'val', 'continue') == 'continue':
+                if grid_offset not in previous:
+                    raise FormatoDocxError('Celda combinada sin celda superior')
+                text, span = previous[grid_offset]
+            else:
+                text = '\n'.join(paragraph_text(p) for p in tc.iterchildren(W + 'p'))
+            current[grid_offset] = (text, span)
+            cells.extend([text] * span)
+            grid_offset += span
+        rows.append(cells)
+        previous = current
+    return rows
+
+
+def clear_element(element):
+    """
+    Libera un elemento ya procesado y sus hermanos anteriores para que el árbol no crezca durante la lectura.
+
+    Args:
+        element (etree._Element): Elemento procesado.
+    """
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def read_document_part(source, max_tablas):
+    """
+    Recorre word/document.xml con iterparse y obtiene el primer párrafo, las primeras tablas del cuerpo y el
+    encabezado predeterminado de la primera sección.
+
+    Args:
+        source (file): Contenido de word/document.xml.
+        max_tablas (int or None): Número de tablas del cuerpo a leer; None para leerlas todas.
+
+    Returns:
+        tuple: Texto del primer párrafo (o None), lista de tablas y el identificador de la relación del encabezado
+               predeterminado de la primera sección (o None).
+    """
+    primer_parrafo = None
+    tablas = []
+    header_id = None
+    section_found = False
+    body = W + 'body'
+
+    for _, element in etree.iterparse(source, events=('end',), tag=(W + 'p', W + 'tbl', W + 'sectPr')):
+        parent = element.getparent()
+        parent_tag = parent.tag if parent is not None else None
+        if element.tag == W + 'sectPr':
+            # La primera sección termina en el primer salto de sección o, si no hay, al final del cuerpo
+            if not section_found and parent_tag in (W + 'pPr', body):
+                section_found = True
+                for reference in element.iterchildren(W + 'headerReference'):
+                    if reference.get(W + 'type') == 'default':
+                        header_id = reference.get(R + 'id')
+            continue
+        if parent_tag != body:
+            continue
+        if element.tag == W + 'p':
+            if primer_parrafo is None:
+                primer_parrafo = paragraph_text(element)
+        elif max_tablas is None or len(tablas) < max_tablas:
+            tablas.append(table_rows(element))
+        clear_element(element)
+
+    return primer_parrafo, tablas, header_id
+
+
+def header_part_name(docx_zip, header_id):
+    """
+    Obtiene el nombre dentro del archivo .docx de la parte del encabezado a partir de su relación.
+
+    Args:
+        docx_zip (ZipFile): Archivo .docx abierto.
+        header_id (str): Identificador de la relación del encabezado.
+
+    Returns:
+        str: Nombre de la parte, por ejemplo 'word/header1.xml'.
+
+    Raises:
+        FormatoDocxError: Si la relación no existe.
+    """
+    relationships = etree.fromstring(docx_zip.read(DOCUMENT_RELS))
+    for relationship in relationships.iterchildren(REL + 'Relationship'):
+        if relationship.get('Id') == header_id:
+            target = relationship.get('Target')
+            if target.startswith('/'):
+                return target.lstrip('/')
+            return posixpath.normpath(posixpath.join(posixpath.dirname(DOCUMENT_PART), target))
+    raise FormatoDocxError(f'No se encontró la relación {header_id} del encabezado')
+
+
+def read_docx(path, max_tablas=None, encabezado=False):
+    """
+    Lee las tablas de un documento .docx directamente de su XML, sin construir el modelo de objetos de python-docx.
+
+    Args:
+        path (str or file): Ruta o archivo .docx.
+        max_tablas (int, optional): Número de tablas del cuerpo a leer; las siguientes se omiten.
+        encabezado (bool): Si es True, también se leen las tablas del encabezado de la primera sección.
+
+    Returns:
+        ContenidoDocx: Primer párrafo y tablas del documento.
+
+    Raises:
+        FormatoDocxError: Si el documento no tiene la estructura esperada.
+    """
+    try:
+        with zipfile.ZipFile(path) as docx_zip:
+            with docx_zip.open(DOCUMENT_PART) as document_part:
+                primer_parrafo, tablas, header_id = read_document_part(document_part, max_tablas)
+
+            tablas_encabezado = []
+            # Sin encabezado predeterminado python-docx crea uno vacío, por lo que no tiene tablas
+            if encabezado and header_id is not None:
+                with docx_zip.open(header_part_name(docx_zip, header_id)) as header_part:
+                    header = etree.parse(header_part).getroot()
+                tablas_encabezado = [table_rows(table) for table in header.iterchildren(W + 'tbl')]
+    except (zipfile.BadZipFile, KeyError, etree.XMLSyntaxError, ValueError) as e:
+        raise FormatoDocxError(str(e)) from e
+
+    return ContenidoDocx(primer_parrafo=primer_parrafo, tablas=tablas, tablas_encabezado=tablas_encabezado)
+
+
+def rewind(path):
+    """
+    Regresa un archivo al inicio para volver a leerlo; las rutas no requieren cambios.
+
+    Args:
+        path (str or file): Ruta o archivo.
+    """
+    if hasattr(path, 'seek'):
+        path.seek(0)
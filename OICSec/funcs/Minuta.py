@@ -1,11 +1,23 @@
+import logging
 import os
 import re
-import shutil
+import threading
+import zipfile
+from copy import deepcopy
 from dataclasses import dataclass
-from pathlib import Path
+from io import BytesIO
 from typing import List, Dict, Optional, Tuple
 
-from docx import Document
+from lxml import etree
+
+from OICSec.funcs.Archivos import save_generated
+from OICSec.funcs.Cache import file_version, render_cached
+
+# Versión de la generación de minutas; se incrementa cuando cambia el documento generado con los mismos datos, para
+# descartar las minutas de la caché de documentos
+RENDER_VERSION = 2
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -82,144 +94,351 @@ class DataDocs:
         return None
 
 
-def replace_text_in_paragraph(paragraph, regex, data):
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+REL_OFFICE_DOCUMENT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+
+# Marcadores de la plantilla: P01-P35 para los datos y E01-E25 / C01-C25 para estatus y comentarios de la revisión
+PLACEHOLDER = re.compile(r'[PEC]\d{2}')
+SEPARADORES = re.compile(r'(\t|\r\n|\r|\n)')
+
+# Texto de la primera celda que identifica la tabla de revisión de cada tipo, en el orden en que se buscan
+TABLAS_REVISION = [
+    ('AUDITORÍA', 'A', 'auditoria_data'),
+    ('INTERVENCIÓN', 'I', 'intervencion_data'),
+    ('CONTROL INTERNO', 'C', 'control_interno_data'),
+]
+
+
+def w_tag(tag: str) -> str:
     """
-    Reemplaza texto dentro de un párrafo basado en una expresión regular y un diccionario de datos.
+    Obtiene el nombre completo de una etiqueta de WordprocessingML.
 
     Args:
-        paragraph (docx.text.paragraph.Paragraph): Párrafo en el que se va a realizar el reemplazo.
-        regex (re.Pattern): Patrón de expresión regular compilado para hacer coincidir texto.
-        data (dict): Diccionario que mapea el texto a reemplazar (claves) con sus reemplazos (valores).
+        tag (str): Nombre local de la etiqueta, por ejemplo 't'.
 
     Returns:
-        None
+        str: Nombre con el espacio de nombres.
     """
-    for run in paragraph.runs:
-        new_text = regex.sub(lambda match: data.get(match.group(0), match.group(0)), run.text)
-        if new_text != run.text:
-            run.text = new_text
+    return f'{{{W_NS}}}{tag}'
 
 
-def replace_text_in_table(table, regex, data):
+def element_path(root, element) -> Tuple[int, ...]:
     """
-    Reemplaza texto dentro de una tabla basado en una expresión regular y un diccionario de datos.
+    Obtiene la posición de un elemento como la lista de índices de sus ancestros a partir de la raíz.
 
     Args:
-        table (docx.table.Table): Tabla en la que se va a realizar el reemplazo.
-        regex (re.Pattern): Patrón de expresión regular compilado para hacer coincidir texto.
-        data (dict): Diccionario que mapea el texto a reemplazar (claves) con sus reemplazos (valores).
+        root (etree._Element): Raíz del documento.
+        element (etree._Element): Elemento a localizar.
 
     Returns:
-        None
+        Tuple[int, ...]: Índices de cada nivel, de la raíz al elemento.
     """
-    for row in table.rows:
-        for cell in row.cells:
-            for paragraph in cell.paragraphs:
-                replace_text_in_paragraph(paragraph, regex, data)
+    path = []
+    while element is not root:
+        parent = element.getparent()
+        path.append(parent.index(element))
+        element = parent
+    return tuple(reversed(path))
 
 
-def replace_data(doc, data):
+def find_element(root, path: Tuple[int, ...]):
     """
-    Reemplaza datos en documento completo (párrafos, tablas) utilizando diccionario de datos y expresiones regulares.
+    Obtiene el elemento que ocupa una posición obtenida con element_path.
 
     Args:
-        doc (docx.Document): Documento en el que se van a realizar los reemplazos.
-        data (dict): Diccionario que mapea el texto a reemplazar (claves) con sus reemplazos (valores).
+        root (etree._Element): Raíz del documento.
+        path (Tuple[int, ...]): Índices de cada nivel.
 
     Returns:
-        None
+        etree._Element: Elemento en esa posición.
     """
-    regex = re.compile('|'.join(re.escape(key) for key in data.keys()))
-    for paragraph in doc.paragraphs:
-        replace_text_in_paragraph(paragraph, regex, data)
-    for table in doc.tables:
-        replace_text_in_table(table, regex, data)
+    element = root
+    for index in path:
+        element = element[index]
+    return element
 
 
+def set_text(node, text: str):
+    """
+    Escribe el texto de un nodo w:t; los tabuladores y saltos de línea se convierten en w:tab y w:br dentro del mismo
+    run, igual que lo hace python-docx.
 
-def replace_revision(doc: Document, revision: RevisionDocs):
+    Args:
+        node (etree._Element): Nodo w:t.
+        text (str): Texto nuevo.
+    """
+    partes = SEPARADORES.split(text)
+    if len(partes) == 1:
+        node.text = text
+        if text != text.strip():
+            node.set(XML_SPACE, 'preserve')
+        return
+
+    run = node.getparent()
+    position = run.index(node)
+    run.remove(node)
+    for i, parte in enumerate(partes):
+        if i % 2:
+            element = etree.SubElement(run, w_tag('tab') if parte == '\t' else w_tag('br'))
+        elif parte:
+            element = etree.SubElement(run, w_tag('t'))
+            element.text = parte
+            if parte != parte.strip():
+                element.set(XML_SPACE, 'preserve')
+        else:
+            continue
+        run.insert(position, element)
+        position += 1
+
+
+def document_part_name(source: zipfile.ZipFile) -> str:
     """
-    Maneja el reemplazo de datos específicos de revisión en tablas dentro de un documento.
+    Obtiene el nombre de la parte principal de un docx a partir de sus relaciones.
 
     Args:
-        doc (docx.Document): Documento en el que se van a realizar los reemplazos.
-        revision (RevisionDocs): Datos de revisión, contienen los parámetros de actividad de fiscalización.
+        source (zipfile.ZipFile): Archivo docx.
 
     Returns:
-        None
+        str: Nombre de la parte, normalmente 'word/document.xml'.
     """
-    for table in doc.tables:
-        table_text = table.cell(0, 0).text
-        if "AUDITORÍA" in table_text:
-            handle_table_replacement(table, revision.auditoria_band, revision.auditoria_data, "A")
-        elif "INTERVENCIÓN" in table_text:
-            handle_table_replacement(table, revision.intervencion_band, revision.intervencion_data, "I")
-        elif "CONTROL INTERNO" in table_text:
-            handle_table_replacement(table, revision.control_interno_band, revision.control_interno_data, "C")
+    rels = etree.fromstring(source.read('_rels/.rels'))
+    for rel in rels:
+        if rel.get('Type') == REL_OFFICE_DOCUMENT:
+            return rel.get('Target').lstrip('/')
+    return 'word/document.xml'
 
 
-def handle_table_replacement(table, band, data, kind):
+def revision_kind(table) -> Optional[Tuple[str, str]]:
     """
-    Maneja el reemplazo de datos en una tabla según el tipo de revisión y la disponibilidad de datos.
+    Identifica si una tabla del documento es la tabla de revisión de auditorías, intervenciones o controles internos.
 
     Args:
-        table (docx.table.Table): Tabla en la que se va a realizar el reemplazo.
-        band (bool): Indica si hay datos disponibles para el tipo de revisión.
-        data (dict): Datos específicos de revisión para un tipo particular.
-        kind (str): Tipo de revisión ("A" para Auditoría, "I" para Intervención, "C" para Control Interno).
+        table (etree._Element): Elemento w:tbl.
 
     Returns:
-        None
+        Optional[Tuple[str, str]]: Tipo de revisión ("A", "I" o "C") y atributo de RevisionDocs con sus datos, o None.
     """
-    if band and data:
-        kind_data = data.get(kind, {})
-        replacement_dict = {}
-        for key, value in kind_data.items():
-            replacement_dict[f"E{key}"] = value["E"]
-            replacement_dict[f"C{key}"] = value["C"]
-        regex = re.compile('|'.join(re.escape(key) for key in replacement_dict.keys()))
-        replace_text_in_table(table, regex, replacement_dict)
-    else:
-        parent = table._element.getparent()
-        parent.remove(table._element)
+    cell = table.find(f"{w_tag('tr')}/{w_tag('tc')}")
+    if cell is None:
+        return None
+    text = ''.join(node.text or '' for node in cell.iter(w_tag('t')))
+    for titulo, kind, attr in TABLAS_REVISION:
+        if titulo in text:
+            return kind, attr
+    return None
 
 
-def generate_temp(origen: str, destino: str) -> Optional[str]:
+class PlantillaMinuta:
+    """
+    Clase que almacena una plantilla de minuta indexada, para generar minutas sin volver a leer ni recorrer el docx.
+
+    Al leer la plantilla se registra la posición de cada nodo de texto que contiene marcadores y de cada tabla de
+    revisión, y se guarda un zip con todas las partes del documento excepto la principal. Cada minuta parte de una
+    copia en memoria del XML principal en la que sólo se modifican los nodos registrados; el XML resultante se añade
+    a una copia del zip base, así que las imágenes y demás partes no se vuelven a comprimir.
+
+    Atributos:
+        path (str): Ruta de la plantilla.
+        version (tuple): Fecha de modificación y tamaño del archivo cuando se leyó.
+        document_part (str): Nombre de la parte principal del docx.
+        root (etree._Element): XML principal de la plantilla, que no se modifica.
+        base (bytes): Zip con las demás partes de la plantilla.
+        textos (list): Posición de cada nodo w:t con marcadores y tipo de revisión de la tabla que lo contiene.
+        tablas (list): Posición de cada tabla de revisión, con su tipo y atributo de RevisionDocs.
     """
-    Genera un archivo temporal a partir de una plantilla.
+
+    def __init__(self, path: str, version: tuple):
+        self.path = path
+        self.version = version
+        base = BytesIO()
+        with zipfile.ZipFile(path) as source, zipfile.ZipFile(base, 'w') as target:
+            self.document_part = document_part_name(source)
+            self.root = etree.fromstring(source.read(self.document_part))
+            for info in source.infolist():
+                if info.filename != self.document_part:
+                    target.writestr(info, source.read(info))
+        self.base = base.getvalue()
+
+        self.textos = []
+        self.tablas = []
+        body = self.root.find(w_tag('body'))
+        for child in body:
+            revision = revision_kind(child) if child.tag == w_tag('tbl') else None
+            if revision is not None:
+                self.tablas.append((element_path(self.root, child),) + revision)
+            for node in child.iter(w_tag('t')):
+                if node.text and PLACEHOLDER.search(node.text):
+                    self.textos.append((element_path(self.root, node), revision[0] if revision else None))
+
+    def render(self, data: Dict[str, str], revision: RevisionDocs = None) -> BytesIO:
+        """
+        Genera una minuta a partir de la plantilla.
+
+        Args:
+            data (Dict[str, str]): Valor de cada marcador P01-P35.
+            revision (RevisionDocs, optional): Datos de revisión; si se indica, las tablas de revisión con datos se
+                                               llenan y las demás se eliminan. Si es None las tablas no se modifican.
+
+        Returns:
+            BytesIO: Contenido del docx generado, al inicio del buffer.
+        """
+        root = deepcopy(self.root)
+        valores = {None: data}
+        eliminar = {}
+        for path, kind, attr in self.tablas:
+            if revision is None:
+                continue
+            kind_data = (getattr(revision, attr) or {}).get(kind)
+            if not kind_data:
+                eliminar[kind] = find_element(root, path)
+                continue
+            valores[kind] = dict(data)
+            for key, value in kind_data.items():
+                valores[kind][f"E{key}"] = value["E"]
+                valores[kind][f"C{key}"] = value["C"]
+
+        # Los nodos se localizan antes de modificar el documento, porque los cambios desplazan las posiciones
+        nodos = [(find_element(root, path), valores.get(kind, data)) for path, kind in self.textos
+                 if kind not in eliminar]
+        for node, mapping in nodos:
+            text = PLACEHOLDER.sub(lambda match: mapping.get(match.group(0), match.group(0)), node.text)
+            if text != node.text:
+                set_text(node, text)
+        for table in eliminar.values():
+            table.getparent().remove(table)
+
+        buffer = BytesIO(self.base)
+        with zipfile.ZipFile(buffer, 'a', compression=zipfile.ZIP_DEFLATED) as target:
+            target.writestr(self.document_part,
+                            etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True))
+        buffer.seek(0)
+        return buffer
+
+
+_plantillas = {}
+_plantillas_lock = threading.Lock()
+
+
+def get_plantilla(path: str) -> PlantillaMinuta:
+    """
+    Obtiene una plantilla de minuta indexada, leyéndola la primera vez y cada vez que el archivo cambia.
+
+    Args:
+        path (str): Ruta de la plantilla.
+
+    Returns:
+        PlantillaMinuta: Plantilla compartida por todo el proceso.
+
+    Raises:
+        FileNotFoundError: Si la plantilla no existe.
+    """
+    version = file_version(path)
+    plantilla = _plantillas.get(path)
+    if plantilla is None or plantilla.version != version:
+        with _plantillas_lock:
+            plantilla = _plantillas.get(path)
+            if plantilla is None or plantilla.version != version:
+                plantilla = PlantillaMinuta(path, version)
+                _plantillas[path] = plantilla
+    return plantilla
+
+
+def invalidate_plantilla():
+    """
+    Descarta las plantillas indexadas para que se vuelvan a leer en la siguiente minuta.
+    """
+    with _plantillas_lock:
+        _plantillas.clear()
+
+
+def minuta_file_name(oic: str = '&&&&&&', mes: str = '00', trimestre: str = '0', anyo: str = '0000') -> str:
+    """
+    Obtiene el nombre del archivo de una minuta.
 
     Args:
-        origen (str): Ruta de la plantilla de archivo.
-        destino (str): Ruta del directorio donde se va a generar el archivo temporal.
+        oic (str, optional): Nombre del OIC correspondiente de la minuta. Default es '&&&&&&'.
+        mes (str, optional): Mes de la minuta. Default es '00'.
+        trimestre (str, optional): Trimestre de la minuta. Default es '0'.
+        anyo (str, optional): Año de la minuta. Default es '0000'.
 
     Returns:
-        Optional[str]: Ruta del archivo temporal generado o None si no se pudo generar.
+        str: Nombre del archivo.
     """
-    temp_destino = os.path.join(destino, "temp.docx")
+    return f"Minuta - {oic} - M{mes}T{trimestre} - {anyo}.docx"
+
+
+def minuta_template(kind: bool) -> str:
+    """
+    Obtiene la ruta de la plantilla de una minuta.
+
+    Args:
+        kind (bool): True para Papeles de Trabajo, False para Proyectos de Observaciones.
+
+    Returns:
+        str: Ruta de la plantilla.
+    """
+    # Obtén la ruta absoluta al directorio del script
+    script_dir = os.path.dirname(__file__)
+    # Construye la ruta relativa al archivo Word dependiendo de el tipo de archivo
+    nombre = 'minuta_papeles.docx' if kind else 'minuta_proyectos.docx'
+    rel_path = f'../../media/templatedocs/{nombre}'
+    return os.path.normpath(os.path.join(script_dir, rel_path))
+
+
+def render_minuta(data: List[str],
+                  kind: bool,
+                  revision: RevisionDocs = None) -> Optional[BytesIO]:
+    """
+    Genera en memoria un archivo docx de tipo minuta a partir de la plantilla indexada que le corresponde.
+
+    Args:
+        data (List[str]): Lista de datos que serán escritos en el docx.
+        kind (bool): Tipo de archivo a crear:
+                     - True: Papeles de Trabajo
+                     - False: Proyectos de Observaciones
+        revision (RevisionDocs, optional): Parámetros de observancia de las actividades de fiscalización.
+                                           Obligatorio si kind es False (Proyectos de Observaciones).
+
+    Returns:
+        Optional[BytesIO]: Contenido del archivo generado, al inicio del buffer, o None si no se pudo generar.
+    """
+    if not kind and revision is None:
+        return None
     try:
-        os.makedirs(os.path.dirname(temp_destino), exist_ok=True)
-        shutil.copy(origen, temp_destino)
-        return temp_destino
-    except (FileNotFoundError, PermissionError) as e:
-        print(f"Error al generar el archivo temporal: {e}")
+        plantilla = get_plantilla(minuta_template(kind))
+    except (FileNotFoundError, PermissionError):
+        logger.exception('Error al leer la plantilla de la minuta')
         return None
+    return plantilla.render(DataDocs.from_list(data).data, revision=None if kind else revision)
 
 
-def delete_temp(path: str) -> bool:
+def render_minuta_cached(data: List[str],
+                         kind: bool,
+                         revision: RevisionDocs = None,
+                         cache_config: Optional[tuple] = None) -> Optional[BytesIO]:
     """
-    Elimina un archivo temporal si existe.
+    Obtiene una minuta de la caché de documentos si ya se generó con los mismos datos, revisión y versión de la
+    plantilla, o la genera con render_minuta.
 
     Args:
-        path (str): Ruta del archivo temporal a eliminar.
+        data (List[str]): Lista de datos que serán escritos en el docx.
+        kind (bool): True para Papeles de Trabajo, False para Proyectos de Observaciones.
+        revision (RevisionDocs, optional): Parámetros de observancia de las actividades de fiscalización.
+        cache_config (tuple, optional): Configuración de la caché de documentos, ver get_document_cache.
 
     Returns:
-        bool: True si se eliminó correctamente, False si no se pudo eliminar.
+        Optional[BytesIO]: Contenido del archivo generado, al inicio del buffer, o None si no se pudo generar.
     """
+    if not kind and revision is None:
+        return None
     try:
-        Path(path).unlink()
-        return True
-    except (FileNotFoundError, PermissionError):
-        return False
+        version = file_version(minuta_template(kind))
+    except FileNotFoundError:
+        return None
+    content = render_cached(['minuta', RENDER_VERSION, version, kind, list(data), revision],
+                            lambda: render_minuta(data=data, kind=kind, revision=revision), cache_config)
+    return BytesIO(content) if content is not None else None
 
 
 def minuta(data: List[str],
@@ -230,7 +449,7 @@ def minuta(data: List[str],
            anyo: str = '0000',
            revision: RevisionDocs = None) -> Optional[str]:
     """
-    Genera un archivo docx de tipo minuta de acuerdo con una plantilla predefinida.
+    Genera un archivo docx de tipo minuta con render_minuta_cached y lo guarda en media/minutas si su contenido cambió.
 
     Args:
         data (List[str]): Lista de datos que serán escritos en el docx.
@@ -247,33 +466,11 @@ def minuta(data: List[str],
     Returns:
         Optional[str]: Ruta donde ha sido guardado el archivo final en caso de éxito, o None si no se pudo generar.
     """
-    # Obtén la ruta absoluta al directorio del script
-    script_dir = os.path.dirname(__file__)
-    # Construye la ruta relativa al archivo Word dependiendo de el tipo de archivo
-    rel_path = '../../media/templatedocs/minuta_papeles.docx'
-    papeles_trabajo = os.path.normpath(os.path.join(script_dir, rel_path))
-    rel_path = '../../media/templatedocs/minuta_proyectos.docx'
-    proyectos_observaciones = os.path.normpath(os.path.join(script_dir, rel_path))
-    rel_path = '../../media/minutas'
-    destino = os.path.normpath(os.path.join(script_dir, rel_path))
-    origen = papeles_trabajo if kind else proyectos_observaciones
-
-    if not kind:
-        if revision is None:
-            return None
-    output = f"Minuta - {oic} - M{mes}T{trimestre} - {anyo}.docx"
-    temp_path = generate_temp(origen, destino)
-    if temp_path:
-        doc = Document(temp_path)
-        if not kind:
-            replace_revision(doc, revision)
-        data = DataDocs.from_list(data).data
-        replace_data(doc, data)
-        delete_temp(temp_path)
-        output_path = os.path.join(destino, output)
-        doc.save(output_path)
-        return output_path
-    return None
+    buffer = render_minuta_cached(data=data, kind=kind, revision=revision)
+    if buffer is None:
+        return None
+    output_path, _ = save_generated(buffer.getvalue(), 'minutas', minuta_file_name(oic, mes, trimestre, anyo))
+    return output_path
 
 
 def create_revision(auditoria_values: List[Tuple[str, str]] = None,
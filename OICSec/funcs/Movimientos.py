@@ -0,0 +1,245 @@
+from dataclasses import dataclass, field, replace
+from difflib import SequenceMatcher
+from typing import List, Optional
+
+from django.db import transaction
+
+from OICSec.funcs.Catalogo import resolve_oic
+from OICSec.funcs.Ingesta import AUDITORIA, bulk_create_returning, find_actividades, link_archivos, q_in, \
+    to_field_value
+from OICSec.funcs.PAA import extract_number_and_year
+from OICSec.models import ActividadFiscalizacion, Auditoria, Cedula, ConceptoCedula, Enfoque, Materia, \
+    Programacion, Temporalidad
+
+INCORPORACION = 1
+CANCELACION = 2
+MODIFICACION = 3
+
+# Los archivos de los formatos IMC se guardan en su propia carpeta
+AUDITORIA_IMC = replace(AUDITORIA, media_dir='IMC')
+
+# Catálogos en el orden en que aparecen sus claves en la clave del formato, por ejemplo '1-6-8-10'
+CATALOGOS_CLAVE = [
+    ('id_materia_id', Materia),
+    ('id_programacion_id', Programacion),
+    ('id_enfoque_id', Enfoque),
+    ('id_temporalidad_id', Temporalidad),
+]
+
+
+def get_kind_imc(tipo_str):
+    tipos = {
+        'incorporación': INCORPORACION,
+        'cancelación': CANCELACION,
+        'modificación': MODIFICACION
+    }
+    best_match = None
+    highest_ratio = 0
+    for tipo in tipos:
+        similarity_ratio = SequenceMatcher(None, tipo_str, tipo).ratio()
+        if similarity_ratio > highest_ratio:
+            highest_ratio = similarity_ratio
+            best_match = tipo
+    return tipos[best_match] if best_match else None
+
+
+@dataclass
+class MovimientoIMC:
+    """
+    Clase que almacena un movimiento (incorporación, cancelación o modificación de una auditoría) leído de un
+    formato IMC y el resultado de aplicarlo.
+
+    Atributos:
+        archivo (UploadedFile): Archivo de origen.
+        tipo (int): INCORPORACION, CANCELACION o MODIFICACION.
+        actividad (tuple): Llave (anyo, trimestre, id_oic) de la actividad de fiscalización.
+        numero (int): Número de la auditoría.
+        denominacion (str): Denominación de la auditoría.
+        objetivo (str): Objetivo modificado.
+        alcance (str): Alcance modificado.
+        claves (List[str]): Claves de materia, programación, enfoque y temporalidad.
+        error (str): Descripción del error si el movimiento no se aplicó, o None.
+    """
+    archivo: object
+    tipo: Optional[int] = None
+    actividad: Optional[tuple] = None
+    numero: Optional[int] = None
+    denominacion: Optional[str] = None
+    objetivo: Optional[str] = None
+    alcance: Optional[str] = None
+    claves: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def read_movimiento(archivo, data):
+    """
+    Obtiene el movimiento de un formato IMC a partir de los datos devueltos por read_format_a3.
+
+    Args:
+        archivo (UploadedFile): Archivo de origen.
+        data (dict): Datos extraídos del formato.
+
+    Returns:
+        MovimientoIMC: Movimiento del formato.
+    """
+    oic, _ = resolve_oic(data.get('OIC'))
+    num_year = extract_number_and_year(data.get('Numero'))
+    trimestre = data.get('Año/Trimestre').get('Ejecucion').split('/')[1]
+    return MovimientoIMC(
+        archivo=archivo,
+        tipo=get_kind_imc(data.get('Tipo')),
+        actividad=(
+            to_field_value(ActividadFiscalizacion, 'anyo', num_year['Año']),
+            to_field_value(ActividadFiscalizacion, 'trimestre', trimestre),
+            oic.pk if oic else None,
+        ),
+        numero=to_field_value(Auditoria, 'numero', num_year['Numero']),
+        denominacion=data.get('Denominacion'),
+        objetivo=data.get('Objeto').get('Modificado'),
+        alcance=data.get('Alcance').get('Modificado'),
+        claves=data.get('Clave').split('-'),
+    )
+
+
+def find_catalogos(movimientos):
+    """
+    Busca con una consulta por catálogo los registros de todas las claves de las incorporaciones.
+
+    Args:
+        movimientos (list[MovimientoIMC]): Movimientos del lote.
+
+    Returns:
+        dict: Llave primaria de cada (modelo, clave) encontrada.
+    """
+    claves = {}
+    for movimiento in movimientos:
+        if movimiento.tipo != INCORPORACION:
+            continue
+        for (_, model), clave in zip(CATALOGOS_CLAVE, movimiento.claves):
+            claves.setdefault(model, set()).add(to_field_value(model, 'clave', clave))
+
+    registros = {}
+    for model, valores in claves.items():
+        for pk, clave in model.objects.filter(q_in('clave', valores)).order_by('pk').values_list('pk', 'clave'):
+            registros.setdefault((model, clave), pk)
+    return registros
+
+
+def find_auditorias(movimientos, actividades):
+    """
+    Busca con una sola consulta las auditorías de todos los movimientos.
+
+    Args:
+        movimientos (list[MovimientoIMC]): Movimientos del lote.
+        actividades (dict): Actividades de fiscalización existentes, por (anyo, trimestre, id_oic).
+
+    Returns:
+        dict: Lista de auditorías de cada (anyo, trimestre, id_oic, numero), en orden de creación.
+    """
+    auditorias = {}
+    if not actividades:
+        return auditorias
+
+    ids_actividades = {actividad.pk: key for key, actividad in actividades.items()}
+    query = Auditoria.objects.filter(
+        id_actividad_fiscalizacion__in=list(actividades.values()),
+    ).filter(q_in('numero', {movimiento.numero for movimiento in movimientos})).order_by('pk')
+    for auditoria in query:
+        key = ids_actividades[auditoria.id_actividad_fiscalizacion_id] + (auditoria.numero,)
+        auditorias.setdefault(key, []).append(auditoria)
+    return auditorias
+
+
+def apply_movimientos(movimientos):
+    """
+    Aplica en conjunto los movimientos de varios formatos IMC, en el orden de los archivos.
+
+    Las actividades de fiscalización, auditorías y registros de los catálogos de todos los movimientos se buscan
+    con una consulta por modelo. Cada movimiento se valida contra el estado que dejaron los anteriores del lote (por
+    ejemplo, se puede cancelar una auditoría incorporada en el mismo lote); los que no son válidos se marcan con su
+    error y no modifican nada. Al final, las actividades, cédulas, auditorías y conceptos nuevos se crean con
+    inserciones múltiples, las auditorías modificadas se actualizan con una sola operación y cada archivo se
+    relaciona con su auditoría.
+
+    Args:
+        movimientos (list[MovimientoIMC]): Movimientos del lote; los que ya tienen error se omiten.
+
+    Returns:
+        list[MovimientoIMC]: Los mismos movimientos, con el error de los que no se aplicaron.
+    """
+    validos = [movimiento for movimiento in movimientos if movimiento.error is None]
+    actividades = find_actividades({movimiento.actividad for movimiento in validos})
+    auditorias = find_auditorias(validos, actividades)
+    catalogos = find_catalogos(validos)
+
+    actividades_nuevas = {}
+    nuevas = []
+    modificadas = {}
+    enlaces = {INCORPORACION: [], CANCELACION: [], MODIFICACION: []}
+
+    for movimiento in validos:
+        key = movimiento.actividad + (movimiento.numero,)
+        existentes = auditorias.get(key, [])
+        activa = next((auditoria for auditoria in existentes if auditoria.estado == 1), None)
+
+        if movimiento.tipo == INCORPORACION:
+            if existentes:
+                movimiento.error = ('Ya se encuentra una auditoria presente con los valores recolectados, favor de '
+                                    'verificar.')
+                continue
+            valores = {}
+            for (attname, model), clave in zip(CATALOGOS_CLAVE, movimiento.claves):
+                valores[attname] = catalogos.get((model, to_field_value(model, 'clave', clave)))
+            if len(valores) < len(CATALOGOS_CLAVE) or None in valores.values():
+                movimiento.error = 'No se encontraron la materia, programación, enfoque o temporalidad de la clave'
+                continue
+
+            actividad = actividades.get(movimiento.actividad) or actividades_nuevas.get(movimiento.actividad)
+            if actividad is None:
+                anyo, trimestre, id_oic = movimiento.actividad
+                actividad = ActividadFiscalizacion(anyo=anyo, trimestre=trimestre, id_oic_id=id_oic)
+                actividades_nuevas[movimiento.actividad] = actividad
+            auditoria = Auditoria(denominacion=movimiento.denominacion, numero=movimiento.numero,
+                                  objetivo=movimiento.objetivo, alcance=movimiento.alcance, estado=1, **valores)
+            auditoria.id_actividad_fiscalizacion = actividad
+            auditorias[key] = [auditoria]
+            nuevas.append(auditoria)
+        elif movimiento.tipo in (CANCELACION, MODIFICACION):
+            if activa is None:
+                movimiento.error = 'No hay auditorias activas contenidas con los datos solicitados'
+                continue
+            if movimiento.tipo == CANCELACION:
+                activa.estado = 0
+            else:
+                activa.objetivo = movimiento.objetivo
+                activa.alcance = movimiento.alcance
+            if activa.pk is not None:
+                modificadas[activa.pk] = activa
+            auditoria = activa
+        else:
+            movimiento.error = 'No se reconoce el tipo de movimiento'
+            continue
+
+        enlaces[movimiento.tipo].append((movimiento.archivo, auditoria))
+
+    with transaction.atomic():
+        # Las auditorías toman la llave primaria de su actividad al crearse, aunque la actividad sea nueva
+        bulk_create_returning(ActividadFiscalizacion, list(actividades_nuevas.values()))
+        cedulas = bulk_create_returning(Cedula, [Cedula() for _ in nuevas])
+        for auditoria, cedula in zip(nuevas, cedulas):
+            auditoria.id_cedula = cedula
+        bulk_create_returning(Auditoria, nuevas)
+        ConceptoCedula.objects.bulk_create([
+            ConceptoCedula(celda=str(i), id_cedula=cedula)
+            for cedula in cedulas
+            for i in range(AUDITORIA.num_celdas)
+        ], batch_size=1000)
+        if modificadas:
+            Auditoria.objects.bulk_update(list(modificadas.values()), ['estado', 'objetivo', 'alcance'],
+                                          batch_size=500)
+
+        link_archivos(AUDITORIA_IMC, enlaces[INCORPORACION], archivo_tipo=INCORPORACION)
+        link_archivos(AUDITORIA_IMC, enlaces[CANCELACION], archivo_tipo=CANCELACION, mismo_tipo=True)
+        link_archivos(AUDITORIA_IMC, enlaces[MODIFICACION], archivo_tipo=MODIFICACION, mismo_tipo=True)
+
+    return movimientos
@@ -1,42 +1,70 @@
 import re
-from difflib import SequenceMatcher
 
 import pandas as pd
 from fuzzywuzzy import process
 
+from OICSec.funcs.Catalogo import get_catalogo, clean_oic_text, resolve_oic
+from OICSec.funcs.Lector import read_sheets_streaming
 from OICSec.models import Materia, Programacion, Enfoque, Temporalidad, Oic
 
+CATALOGOS_MPET = {
+    'Materia': Materia,
+    'Programacion': Programacion,
+    'Enfoque': Enfoque,
+    'Temporalidad': Temporalidad
+}
 
-def preprocess_dataframe(df, indices):
+# Versión del resultado de extract_paa; se incrementa al cambiar la extracción para descartar la caché
+EXTRACTOR_VERSION = 1
+# Catálogos de los que depende el resultado de extract_paa
+EXTRACTOR_CATALOGOS = [Oic, *CATALOGOS_MPET.values()]
+# Columnas de la hoja que lee extract_paa_rows
+NUM_COLUMNAS = 10
+
+# Saltos de línea y tabuladores se reemplazan por espacios y se eliminan las comillas dobles
+CLEAN_TEXT_TABLE = str.maketrans({"\n": " ", "\r": " ", "\t": " ", '"': None})
+
+
+def clean_series(series):
     """
-    Realiza operaciones comunes de preprocesamiento en el DataFrame.
+    Limpia de caracteres no deseados todos los textos de una columna con una sola operación, igual que clean_text.
 
     Args:
-        df (pd.DataFrame): DataFrame a preprocesar.
-        indices (pd.Index): Índices de filas válidas a partir de las cuales se realiza el preprocesamiento.
+        series (pd.Series): Columna a limpiar.
 
     Returns:
-        tuple or None: Tupla con el nombre del órgano y el DataFrame preprocesado,
-                       o None si no hay índices válidos.
+        pd.Series: Columna con los textos limpios; los valores que no son texto se conservan. Las columnas que no
+                   son de tipo object se devuelven sin copiarse.
     """
-    if len(indices) == 0:
-        return None
+    if series.dtype != object:
+        return series
+    cleaned = series.str.translate(CLEAN_TEXT_TABLE)
+    # .str devuelve NaN para los valores que no son texto (números, fechas), que se conservan sin cambios
+    return series.where(cleaned.isna(), cleaned)
 
-    organo_index = indices[0] - 1
-    organo = clean_text(str(df.iloc[organo_index, 0]))
-    phrases_to_remove = [
-        'órgano interno de control en',
-        'de la ciudad de méxico'
-    ]
 
-    text = organo.lower()
+def preprocess_dataframe(hoja, skip=0, columns=None):
+    """
+    Realiza operaciones comunes de preprocesamiento en las filas completas de una hoja.
 
-    for phrase in phrases_to_remove:
-        text = re.sub(re.escape(phrase), '', text)
+    Args:
+        hoja (HojaActividades): Filas completas de la hoja a preprocesar.
+        skip (int): Número de filas completas iniciales a descartar (por ejemplo, el encabezado de datos).
+        columns (int, optional): Número de columnas iniciales que lee la extracción; el resto se descarta. Si es
+                                 None se conservan todas.
+
+    Returns:
+        tuple or None: Tupla con el nombre del órgano y el DataFrame preprocesado,
+                       o None si no hay filas válidas.
+    """
+    if len(hoja.filas) <= skip:
+        return None
 
-    organo = text.strip()
+    organo = clean_oic_text(clean_text(str(hoja.anteriores[skip])))
 
-    df = df.apply(lambda x: x.map(clean_text) if x.notnull().all() else x)
+    filas = hoja.filas.iloc[skip:] if columns is None else hoja.filas.iloc[skip:, :columns]
+    df = pd.DataFrame({column: clean_series(filas[column]) for column in filas.columns}, index=filas.index,
+                      copy=False)
 
     return organo, df
 
@@ -60,23 +88,34 @@ def extract_number_and_year(number):
         return {"Numero": None, "Año": None}
 
 
-def extract_ejercicio(alcance):
+def extract_pattern(series, pattern):
     """
-    Extrae el año del alcance proporcionado.
+    Extrae los grupos de una expresión regular sobre una columna completa del DataFrame.
 
     Args:
-        alcance (str): Cadena que contiene el año a extraer.
+        series (pd.Series): Columna de la cual se extraen los valores.
+        pattern (str): Expresión regular con al menos un grupo de captura.
 
     Returns:
-        str or None: Año extraído o None si no se encuentra un año válido.
+        pd.DataFrame: DataFrame con una columna por grupo de captura. Las filas sin coincidencia quedan en None.
     """
-    pattern = r"\b\d{4}\b"
-    match = re.search(pattern, alcance)
+    extracted = series.astype(str).str.extract(pattern, expand=True)
+    return extracted.astype(object).where(extracted.notnull(), None)
 
-    if match:
-        return match.group()
-    else:
-        return None
+
+def map_distinct(series, func):
+    """
+    Aplica una función una sola vez por cada valor distinto de la columna y asigna el resultado a cada fila.
+
+    Args:
+        series (pd.Series): Columna con los valores a transformar.
+        func (callable): Función a aplicar a cada valor distinto.
+
+    Returns:
+        pd.Series: Columna con el resultado de la función para cada fila.
+    """
+    mapping = pd.Series({value: func(value) for value in series.unique()}, dtype=object)
+    return series.map(mapping)
 
 
 def trim_to_number(trimestre):
@@ -98,41 +137,6 @@ def trim_to_number(trimestre):
         return None
 
 
-def extract_mpet(**kwargs):
-    """
-    Extrae objetos de base de datos basados en el tipo de datos proporcionados.
-
-    Args:
-        **kwargs: Diccionario con claves 'Materia', 'Programacion', 'Enfoque', 'Temporalidad'.
-
-    Returns:
-        dict: Diccionario con los valores de los IDs correspondientes a los objetos encontrados en la base de datos.
-              Si no se encuentra un objeto correspondiente, el valor asociado a la clave será None.
-    """
-    mappings = {
-        'Materia': Materia,
-        'Programacion': Programacion,
-        'Enfoque': Enfoque,
-        'Temporalidad': Temporalidad
-    }
-
-    result = {}
-
-    for key, model in mappings.items():
-        value = kwargs.get(key)
-        if value:
-            match = process.extractOne(value, model.objects.all().values_list('tipo', flat=True))
-            obj = model.objects.filter(tipo=match[0]).first() if match else None
-            if obj:
-                result[key] = getattr(obj, model._meta.pk.attname)
-            else:
-                result[key] = None
-        else:
-            result[key] = None
-
-    return result
-
-
 def clean_text(text):
     """
     Limpia una cadena de texto de caracteres no deseados.
@@ -143,40 +147,61 @@ def clean_text(text):
     Returns:
         str: Cadena de texto limpia.
     """
-    cleaned_text = text.replace("\n", " ").replace("\r", " ").replace("\t", " ").replace('"', '')
-    return cleaned_text
+    return text.translate(CLEAN_TEXT_TABLE)
 
 
-def get_best_match(organo, options):
+def get_best_match(organo):
     """
-    Encuentra la mejor coincidencia entre una cadena de texto y una lista de opciones.
+    Encuentra el OIC registrado más parecido al nombre del órgano.
 
     Args:
         organo (str): Cadena de texto para la cual se busca la mejor coincidencia.
-        options (list): Lista de cadenas de texto entre las cuales se busca la mejor coincidencia.
 
     Returns:
-        tuple: Tupla con la mejor coincidencia encontrada y el ratio de similitud más alto.
-               Si no se encuentra ninguna coincidencia suficiente (ratio <= 0.5), retorna (None, 0.0).
+        tuple: Tupla con el nombre del OIC más parecido y su similitud (entre 0 y 1).
+               Si no hay OIC registrados, retorna (None, 0.0).
     """
-    best_match = None
-    highest_ratio = 0.0
+    oic, ratio = resolve_oic(organo)
+    return (oic.nombre, ratio) if oic else (None, 0.0)
 
-    for option in options:
-        ratio = SequenceMatcher(None, organo, option).ratio()
-        if ratio > highest_ratio:
-            highest_ratio = ratio
-            best_match = option
 
-    return best_match, highest_ratio
+def extract_paa_rows(df):
+    """
+    Extrae los datos de las auditorías de una hoja del PAA procesando columna por columna: los números y el
+    ejercicio se obtienen con expresiones regulares sobre la columna completa, y el trimestre y los catálogos se
+    buscan una sola vez por valor distinto.
+
+    Args:
+        df (pd.DataFrame): DataFrame con únicamente las filas de auditorías.
+
+    Returns:
+        list: Lista de diccionarios con los datos de cada auditoría, en el orden de las filas.
+    """
+    numeros = extract_pattern(df.iloc[:, 0], r"^[A-Z]-([\d]{1,4})/(\d{4})")
+    columns = {
+        "Numero": numeros[0],
+        "Año": numeros[1],
+        "Denominacion": df.iloc[:, 1],
+        "Unidad": df.iloc[:, 2],
+        "Objetivo": df.iloc[:, 3],
+        "Alcance": df.iloc[:, 4],
+    }
+    for position, (key, model) in enumerate(CATALOGOS_MPET.items(), start=5):
+        columns[key] = map_distinct(df.iloc[:, position], get_catalogo(model).match)
+    columns["Trimestre"] = map_distinct(df.iloc[:, 9], trim_to_number)
+    columns["Ejercicio"] = extract_pattern(df.iloc[:, 4], r"\b(\d{4})\b")[0]
+
+    return pd.DataFrame(columns).to_dict('records')
 
 
-def extract_paa(path):
+def extract_paa(path, reader=read_sheets_streaming):
     """
     Extrae datos de auditorías de un archivo Excel y los estructura en un formato específico.
 
     Args:
         path (str): Ruta del archivo Excel del cual se extraerán los datos.
+        reader (callable): Función que lee las filas completas de cada hoja (read_sheets_streaming o
+                           read_sheets_pandas).
 
     Returns:
         list or None: Lista con el nombre del Órgano Interno de Control y un diccionario de datos de auditorías
@@ -184,41 +209,20 @@ def extract_paa(path):
     """
     result = []
     try:
-        sheets = pd.read_excel(path, sheet_name=None)
-        for sheet in sheets:
-            df = sheets.get(sheet)
-
-            # Se extraen los indices de las auditorias: los que no tienen ninguna columna vacia
-            auditorias_indices = df[df.notnull().all(axis=1)].index
-
-            organo, df = preprocess_dataframe(df=df, indices=auditorias_indices)
+        # Cada hoja contiene únicamente las filas de auditorias: las que no tienen ninguna columna vacia
+        for hoja in reader(path):
+            preprocessed = preprocess_dataframe(hoja, columns=NUM_COLUMNAS)
+            if preprocessed is None:
+                return None
 
-            # Filtrar filas que no tienen valores nulos
-            df_cleaned = df.dropna()
+            organo, df_cleaned = preprocessed
 
-            best_match, best_ratio = get_best_match(organo, list(Oic.objects.all().values_list('nombre', flat=True)))
+            best_match, best_ratio = get_best_match(organo)
 
             if best_ratio <= 0.3:
                 return None
 
-            dat = [best_match, []]
-
-            # Aplicar las operaciones a cada fila de manera vectorizada
-            df_cleaned.apply(lambda row: dat[1].append({
-                **extract_number_and_year(row.iloc[0]),
-                "Denominacion": row.iloc[1],
-                "Unidad": row.iloc[2],
-                "Objetivo": row.iloc[3],
-                "Alcance": row.iloc[4],
-                **extract_mpet(
-                    Materia=row.iloc[5],
-                    Programacion=row.iloc[6],
-                    Enfoque=row.iloc[7],
-                    Temporalidad=row.iloc[8]
-                ),
-                "Trimestre": trim_to_number(row.iloc[9]),
-                "Ejercicio": extract_ejercicio(row.iloc[4])
-            }), axis=1)
+            dat = [best_match, extract_paa_rows(df_cleaned)]
 
             result.append(dat)
 
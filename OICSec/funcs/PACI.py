@@ -1,55 +1,111 @@
-import logging
-import re
-from difflib import SequenceMatcher
+import threading
+from collections import OrderedDict
 
 import pandas as pd
 from fuzzywuzzy import process
 
-from OICSec.models import Oic, TipoRevision, ProgramaRevision
-from OICSec.funcs.PAA import preprocess_dataframe
+from OICSec.models import TipoRevision, ProgramaRevision, Oic
+from OICSec.funcs.Catalogo import get_catalogo
+from OICSec.funcs.Lector import read_sheets_streaming
+from OICSec.funcs.PAA import preprocess_dataframe, extract_pattern, map_distinct, get_best_match
 
+# Versión del resultado de extract_paci; se incrementa al cambiar la extracción para descartar la caché
+EXTRACTOR_VERSION = 2
+# Catálogos de los que depende el resultado de extract_paci
+EXTRACTOR_CATALOGOS = [Oic, TipoRevision, ProgramaRevision]
+# Columnas de la hoja que lee extract_paci_rows
+NUM_COLUMNAS = 6
 
-def get_object_id_by_text(text, model):
+
+def split_programa_tipo(text):
     """
-    Busca un objeto en el modelo basado en el texto proporcionado y retorna su ID.
+    Separa el texto del programa de un control interno en el tipo y el programa de revisión.
 
     Args:
-        text (str): Texto a buscar.
-        model (Model): Clase del modelo de Django.
+        text (str): Cadena con el formato 'tipo - programa'.
 
     Returns:
-        int or None: ID del objeto encontrado o None si no se encuentra.
+        tuple: Texto del tipo de revisión y texto del programa de revisión (o None si no tiene programa).
     """
-    try:
-        match = process.extractOne(text, model.objects.values_list('tipo', flat=True))
-        if match:
-            obj = model.objects.get(tipo=match[0])
-            return obj.pk
-    except model.DoesNotExist:
-        return None
-    except Exception as e:
-        logging.error(f"Error en búsqueda de {model._meta.verbose_name}: {e}")
+    if "-" in text:
+        tipo_revision_text, programa_revision_text = map(str.strip, text.split("-", 1))
+    else:
+        tipo_revision_text = text.strip()
+        programa_revision_text = None
+    return tipo_revision_text, programa_revision_text
 
-    return None
 
+class RevisionIndex:
+    """
+    Resuelve el texto 'tipo - programa' de los controles internos a las llaves primarias de TipoRevision y
+    ProgramaRevision, usando los índices en memoria de ambos catálogos.
+
+    Los PACI repiten unos cuantos textos en cientos de filas, por lo que cada texto se separa y se califica una sola
+    vez y el resultado se memoriza en una caché LRU que se comparte entre cargas. El índice se descarta cuando
+    cambia cualquiera de los dos catálogos.
 
-def extract_number_and_year(number):
+    Atributos:
+        tipos (CatalogoIndex): Índice de TipoRevision.
+        programas (CatalogoIndex): Índice de ProgramaRevision.
+        cache_size (int): Número máximo de textos memorizados.
     """
-    Extrae el número y el año de una cadena de formato específico.
 
-    Args:
-        number (str): Cadena que contiene el número y el año en el formato especificado.
+    def __init__(self, tipos, programas, cache_size=1024):
+        self.tipos = tipos
+        self.programas = programas
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
 
-    Returns:
-        dict: Diccionario con claves 'Numero' y 'Año'. Si no se encuentra el patrón, retorna None para ambas claves.
+    def resolve(self, text):
+        """
+        Resuelve el texto del programa de un control interno.
+
+        Args:
+            text (str): Cadena con el formato 'tipo - programa'.
+
+        Returns:
+            tuple: ID del tipo de revisión y ID del programa de revisión, o None en cada uno si no se encuentra.
+        """
+        with self._lock:
+            if text in self._cache:
+                self._cache.move_to_end(text)
+                return self._cache[text]
+
+        tipo_revision_text, programa_revision_text = split_programa_tipo(text)
+        result = (self.tipos.match(tipo_revision_text) if tipo_revision_text else None,
+                  self.programas.match(programa_revision_text) if programa_revision_text else None)
+
+        with self._lock:
+            self._cache[text] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+
+_revision_index = None
+_revision_index_lock = threading.Lock()
+
+
+def get_revision_index():
     """
-    pattern = r"([\d]{2})/(\d{4})"
-    match = re.match(pattern, number)
+    Obtiene el índice de tipos y programas de revisión, construyéndolo de nuevo si alguno de los dos catálogos se
+    descartó desde la última vez.
 
-    if match:
-        return {"Numero": match.group(1), "Año": match.group(2)}
-    else:
-        return {"Numero": None, "Año": None}
+    Returns:
+        RevisionIndex: Índice compartido por todo el proceso.
+    """
+    global _revision_index
+    tipos = get_catalogo(TipoRevision)
+    programas = get_catalogo(ProgramaRevision)
+    index = _revision_index
+    if index is None or index.tipos is not tipos or index.programas is not programas:
+        with _revision_index_lock:
+            index = _revision_index
+            if index is None or index.tipos is not tipos or index.programas is not programas:
+                index = RevisionIndex(tipos, programas)
+                _revision_index = index
+    return index
 
 
 def extract_programa_tipo(text):
@@ -62,25 +118,12 @@ def extract_programa_tipo(text):
     Returns:
         dict: Diccionario con las claves 'tipo_revision' y 'programa_revision' y sus respectivos IDs.
     """
-    if "-" in text:
-        tipo_revision_text, programa_revision_text = map(str.strip, text.split("-", 1))
-    else:
-        tipo_revision_text = text.strip()
-        programa_revision_text = None
-
-    result = {
-        "tipo_revision": None,
-        "programa_revision": None
+    tipo_revision, programa_revision = get_revision_index().resolve(text)
+    return {
+        "tipo_revision": tipo_revision,
+        "programa_revision": programa_revision
     }
 
-    if tipo_revision_text:
-        result["tipo_revision"] = get_object_id_by_text(tipo_revision_text, TipoRevision)
-
-    if programa_revision_text:
-        result["programa_revision"] = get_object_id_by_text(programa_revision_text, ProgramaRevision)
-
-    return result
-
 
 def trim_to_number(trimestre):
     """
@@ -101,75 +144,64 @@ def trim_to_number(trimestre):
         return None
 
 
-def get_best_match(organo, options):
+def extract_paci_rows(df):
     """
-    Encuentra la mejor coincidencia entre una cadena de texto y una lista de opciones.
+    Extrae los datos de los controles internos de una hoja del PACI procesando columna por columna: el número se
+    obtiene con una expresión regular sobre la columna completa, y el trimestre y el tipo/programa de revisión se
+    buscan una sola vez por valor distinto.
 
     Args:
-        organo (str): Cadena de texto para la cual se busca la mejor coincidencia.
-        options (list): Lista de cadenas de texto entre las cuales se busca la mejor coincidencia.
+        df (pd.DataFrame): DataFrame con únicamente las filas de controles internos.
 
     Returns:
-        tuple: Tupla con la mejor coincidencia encontrada y el ratio de similitud más alto.
-               Si no se encuentra ninguna coincidencia suficiente (ratio <= 0.5), retorna (None, 0.0).
+        list: Lista de diccionarios con los datos de cada control interno, en el orden de las filas.
     """
-    best_match = None
-    highest_ratio = 0.0
-
-    for option in options:
-        ratio = SequenceMatcher(None, organo, option).ratio()
-        if ratio > highest_ratio:
-            highest_ratio = ratio
-            best_match = option
+    numeros = extract_pattern(df.iloc[:, 0], r"^([\d]{2})/(\d{4})")
+    programas = pd.DataFrame(list(map_distinct(df.iloc[:, 5], extract_programa_tipo)), index=df.index,
+                             columns=["tipo_revision", "programa_revision"])
+    columns = {
+        "Numero": numeros[0],
+        "Año": numeros[1],
+        "Denominacion": df.iloc[:, 1],
+        "Objetivo": df.iloc[:, 2],
+        "Area": df.iloc[:, 3],
+        "Trimestre": map_distinct(df.iloc[:, 4], trim_to_number),
+        "tipo_revision": programas["tipo_revision"],
+        "programa_revision": programas["programa_revision"],
+    }
 
-    return best_match, highest_ratio
+    return pd.DataFrame(columns).to_dict('records')
 
 
-def extract_paci(path):
+def extract_paci(path, reader=read_sheets_streaming):
     """
     Extrae información específica de un archivo Excel de PACI.
 
     Args:
         path (str): Ruta al archivo Excel.
+        reader (callable): Función que lee las filas completas de cada hoja (read_sheets_streaming o
+                           read_sheets_pandas).
 
     Returns: list or None: Lista de datos extraídos del archivo Excel de PACI o None si no se encuentra información
     suficiente.
     """
     result = []
     try:
-        sheets = pd.read_excel(path, sheet_name=None)
-        for sheet in sheets:
-            df = sheets.get(sheet)
-
-            # Se extraen los indices de las filas que no tienen ninguna columna vacia
-            indices = df[df.notnull().all(axis=1)].index
-
-            # Elimina el primer valor de indices que es el encabezado de datos para solo tener los controles
-            if len(indices) > 0:
-                controles_indices = indices.drop(indices[0])
-            else:
+        # Cada hoja contiene únicamente las filas que no tienen ninguna columna vacia
+        for hoja in reader(path):
+            # Se descarta la primera fila que es el encabezado de datos para solo tener los controles
+            preprocessed = preprocess_dataframe(hoja, skip=1, columns=NUM_COLUMNAS)
+            if preprocessed is None:
                 return None
 
-            organo, df = preprocess_dataframe(df=df, indices=controles_indices)
+            organo, df_cleaned = preprocessed
 
-            # Filtrar filas que no tienen valores nulos
-            df_cleaned = df.dropna().iloc[1:]
-
-            best_match, best_ratio = get_best_match(organo, list(Oic.objects.all().values_list('nombre', flat=True)))
+            best_match, best_ratio = get_best_match(organo)
 
             if best_ratio <= 0.3:
                 return None
 
-            dat = [best_match, []]
-
-            df_cleaned.apply(lambda row: dat[1].append({
-                **extract_number_and_year(row.iloc[0]),
-                "Denominacion": row.iloc[1],
-                "Objetivo": row.iloc[2],
-                "Area": row.iloc[3],
-                "Trimestre": trim_to_number(row.iloc[4]),
-                **extract_programa_tipo(row.iloc[5])
-            }), axis=1)
+            dat = [best_match, extract_paci_rows(df_cleaned)]
 
             result.append(dat)
 
@@ -1,61 +1,121 @@
+import logging
 import re
 from difflib import SequenceMatcher
 
 import docx
+import numpy as np
 import pandas as pd
 from fuzzywuzzy import process
+from rapidfuzz import fuzz
+from rapidfuzz.process import cdist
 
+from OICSec.funcs.LectorDocx import read_docx, rewind
 
-def extract_data_from_df(df, headers, threshold=0.75):
-    """
-    Extrae datos de un DataFrame basado en headers específicos y un umbral de similitud.
+# Versión del resultado de extract_pint; se incrementa al cambiar la extracción para descartar la caché
+EXTRACTOR_VERSION = 2
 
-    Args:
-        df (pd.DataFrame): DataFrame que contiene los datos.
-        headers (list): Lista de encabezados a buscar.
-        threshold (float): Umbral de similitud para comparación de cadenas.
+logger = logging.getLogger(__name__)
 
-    Returns:
-        dict: Diccionario con los datos extraídos.
+# Tablas del documento que utiliza la extracción: el encabezado, las secciones A) a E) y la fuerza de trabajo
+NUM_TABLAS = 7
+
+
+class LabelIndex:
+    """
+    Índice de las etiquetas de una tabla del PINT (por ejemplo 'Ente Público' o 'Supervisión'), cuyo valor está en la
+    celda de la derecha.
+
+    El texto de las celdas se normaliza una sola vez y todos los encabezados se califican contra todas las celdas
+    distintas con rapidfuzz en una sola operación. Una celda corresponde a un encabezado si su similitud supera el
+    umbral o si uno de los dos textos contiene al otro; si varias corresponden, se toma la primera recorriendo la
+    tabla por filas.
+
+    Atributos:
+        values (np.ndarray): Valores de la tabla.
+        labels (list[str]): Texto en minúsculas de cada celda distinta no vacía.
+        positions (list[tuple]): Fila y columna de la primera aparición de cada texto de 'labels'.
     """
-    data = {}
 
-    for header in headers:
-        for index, row in df.iterrows():
-            for cell in row:
-                temp1 = header.lower()
-                temp2 = cell.lower()
-                if compare_strings(temp1, temp2, threshold):
-                    header_index = row.tolist().index(cell)
-                    data[header] = row[header_index + 1]
-                    break
-            else:
+    def __init__(self, df):
+        self.values = df.values
+        self.labels = []
+        self.positions = []
+        seen = set()
+        for row_index, row in enumerate(self.values):
+            for column_index, cell in enumerate(row):
+                label = str(cell).lower() if cell is not None else ''
+                if label and label not in seen:
+                    seen.add(label)
+                    self.labels.append(label)
+                    self.positions.append((row_index, column_index))
+
+    def find(self, headers, threshold=0.75):
+        """
+        Busca la posición de la celda de cada encabezado.
+
+        Args:
+            headers (list): Lista de encabezados a buscar.
+            threshold (float): Umbral de similitud para comparación de cadenas.
+
+        Returns:
+            dict: Fila y columna de la celda de cada encabezado encontrado.
+        """
+        if not headers or not self.labels:
+            return {}
+
+        queries = [header.lower() for header in headers]
+        scores = cdist(queries, self.labels, scorer=fuzz.ratio, processor=None)
+        matches = scores > threshold * 100
+        for row, query in enumerate(queries):
+            for column, label in enumerate(self.labels):
+                if not matches[row, column] and (query in label or label in query):
+                    matches[row, column] = True
+
+        found = {}
+        for row, header in enumerate(headers):
+            candidates = np.flatnonzero(matches[row])
+            if len(candidates):
+                # Las etiquetas están en orden de aparición, por lo que la primera corresponde a la primera celda
+                found[header] = self.positions[candidates[0]]
+        return found
+
+    def extract(self, headers, threshold=0.75):
+        """
+        Obtiene el valor a la derecha de la celda de cada encabezado.
+
+        Args:
+            headers (list): Lista de encabezados a buscar.
+            threshold (float): Umbral de similitud para comparación de cadenas.
+
+        Returns:
+            dict: Valor de cada encabezado, o '' si no se encuentra en la tabla.
+        """
+        positions = self.find(headers, threshold)
+        data = {}
+        for header in headers:
+            if header not in positions:
+                data[header] = ''
                 continue
-            break
-        else:
-            data[header] = ''
-
-    return data
+            row, column = positions[header]
+            if column + 1 >= self.values.shape[1]:
+                raise ValueError(f"El encabezado '{header}' no tiene un valor a su derecha")
+            data[header] = self.values[row, column + 1]
+        return data
 
 
-def compare_strings(str1, str2, threshold=0.75):
+def extract_data_from_df(df, headers, threshold=0.75):
     """
-    Compara dos cadenas y devuelve True si la similitud es mayor que el umbral dado.
+    Extrae datos de un DataFrame basado en headers específicos y un umbral de similitud.
 
     Args:
-        str1 (str): Primera cadena.
-        str2 (str): Segunda cadena.
-        threshold (float): Umbral de similitud.
+        df (pd.DataFrame): DataFrame que contiene los datos.
+        headers (list): Lista de encabezados a buscar.
+        threshold (float): Umbral de similitud para comparación de cadenas.
 
     Returns:
-        bool: True si la similitud es mayor que el umbral, False en caso contrario.
+        dict: Diccionario con los datos extraídos.
     """
-    # Verifica que ambas cadenas no estén vacías
-    if not str1 or not str2:
-        return False
-
-    # Compara las cadenas
-    return SequenceMatcher(None, str1, str2).ratio() > threshold or str1 in str2 or str2 in str1
+    return LabelIndex(df).extract(headers, threshold)
 
 
 def trim_to_number(trimestre):
@@ -198,47 +258,80 @@ def extract_fuerza(df):
     return data
 
 
-def extract_pint(path):
+def extract_pint_data(text, dfs):
     """
-    Extrae la información principal del documento especificado.
+    Extrae la información principal del PINT a partir del primer párrafo y de las tablas del documento.
 
     Args:
-        path (str): Ruta del archivo .docx.
+        text (str): Texto del primer párrafo del documento.
+        dfs (list): Lista de DataFrames que representan las tablas.
 
     Returns:
-        dict: Diccionario con los datos extraídos.
+        dict or None: Diccionario con los datos extraídos, o None si el documento no es un PINT.
+    """
+    title = 'Planeación considerada para la ejecución de la intervención'
+    ratio = SequenceMatcher(None, text, title).ratio()
+
+    if ratio < 0.75:
+        return None
+
+    if not dfs:
+        return None
+
+    data = extract_header(dfs[0])
+    data.update(extract_tables(dfs))
+    if len(dfs) > 6:
+        data.update(extract_fuerza(dfs[6]))
+
+    return data
+
+
+def extract_pint_docx(path):
+    """
+    Extrae la información principal del documento cargándolo con python-docx.
+
+    Args:
+        path (str or file): Ruta o archivo .docx.
+
+    Returns:
+        dict or None: Diccionario con los datos extraídos, o None si el documento no es un PINT.
     """
     try:
         document = docx.Document(path)
         text = document.paragraphs[0].text
-        title = 'Planeación considerada para la ejecución de la intervención'
-        ratio = SequenceMatcher(None, text, title).ratio()
-
-        if ratio < 0.75:
-            return None
-
-        tables = document.tables
         dfs = []
 
-        for table in tables:
+        for table in document.tables:
             data = []
             for row in table.rows:
-                text = [cell.text for cell in row.cells]
-                data.append(text)
-            df = pd.DataFrame(data)
-            dfs.append(df)
+                data.append([cell.text for cell in row.cells])
+            dfs.append(pd.DataFrame(data))
 
-        if not dfs:
-            return None
+        return extract_pint_data(text, dfs)
+    except Exception:
+        return None
 
-        data = extract_header(dfs[0])
-        data.update(extract_tables(dfs))
-        if len(dfs) > 6:
-            data.update(extract_fuerza(dfs[6]))
 
-        return data
+def extract_pint(path):
+    """
+    Extrae la información principal del documento especificado.
+
+    El documento se lee directamente de su XML, convirtiendo únicamente las tablas que utiliza la extracción; si no
+    tiene la estructura esperada se lee con python-docx.
+
+    Args:
+        path (str or file): Ruta o archivo .docx.
+
+    Returns:
+        dict: Diccionario con los datos extraídos.
+    """
+    try:
+        contenido = read_docx(path, max_tablas=NUM_TABLAS)
+        return extract_pint_data(contenido.primer_parrafo, [pd.DataFrame(tabla) for tabla in contenido.tablas])
     except Exception as e:
-        return None
+        logger.warning(f'No se pudo leer el PINT desde su XML, se lee con python-docx: {e}')
+        rewind(path)
+        return extract_pint_docx(path)
 
 
 def extract_header(df):
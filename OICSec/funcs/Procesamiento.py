@@ -0,0 +1,262 @@
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from itertools import chain, islice
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import django
+from django.conf import settings
+
+from OICSec.funcs import IMC, PAA, PACI, PINT
+from OICSec.funcs.Cache import get_parse_cache
+from OICSec.funcs.Catalogo import snapshot_catalogos, install_catalogos
+
+# Catálogos que se envían a los procesos para que la extracción no consulte la base de datos: todos los que declaran
+# las funciones de extracción en EXTRACTOR_CATALOGOS, los mismos con los que ParseCache calcula la huella de la llave
+CATALOGOS_EXTRACCION = list(dict.fromkeys(
+    model for module in (PAA, PACI, PINT, IMC) for model in getattr(module, 'EXTRACTOR_CATALOGOS', [])
+))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ResultadoArchivo:
+    """
+    Clase que almacena el resultado de extraer los datos de un archivo subido.
+
+    Atributos:
+        archivo (UploadedFile): Archivo subido.
+        data (Any): Datos devueltos por la función de extracción, o None si el archivo no se pudo procesar.
+        error (str, optional): Descripción del error si la función de extracción lanzó una excepción.
+    """
+    archivo: Any
+    data: Any = None
+    error: Optional[str] = None
+
+
+_executor = None
+_executor_workers = None
+_executor_lock = threading.Lock()
+
+
+def get_parse_workers():
+    """
+    Obtiene el número de procesos para extraer los archivos, configurable con PARSE_WORKERS en settings.
+
+    Returns:
+        int: Número de procesos; 0 o 1 indica que la extracción se hace en el proceso actual.
+    """
+    workers = getattr(settings, 'PARSE_WORKERS', None)
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+    return workers
+
+
+def parse_content(func, name, content, catalogos):
+    """
+    Extrae los datos del contenido de un archivo, dentro de un proceso del pool o en el proceso actual.
+
+    Args:
+        func (callable): Función de extracción (extract_paa, extract_paci, extract_pint o read_format_a3).
+        name (str): Nombre del archivo.
+        content (bytes): Contenido del archivo.
+        catalogos (dict): Índices de los catálogos del proceso principal, o None para usar los del proceso actual.
+
+    Returns:
+        tuple: Datos devueltos por la función de extracción y la descripción del error si lanzó una excepción, o
+               None.
+    """
+    if catalogos is not None:
+        install_catalogos(catalogos)
+    archivo = io.BytesIO(content)
+    archivo.name = name
+    try:
+        return func(archivo), None
+    except Exception as e:
+        return None, str(e)
+
+
+def get_executor(workers):
+    """
+    Obtiene el pool de procesos compartido, creándolo la primera vez, después de que se descartó por dejar de
+    funcionar o si cambió el número de procesos.
+
+    Args:
+        workers (int): Número de procesos del pool.
+
+    Returns:
+        ProcessPoolExecutor: Pool de procesos.
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is not None and _executor_workers != workers:
+            # Las tareas ya enviadas al pool anterior terminan antes de que se cierre
+            _executor.shutdown(wait=False)
+            _executor = None
+        if _executor is None:
+            # 'spawn' evita heredar las conexiones a la base de datos y los hilos del servidor; cada proceso
+            # inicializa Django antes de recibir archivos
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=django.setup)
+            _executor_workers = workers
+        return _executor
+
+
+def discard_executor(executor):
+    """
+    Descarta un pool de procesos que dejó de funcionar, para que la siguiente llamada a get_executor cree otro.
+
+    Args:
+        executor (ProcessPoolExecutor): Pool que lanzó BrokenProcessPool.
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+            _executor_workers = None
+    executor.shutdown(wait=False)
+
+
+def map_ordered(func, tareas):
+    """
+    Ejecuta una función con los argumentos de cada tarea, repartiéndolas en el pool de procesos si hay más de una.
+    Solo se mantienen en memoria los resultados que se están calculando y los que esperan su turno para respetar el
+    orden; si el pool deja de funcionar, las tareas restantes se ejecutan en el proceso actual.
+
+    Las tareas se toman del iterable conforme se envían al pool, así que pueden generarse al vuelo para no tener
+    en memoria los argumentos de todas.
+
+    Args:
+        func (callable): Función de nivel de módulo, para poder enviarla a los procesos.
+        tareas (Iterable[tuple]): Argumentos de cada llamada.
+
+    Yields:
+        tuple: Argumentos y resultado de cada tarea, en el orden recibido.
+    """
+    workers = get_parse_workers()
+    siguientes = iter(tareas)
+    primeras = list(islice(siguientes, 2))
+    siguientes = chain(primeras, siguientes)
+    if len(primeras) <= 1 or workers <= 1:
+        for tarea in siguientes:
+            yield tarea, func(*tarea)
+        return
+
+    executor = get_executor(workers)
+    pendientes = deque()
+    while True:
+        while executor is not None and len(pendientes) < workers * 2:
+            tarea = next(siguientes, None)
+            if tarea is None:
+                break
+            try:
+                pendientes.append((tarea, executor.submit(func, *tarea)))
+            except BrokenProcessPool:
+                discard_executor(executor)
+                executor = None
+                pendientes.append((tarea, None))
+        if not pendientes:
+            if executor is not None:
+                return
+            # Sin pool, las tareas restantes se ejecutan en el proceso actual
+            tarea = next(siguientes, None)
+            if tarea is None:
+                return
+            pendientes.append((tarea, None))
+
+        tarea, future = pendientes.popleft()
+        resultado = None
+        if future is not None:
+            try:
+                resultado = future.result()
+            except BrokenProcessPool:
+                logger.warning('El pool de procesos dejó de funcionar; las tareas restantes se ejecutan en el proceso '
+                               'actual')
+                if executor is not None:
+                    discard_executor(executor)
+                executor = None
+                future = None
+        if future is None:
+            resultado = func(*tarea)
+        yield tarea, resultado
+
+
+def read_content(archivo):
+    """
+    Lee el contenido completo de un archivo subido y regresa el cursor al inicio.
+
+    Args:
+        archivo (UploadedFile): Archivo subido.
+
+    Returns:
+        bytes: Contenido del archivo.
+    """
+    archivo.seek(0)
+    content = archivo.read()
+    archivo.seek(0)
+    return content
+
+
+def parse_files(func, archivos):
+    """
+    Extrae los datos de varios archivos subidos. Los archivos idénticos a uno ya procesado se toman de la caché de
+    resultados; si quedan más de un archivo por procesar se reparten en un pool de procesos. Los resultados se
+    regresan siempre en el mismo orden que los archivos, para que la escritura en la base de datos se haga en el
+    proceso principal en un orden determinista.
+
+    Args:
+        func (callable): Función de extracción (extract_paa, extract_paci, extract_pint o read_format_a3).
+        archivos (list[UploadedFile]): Archivos subidos.
+
+    Returns:
+        list[ResultadoArchivo]: Resultado de cada archivo, en el orden recibido.
+    """
+    cache = get_parse_cache()
+    resultados = [None] * len(archivos)
+    keys = [None] * len(archivos)
+    pendientes = []
+    for index, archivo in enumerate(archivos):
+        if cache is not None:
+            keys[index] = cache.key(func, read_content(archivo))
+            hit, data = cache.get(keys[index])
+            if hit:
+                resultados[index] = ResultadoArchivo(archivo=archivo, data=data)
+                continue
+        pendientes.append(index)
+
+    procesados = parse_uncached(func, [archivos[index] for index in pendientes])
+    for index, resultado in zip(pendientes, procesados):
+        resultados[index] = resultado
+        # Los errores inesperados no se guardan, para volver a intentarlo en la siguiente carga
+        if cache is not None and resultado.error is None:
+            cache.set(keys[index], resultado.data)
+    return resultados
+
+
+def parse_uncached(func, archivos):
+    """
+    Extrae los datos de varios archivos con map_ordered, repartiéndolos en el pool de procesos si hay más de uno.
+    El contenido de cada archivo se lee hasta que se envía al pool.
+
+    Args:
+        func (callable): Función de extracción.
+        archivos (list[UploadedFile]): Archivos subidos.
+
+    Returns:
+        list[ResultadoArchivo]: Resultado de cada archivo, en el orden recibido.
+    """
+    # Los procesos del pool reciben los catálogos del proceso principal; en el proceso actual ya están disponibles
+    paralelo = len(archivos) > 1 and get_parse_workers() > 1
+    catalogos = snapshot_catalogos(CATALOGOS_EXTRACCION) if paralelo else None
+    tareas = ((func, archivo.name, read_content(archivo), catalogos) for archivo in archivos)
+    return [
+        ResultadoArchivo(archivo=archivo, data=data, error=error)
+        for archivo, (_, (data, error)) in zip(archivos, map_ordered(parse_content, tareas))
+    ]
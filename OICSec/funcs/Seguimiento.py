@@ -0,0 +1,653 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from django.db.models import Q
+from django.utils import timezone
+from num2words import num2words
+
+from OICSec.funcs.Actividad import get_actividades
+from OICSec.funcs.Archivos import stream_zip
+from OICSec.funcs.Cache import document_cache_config
+from OICSec.funcs.Minuta import RevisionDocs, create_revision, minuta_file_name, render_minuta_cached
+from OICSec.funcs.Procesamiento import map_ordered
+from OICSec.models import Auditoria, CargoPersonal, ConceptoMinuta, ControlInterno, Intervencion, Minuta, \
+    MinutaPersonal, SeccionMinuta
+
+MESES_WORD = {
+    1: "enero", 2: "febrero", 3: "marzo", 4: "abril", 5: "mayo", 6: "junio", 7: "julio", 8: "agosto",
+    9: "septiembre", 10: "octubre", 11: "noviembre", 12: "diciembre"
+}
+
+POSICION_WORD = {
+    1: 'primer',
+    2: 'segundo',
+    3: 'tercer',
+    4: 'cuarto'
+}
+
+# Estatus de los conceptos de la minuta como se escriben en el documento
+ESTADOS_CONCEPTO = {
+    '0': 'Cumple',
+    '1': 'No cumple',
+    '2': 'No aplica',
+    '3': 'Pendiente'
+}
+
+# Tipo de concepto, prefijo de los campos del formulario y número de conceptos de cada tabla de revisión
+TIPOS_CONCEPTO = [(1, 'A', 20), (2, 'I', 25), (3, 'C', 23)]
+CONCEPTOS_POR_TIPO = {tipo: count for tipo, _, count in TIPOS_CONCEPTO}
+
+# Tipo de personal de MinutaPersonal, con la forma en que se nombra en los errores
+FIRMANTES = {
+    1: 'director de coordinación',
+    2: 'JUD de coordinación',
+    3: 'titular del OIC',
+    4: 'personal del OIC'
+}
+
+REPORTE_NOMBRE = 'Reporte.txt'
+
+
+def limpiar_cadena(cadena):
+    """
+    Elimina el texto entre paréntesis y los espacios repetidos de una cadena.
+
+    Args:
+        cadena (str): Cadena original.
+
+    Returns:
+        str: Cadena limpia.
+    """
+    patron_parentesis = r'\([^)]*\)'
+    cadena_sin_parentesis = re.sub(patron_parentesis, '', cadena)
+    cadena_limpia = re.sub(r'\s+', ' ', cadena_sin_parentesis).strip()
+    return cadena_limpia
+
+
+def get_actividades_lista(actividades):
+    """
+    Obtiene la redacción de las actividades de fiscalización de la minuta.
+
+    Args:
+        actividades (list[Actividad]): Actividades del periodo.
+
+    Returns:
+        tuple: Lista de las actividades y texto con el número de actividades que se están ejecutando.
+    """
+    lista_actividades = ''
+    numero_actividades = len(actividades)
+    for n in range(numero_actividades):
+        tipo = actividades[n].tipo
+        denominacion = actividades[n].denominacion
+        numero = actividades[n].numero
+        articulo = "el" if tipo == "control interno" else "la"
+        articulo_final = "o" if tipo == "control interno" else "a"
+        lista_actividades += f"{articulo} {tipo} número {numero} denominad{articulo_final} {denominacion}"
+        if n == numero_actividades - 2:
+            lista_actividades += " y "
+        elif n < numero_actividades - 2:
+            lista_actividades += ", "
+    lista_actividades += " misma"
+    if numero_actividades > 1:
+        lista_actividades += "s que se ejecutan"
+    else:
+        lista_actividades += " que se ejecuta"
+    text_numero_actividades = 'está'
+    if numero_actividades > 1:
+        text_numero_actividades += 'n'
+        numero_text = num2words(numero_actividades, lang='es')
+    else:
+        numero_text = 'una'
+    text_numero_actividades += f' ejecutando {numero_text} actividad'
+    if numero_actividades > 1:
+        text_numero_actividades += 'es'
+    return lista_actividades, text_numero_actividades
+
+
+def hora_local(valor):
+    """
+    Obtiene una fecha y hora guardada en la zona horaria local.
+
+    Args:
+        valor (datetime): Fecha y hora guardada.
+
+    Returns:
+        datetime: Fecha y hora local.
+    """
+    return timezone.localtime(valor) if timezone.is_aware(valor) else valor
+
+
+def build_minuta_data(fiscalizacion, minuta, mes, actividades, firmantes, cargos):
+    """
+    Obtiene los datos P01-P34 que se escriben en la minuta de un mes.
+
+    Args:
+        fiscalizacion (ActividadFiscalizacion): Actividad de fiscalización, con su OIC y la dirección del OIC.
+        minuta (Minuta): Minuta con hora de inicio y fin.
+        mes (int): Mes de la minuta dentro del trimestre (1, 2 o 3).
+        actividades (list[Actividad]): Actividades del periodo.
+        firmantes (dict): Personal, con su persona, de cada tipo de personal de MinutaPersonal.
+        cargos (dict): Nombre del cargo de cada personal, por su llave primaria.
+
+    Returns:
+        list: Datos de la minuta, en el orden de los marcadores de la plantilla.
+    """
+    time_inicio = hora_local(minuta.inicio)
+    time_fin = hora_local(minuta.fin)
+    director, judc, titular, personal = (firmantes[tipo] for tipo in FIRMANTES)
+    lista_actividades, text_numero_actividades = get_actividades_lista(actividades)
+
+    data = [
+        num2words(time_inicio.hour, lang='es'),  # P01
+        num2words(time_inicio.day, lang='es'),  # P02
+        MESES_WORD.get(time_inicio.month),  # P03
+        num2words(time_inicio.year, lang='es'),  # P04
+        "el/la",  # P05
+        director.id_persona.honorifico,  # P06
+        f'{director.id_persona.nombre} {director.id_persona.apellido}',  # P07
+        cargos.get(director.pk),  # P08
+        "el/la",  # P09
+        judc.id_persona.honorifico,  # P10
+        f'{judc.id_persona.nombre} {judc.id_persona.apellido}',  # P11
+        cargos.get(judc.pk),  # P12
+        "el/la",  # P13
+        titular.id_persona.honorifico,  # P14
+        f'{titular.id_persona.nombre} {titular.id_persona.apellido}',  # P15
+        cargos.get(titular.pk),  # P16
+        "el/la",  # P17
+        personal.id_persona.honorifico,  # P18
+        f'{personal.id_persona.nombre} {personal.id_persona.apellido}',  # P19
+        cargos.get(personal.pk),  # P20
+        num2words(mes, lang='es'),  # P21
+        POSICION_WORD.get(fiscalizacion.trimestre),  # P22
+        num2words(fiscalizacion.anyo if fiscalizacion.anyo else 0, lang='es'),  # P23
+        limpiar_cadena(fiscalizacion.id_oic.nombre),  # P24
+        text_numero_actividades,  # P25
+        lista_actividades,  # P26
+        num2words(time_fin.hour, lang='es'),  # P27
+        num2words(time_fin.day, lang='es').upper(),  # P28
+        MESES_WORD.get(time_fin.month).upper(),  # P29
+        time_fin.year  # P30
+    ]
+
+    # Caso de mes 1 y 2
+    if mes == 1:
+        data.append('DOCUMENTACIÓN')  # P31
+        data.append('la documentacion')  # P32
+    elif mes == 2:
+        data.append('PAPELES DE TRABAJO')  # P31
+        data.append('los papeles de trabajo')  # P32
+    elif mes == 3:
+        # P31 y P32 no existen en el mes 3
+        data.append('')
+        data.append('')
+
+    data.append(limpiar_cadena(fiscalizacion.id_oic.nombre).upper())  # P33
+    data.append(fiscalizacion.id_oic.id_direccion.direccion)  # P34
+
+    return data
+
+
+def valores_seccion(seccion, tipo):
+    """
+    Obtiene el estatus y comentario de cada clave de una sección de conceptos de la minuta.
+
+    Args:
+        seccion (SeccionMinuta): Sección guardada, o None si el tipo no tiene sección.
+        tipo (int): Tipo de concepto de la sección.
+
+    Returns:
+        list[list]: Estatus y comentario de cada clave a partir de la clave 1; las claves sin valor guardado quedan
+                    vacías.
+    """
+    count = CONCEPTOS_POR_TIPO[tipo]
+    valores = [list(valor) for valor in seccion.conceptos[:count]] if seccion is not None else []
+    valores.extend([None, None] for _ in range(count - len(valores)))
+    return valores
+
+
+def load_secciones(minutas):
+    """
+    Carga con una sola consulta las secciones de conceptos de varias minutas.
+
+    Args:
+        minutas (list[int]): Llaves primarias de las minutas.
+
+    Returns:
+        dict: SeccionMinuta de cada tipo de concepto, por llave primaria de la minuta.
+    """
+    secciones = {}
+    for seccion in SeccionMinuta.objects.filter(id_minuta__in=minutas).order_by('pk'):
+        secciones.setdefault(seccion.id_minuta_id, {})[seccion.tipo_concepto] = seccion
+    return secciones
+
+
+def save_secciones(secciones):
+    """
+    Guarda los conceptos de varias secciones de minuta con una sola sentencia, sin importar cuántos conceptos
+    cambiaron en cada una.
+
+    Args:
+        secciones (list[SeccionMinuta]): Secciones con sus conceptos modificados.
+    """
+    if secciones:
+        SeccionMinuta.objects.bulk_update(secciones, ['conceptos'])
+
+
+def build_revision(secciones, tipos):
+    """
+    Obtiene los datos de revisión de la minuta del mes 3 a partir de sus secciones de conceptos guardadas.
+
+    Args:
+        secciones (dict): SeccionMinuta de cada tipo de concepto.
+        tipos (set[int]): Tipos de concepto de las actividades que tiene el periodo.
+
+    Returns:
+        RevisionDocs: Estatus y comentario de cada concepto de los tipos indicados.
+    """
+    valores = {}
+    for tipo, _, _ in TIPOS_CONCEPTO:
+        if tipo not in tipos:
+            continue
+        valores[tipo] = [
+            (ESTADOS_CONCEPTO.get(str(estado), '') if estado is not None else '', comentario if comentario else '')
+            for estado, comentario in valores_seccion(secciones.get(tipo), tipo)
+        ]
+    return create_revision(
+        auditoria_values=valores.get(1),
+        intervencion_values=valores.get(2),
+        control_interno_values=valores.get(3)
+    )
+
+
+def load_actividades(fiscalizaciones):
+    """
+    Busca las auditorías activas, intervenciones y controles internos de varias actividades de fiscalización, con
+    una consulta por modelo y sus relaciones ya cargadas.
+
+    Args:
+        fiscalizaciones (list[int]): Llaves primarias de las actividades de fiscalización.
+
+    Returns:
+        dict: Lista de instancias de cada (id de la actividad de fiscalización, tipo de concepto), en orden de
+              creación; los tipos sin actividades no se incluyen.
+    """
+    instancias = {}
+    consultas = [
+        (1, Auditoria.objects.filter(estado=1).select_related('id_actividad_fiscalizacion')),
+        (2, Intervencion.objects.select_related('id_actividad_fiscalizacion', 'id_tipo_intervencion')),
+        (3, ControlInterno.objects.select_related('id_actividad_fiscalizacion')),
+    ]
+    for tipo, query in consultas:
+        for instancia in query.filter(id_actividad_fiscalizacion__in=fiscalizaciones).order_by('pk'):
+            instancias.setdefault((instancia.id_actividad_fiscalizacion_id, tipo), []).append(instancia)
+    return instancias
+
+
+def tipos_periodo(instancias, fiscalizacion_id):
+    """
+    Obtiene los tipos de concepto de las actividades de una actividad de fiscalización.
+
+    Args:
+        instancias (dict): Resultado de load_actividades.
+        fiscalizacion_id (int): Llave primaria de la actividad de fiscalización.
+
+    Returns:
+        set[int]: Tipos de concepto (1: auditoría, 2: intervención, 3: control interno) con actividades.
+    """
+    return {tipo for tipo, _, _ in TIPOS_CONCEPTO if (fiscalizacion_id, tipo) in instancias}
+
+
+def actividades_periodo(instancias, fiscalizacion_id):
+    """
+    Obtiene las actividades de una actividad de fiscalización como se muestran y se escriben en la minuta.
+
+    Args:
+        instancias (dict): Resultado de load_actividades.
+        fiscalizacion_id (int): Llave primaria de la actividad de fiscalización.
+
+    Returns:
+        list[Actividad]: Auditorías, intervenciones y controles internos, en ese orden.
+    """
+    return get_actividades(*(instancias.get((fiscalizacion_id, tipo), []) for tipo, _, _ in TIPOS_CONCEPTO))
+
+
+@dataclass
+class MinutaLote:
+    """
+    Clase que almacena los datos de la minuta de un periodo dentro de una generación en lote.
+
+    Atributos:
+        fiscalizacion (ActividadFiscalizacion): Actividad de fiscalización del periodo.
+        nombre (str): Nombre del archivo de la minuta.
+        data (list): Datos P01-P34 de la minuta, o None si no se puede generar.
+        kind (bool): True para Papeles de Trabajo (meses 1 y 2), False para Proyectos de Observaciones (mes 3).
+        revision (RevisionDocs): Datos de revisión del mes 3.
+        error (str): Descripción del error si la minuta no se pudo generar, o None.
+    """
+    fiscalizacion: Any
+    nombre: str
+    data: Optional[list] = None
+    kind: bool = True
+    revision: Optional[RevisionDocs] = None
+    error: Optional[str] = None
+
+
+def load_minutas(actividades, mes):
+    """
+    Carga los datos de las minutas de un mes de varias actividades de fiscalización, con una consulta por modelo:
+    auditorías, intervenciones y controles internos, minutas, personal que firma, cargos y, en el mes 3, conceptos.
+
+    Las minutas se llenan con lo guardado en la base de datos, igual que si se enviara el formulario de
+    minuta_mes_view sin cambios; no se modifica ningún registro. Los periodos cuya minuta no se ha capturado o le
+    falta información se regresan con su error.
+
+    Args:
+        actividades (list[ActividadFiscalizacion]): Actividades de fiscalización, con su OIC y la dirección del OIC.
+        mes (int): Mes de la minuta dentro del trimestre (1, 2 o 3).
+
+    Returns:
+        list[MinutaLote]: Minuta de cada actividad de fiscalización, en el orden recibido.
+    """
+    fiscalizaciones = [actividad.pk for actividad in actividades]
+    instancias = load_actividades(fiscalizaciones)
+
+    minutas = {}
+    for minuta in Minuta.objects.filter(id_actividad_fiscalizacion__in=fiscalizaciones, mes=mes).order_by('pk'):
+        minutas.setdefault(minuta.id_actividad_fiscalizacion_id, minuta)
+    ids_minutas = [minuta.pk for minuta in minutas.values()]
+
+    firmantes = {}
+    query = MinutaPersonal.objects.filter(id_minuta__in=ids_minutas).select_related('id_personal__id_persona')
+    for minuta_personal in query.order_by('pk'):
+        firmantes.setdefault((minuta_personal.id_minuta_id, minuta_personal.tipo_personal), minuta_personal.id_personal)
+
+    cargos = {}
+    query = CargoPersonal.objects.filter(
+        id_personal__in={personal.pk for personal in firmantes.values() if personal is not None})
+    for cargo in query.order_by('pk'):
+        cargos.setdefault(cargo.id_personal_id, cargo.nombre)
+
+    secciones = load_secciones(ids_minutas) if mes == 3 else {}
+
+    resultado = []
+    for fiscalizacion in actividades:
+        oic = fiscalizacion.id_oic
+        nombre = minuta_file_name(oic=oic.nombre if oic else '', mes=mes, trimestre=str(fiscalizacion.trimestre),
+                                  anyo=str(fiscalizacion.anyo))
+        lote = MinutaLote(fiscalizacion=fiscalizacion, nombre=nombre.replace('/', '_'), kind=mes != 3)
+        resultado.append(lote)
+
+        minuta = minutas.get(fiscalizacion.pk)
+        firmantes_minuta = {tipo: firmantes.get((minuta.pk, tipo)) for tipo in FIRMANTES} if minuta else {}
+        faltantes = [tipo for tipo, personal in firmantes_minuta.items() if personal is None]
+        sin_cargo = [tipo for tipo, personal in firmantes_minuta.items()
+                     if personal is not None and cargos.get(personal.pk) is None]
+        if oic is None or oic.id_direccion is None:
+            lote.error = 'El periodo no tiene un OIC con dirección asignada'
+        elif not tipos_periodo(instancias, fiscalizacion.pk):
+            lote.error = 'No hay actividades de fiscalización activas en el periodo'
+        elif minuta is None:
+            lote.error = 'No se ha capturado la minuta del mes'
+        elif minuta.inicio is None or minuta.fin is None:
+            lote.error = 'La minuta no tiene hora de inicio y fin'
+        elif faltantes:
+            lote.error = f'La minuta no tiene asignado al {FIRMANTES[faltantes[0]]}'
+        elif sin_cargo:
+            lote.error = f'El {FIRMANTES[sin_cargo[0]]} no tiene un cargo registrado'
+        if lote.error is not None:
+            continue
+
+        lista = actividades_periodo(instancias, fiscalizacion.pk)
+        lote.data = build_minuta_data(fiscalizacion, minuta, mes, lista, firmantes_minuta, cargos)
+        if mes == 3:
+            lote.revision = build_revision(secciones.get(minuta.pk, {}), tipos_periodo(instancias, fiscalizacion.pk))
+    return resultado
+
+
+# Tipo de cargo con el que se asigna por omisión cada tipo de personal de MinutaPersonal
+CARGOS_FIRMANTES = {1: 1, 2: 2, 3: 6, 4: 7}
+
+# Tipos de personal que pertenecen a la dirección de coordinación; los demás son del OIC
+FIRMANTES_DIRECCION = (1, 2)
+
+
+@dataclass
+class MinutaContexto:
+    """
+    Clase que almacena todo lo que se necesita para mostrar y generar la minuta de un mes de una actividad de
+    fiscalización.
+
+    Atributos:
+        fiscalizacion (ActividadFiscalizacion): Actividad de fiscalización, con su OIC y la dirección del OIC.
+        mes (int): Mes de la minuta dentro del trimestre (1, 2 o 3).
+        minuta (Minuta): Minuta del mes, con su archivo.
+        actividades (list[Actividad]): Actividades del periodo.
+        tipos (set[int]): Tipos de concepto de las actividades del periodo.
+        firmantes (dict): Personal, con su persona, de cada tipo de personal, o None si no hay a quién asignar.
+        judc (list[Personal]): JUD de coordinación que se pueden elegir.
+        personal (list[Personal]): Personal del OIC que se puede elegir.
+        secciones (dict): SeccionMinuta de cada tipo de concepto; solo se cargan en el mes 3.
+    """
+    fiscalizacion: Any
+    mes: int
+    minuta: Any
+    actividades: list
+    tipos: set
+    firmantes: dict
+    judc: list = field(default_factory=list)
+    personal: list = field(default_factory=list)
+    secciones: dict = field(default_factory=dict)
+
+    @property
+    def faltantes(self):
+        """
+        Tipos de personal que no tienen a nadie asignado.
+        """
+        return [tipo for tipo, personal in self.firmantes.items() if personal is None]
+
+    def conceptos_dict(self):
+        """
+        Obtiene los conceptos con la forma que usa la plantilla minuta_mes.html.
+
+        Returns:
+            dict: Estado y comentario de cada clave, por nombre del tipo de concepto.
+        """
+        nombres = dict(ConceptoMinuta.TIPO_CHOICES)
+        conceptos_dict = {nombre: {} for nombre in nombres.values()}
+        for tipo, seccion in self.secciones.items():
+            if tipo not in nombres:
+                continue
+            for clave, (estatus, comentario) in enumerate(valores_seccion(seccion, tipo), start=1):
+                conceptos_dict[nombres[tipo]][str(clave)] = {
+                    'estado': estatus,
+                    'comentario': comentario if comentario is not None else ''
+                }
+        return conceptos_dict
+
+
+def opciones_personal(candidatos, actual):
+    """
+    Obtiene el personal que se puede elegir para un tipo de personal, incluyendo al asignado aunque esté inactivo.
+
+    Args:
+        candidatos (list[Personal]): Personal activo con el cargo correspondiente.
+        actual (Personal): Personal asignado, o None.
+
+    Returns:
+        list[Personal]: Personal sin repetir, ordenado por llave primaria.
+    """
+    opciones = {personal.pk: personal for personal in candidatos}
+    if actual is not None and actual.estado == 0:
+        opciones.setdefault(actual.pk, actual)
+    return [opciones[pk] for pk in sorted(opciones)]
+
+
+def load_minuta_contexto(fiscalizacion, mes):
+    """
+    Carga la minuta de un mes de una actividad de fiscalización con un número fijo de consultas, sin importar
+    cuántas actividades tenga el periodo: una por tipo de actividad, la minuta con su archivo, su personal asignado,
+    el personal que se puede asignar con sus cargos y, en el mes 3, los conceptos.
+
+    La minuta se crea si no existe; el personal que no se ha asignado se asigna con el primer personal activo del
+    cargo correspondiente y, en el mes 3, las secciones de conceptos de los tipos de actividad que no tienen una se
+    crean. Cada una de estas creaciones se hace con una sola inserción múltiple.
+
+    Args:
+        fiscalizacion (ActividadFiscalizacion): Actividad de fiscalización, con su OIC y la dirección del OIC.
+        mes (int): Mes de la minuta dentro del trimestre (1, 2 o 3).
+
+    Returns:
+        MinutaContexto: Datos de la minuta, o None si el periodo no tiene actividades activas.
+    """
+    instancias = load_actividades([fiscalizacion.pk])
+    tipos = tipos_periodo(instancias, fiscalizacion.pk)
+    if not tipos:
+        return None
+
+    minuta = Minuta.objects.filter(id_actividad_fiscalizacion=fiscalizacion, mes=mes).select_related(
+        'id_archivo').order_by('pk').first()
+    if minuta is None:
+        minuta = Minuta.objects.create(inicio=None, fin=None, id_actividad_fiscalizacion=fiscalizacion,
+                                       id_archivo=None, mes=mes)
+
+    firmantes = {tipo: None for tipo in FIRMANTES}
+    query = MinutaPersonal.objects.filter(id_minuta=minuta).select_related('id_personal__id_persona')
+    for minuta_personal in query.order_by('pk'):
+        if minuta_personal.tipo_personal in firmantes and firmantes[minuta_personal.tipo_personal] is None:
+            firmantes[minuta_personal.tipo_personal] = minuta_personal.id_personal
+
+    # Personal activo que se puede asignar: el de la dirección de coordinación del OIC y el del propio OIC
+    oic = fiscalizacion.id_oic
+    direccion = oic.id_direccion.direccion if oic is not None and oic.id_direccion is not None else None
+    candidatos = {tipo: [] for tipo in FIRMANTES}
+    judc = []
+    personal = []
+    if oic is not None:
+        filtro = Q(id_personal__id_oic=oic)
+        if direccion is not None:
+            filtro |= Q(id_personal__id_oic__id_direccion__direccion=direccion) | \
+                Q(id_personal__id_oic__nombre=direccion)
+        query = CargoPersonal.objects.filter(
+            filtro, id_personal__estado=1, id_tipo_cargo__in=set(CARGOS_FIRMANTES.values()),
+        ).select_related('id_personal__id_persona', 'id_personal__id_oic__id_direccion')
+        for cargo in query.order_by('id_personal', 'pk'):
+            candidato = cargo.id_personal
+            oic_candidato = candidato.id_oic
+            de_direccion = direccion is not None and oic_candidato.id_direccion is not None and \
+                oic_candidato.id_direccion.direccion == direccion
+            for tipo, tipo_cargo in CARGOS_FIRMANTES.items():
+                if cargo.id_tipo_cargo_id != tipo_cargo:
+                    continue
+                if (de_direccion if tipo in FIRMANTES_DIRECCION else candidato.id_oic_id == oic.pk):
+                    candidatos[tipo].append(candidato)
+            if cargo.id_tipo_cargo_id == CARGOS_FIRMANTES[2] and oic_candidato.nombre == direccion:
+                judc.append(candidato)
+            if cargo.id_tipo_cargo_id == CARGOS_FIRMANTES[4] and candidato.id_oic_id == oic.pk:
+                personal.append(candidato)
+
+    nuevos = []
+    for tipo, asignado in firmantes.items():
+        if asignado is None and candidatos[tipo]:
+            firmantes[tipo] = candidatos[tipo][0]
+            nuevos.append(MinutaPersonal(tipo_personal=tipo, id_minuta=minuta, id_personal=firmantes[tipo]))
+    if nuevos:
+        MinutaPersonal.objects.bulk_create(nuevos)
+
+    contexto = MinutaContexto(
+        fiscalizacion=fiscalizacion,
+        mes=mes,
+        minuta=minuta,
+        actividades=actividades_periodo(instancias, fiscalizacion.pk),
+        tipos=tipos,
+        firmantes=firmantes,
+        judc=opciones_personal(judc, firmantes[2]),
+        personal=opciones_personal(personal, firmantes[4]),
+    )
+
+    if mes == 3:
+        contexto.secciones = load_secciones([minuta.pk]).get(minuta.pk, {})
+        nuevas = [
+            SeccionMinuta(tipo_concepto=tipo, conceptos=valores_seccion(None, tipo), id_minuta=minuta)
+            for tipo, _, _ in TIPOS_CONCEPTO if tipo in tipos and tipo not in contexto.secciones
+        ]
+        if nuevas:
+            # Otra petición pudo crear las mismas secciones al mismo tiempo; se omiten las repetidas y se vuelven a
+            # leer para tener las llaves primarias de todas
+            SeccionMinuta.objects.bulk_create(nuevas, ignore_conflicts=True)
+            contexto.secciones = load_secciones([minuta.pk]).get(minuta.pk, {})
+    return contexto
+
+
+def render_minuta_content(data, kind, revision, cache_config):
+    """
+    Genera una minuta dentro de un proceso del pool, o la toma de la caché de documentos si ya se generó con los
+    mismos datos.
+
+    Args:
+        data (list): Datos P01-P34 de la minuta.
+        kind (bool): True para Papeles de Trabajo, False para Proyectos de Observaciones.
+        revision (RevisionDocs): Datos de revisión del mes 3.
+        cache_config (tuple): Configuración de la caché de documentos del proceso principal.
+
+    Returns:
+        bytes: Contenido de la minuta, o None si no se pudo generar.
+    """
+    buffer = render_minuta_cached(data=data, kind=kind, revision=revision, cache_config=cache_config)
+    return buffer.getvalue() if buffer is not None else None
+
+
+def render_minutas(minutas):
+    """
+    Genera las minutas que no tienen error, repartiéndolas en el pool de procesos de Procesamiento si hay más de
+    una. Las que no se pudieron generar se marcan con su error.
+
+    Args:
+        minutas (list[MinutaLote]): Minutas del lote.
+
+    Yields:
+        tuple: Nombre del archivo y contenido de cada minuta generada, en el orden recibido.
+    """
+    generables = [minuta for minuta in minutas if minuta.error is None]
+    cache_config = document_cache_config()
+    tareas = [(minuta.data, minuta.kind, minuta.revision, cache_config) for minuta in generables]
+    for minuta, (_, content) in zip(generables, map_ordered(render_minuta_content, tareas)):
+        if content is None:
+            minuta.error = 'No se pudo generar el documento'
+            continue
+        yield minuta.nombre, content
+
+
+def build_reporte(minutas):
+    """
+    Obtiene el reporte de una generación en lote, con una línea por periodo.
+
+    Args:
+        minutas (list[MinutaLote]): Minutas del lote, ya generadas.
+
+    Returns:
+        str: Reporte con el resultado de cada minuta.
+    """
+    lineas = [f'{minuta.nombre}: {minuta.error if minuta.error else "generada"}' for minuta in minutas]
+    generadas = sum(1 for minuta in minutas if minuta.error is None)
+    lineas.append(f'{generadas} de {len(minutas)} minutas generadas')
+    return '\n'.join(lineas) + '\n'
+
+
+def minutas_zip(minutas):
+    """
+    Genera varias minutas y las entrega como un zip, que incluye al final el reporte de cada periodo.
+
+    Args:
+        minutas (list[MinutaLote]): Minutas obtenidas con load_minutas; al terminar quedan marcadas las que no se
+                                    pudieron generar.
+
+    Yields:
+        bytes: Partes consecutivas del archivo zip.
+    """
+    def archivos():
+        yield from render_minutas(minutas)
+        yield REPORTE_NOMBRE, build_reporte(minutas).encode('utf-8')
+
+    yield from stream_zip(archivos())
@@ -0,0 +1,207 @@
+import docx
+from openpyxl import Workbook
+
+MATERIAS = ['Administrativa', 'Desempeño', 'Financiera', 'Social']
+PROGRAMACIONES = ['Ordinaria', 'Extraordinaria']
+ENFOQUES = ['Estratégica', 'Focalizada']
+TEMPORALIDADES = ['Ex post', 'Ex ante']
+TRIMESTRES = ['Primero', 'Segundo', 'Tercero', 'Cuarto']
+PROGRAMAS_REVISION = [
+    'Seguimiento a acciones de mejora - Recursos Humanos',
+    'Evaluación de indicadores - Presupuesto',
+    'Otras revisiones - Obra pública',
+]
+
+
+def generate_paa(path, oic, sheets=1, rows=100, anyo=2024):
+    """
+    Genera un archivo PAA sintético con la misma estructura que los PAA reales: encabezados del formato, el nombre
+    del OIC en la fila anterior a las auditorías y una fila por auditoría.
+
+    Args:
+        path (str or file): Ruta o archivo donde se guarda el libro.
+        oic (str): Nombre del OIC que aparece en cada hoja.
+        sheets (int): Número de hojas.
+        rows (int): Número de auditorías por hoja.
+        anyo (int): Año de las auditorías.
+
+    Returns:
+        str or file: El mismo 'path'.
+    """
+    workbook = Workbook(write_only=True)
+    for sheet_number in range(sheets):
+        sheet = workbook.create_sheet(f'PAA {sheet_number + 1}')
+        sheet.append([])
+        sheet.append([])
+        sheet.append(['PAA'])
+        sheet.append(['SCGCDMX'])
+        sheet.append(['Dirección General de Coordinación de Órganos Internos de Control Sectorial'])
+        sheet.append([])
+        sheet.append(['Número de Auditoría', 'Denominación', 'Unidad Administrativa / Área Evaluada', 'Objetivo',
+                      'Alcance', 'Tipo de Auditoría', None, None, None, 'Trimestre de Ejecución'])
+        sheet.append([None, None, None, None, None, 'Materia', 'Programación', 'Enfoque', 'Temporalidad'])
+        sheet.append([])
+        sheet.append([f'Órgano Interno de Control en {oic}'])
+        for row in range(rows):
+            numero = sheet_number * rows + row + 1
+            sheet.append([
+                f'A-{numero}/{anyo}',
+                f'Auditoría sintética {numero} a los procesos del área',
+                f'Dirección de Administración {row % 7}',
+                f'Verificar que los procesos de la unidad {row % 11} se realicen conforme a la normatividad',
+                f'Ejercicio {anyo - 1}, registros del primero al cuarto trimestre',
+                MATERIAS[row % len(MATERIAS)],
+                PROGRAMACIONES[row % len(PROGRAMACIONES)],
+                ENFOQUES[row % len(ENFOQUES)],
+                TEMPORALIDADES[row % len(TEMPORALIDADES)],
+                TRIMESTRES[row % len(TRIMESTRES)],
+            ])
+        sheet.append([f'Intervenciones: {rows} en el ejercicio'])
+        sheet.append([f'Total de Intervenciones Programadas: {rows}'])
+    workbook.save(path)
+    return path
+
+
+def generate_paci(path, oic, sheets=1, rows=100, anyo=2024):
+    """
+    Genera un archivo PACI sintético con la misma estructura que los PACI reales: la fila de encabezados completa,
+    el nombre del OIC en la fila anterior a los controles y una fila por control interno.
+
+    Args:
+        path (str or file): Ruta o archivo donde se guarda el libro.
+        oic (str): Nombre del OIC que aparece en cada hoja.
+        sheets (int): Número de hojas.
+        rows (int): Número de controles internos por hoja.
+        anyo (int): Año de los controles internos.
+
+    Returns:
+        str or file: El mismo 'path'.
+    """
+    workbook = Workbook(write_only=True)
+    for sheet_number in range(sheets):
+        sheet = workbook.create_sheet(f'PACI {sheet_number + 1}')
+        sheet.append([])
+        sheet.append([])
+        sheet.append(['PACI'])
+        sheet.append([])
+        sheet.append(['SCGCDMX'])
+        sheet.append(['Dirección General de Coordinación de Órganos Internos de Control Sectorial'])
+        sheet.append([])
+        sheet.append(['Número de Control Interno', 'Denominación', 'Objetivo', 'Área Responsable',
+                      'Trimestre de Ejecución', 'Programa'])
+        sheet.append([])
+        sheet.append([])
+        sheet.append([f'Órgano Interno de Control en {oic}'])
+        for row in range(rows):
+            numero = (sheet_number * rows + row) % 99 + 1
+            sheet.append([
+                f'{numero:02d}/{anyo}',
+                f'Control interno sintético {row + 1}',
+                f'Revisar el cumplimiento de los controles del proceso {row % 13}',
+                f'Subdirección de Control {row % 5}',
+                TRIMESTRES[row % len(TRIMESTRES)],
+                PROGRAMAS_REVISION[row % len(PROGRAMAS_REVISION)],
+            ])
+    workbook.save(path)
+    return path
+
+
+def add_table(document, rows):
+    """
+    Agrega una tabla al documento con el contenido de cada fila.
+
+    Args:
+        document (Document): Documento de python-docx.
+        rows (list[list[str]]): Texto de cada celda, fila por fila.
+
+    Returns:
+        Table: Tabla agregada.
+    """
+    table = document.add_table(rows=len(rows), cols=max(len(row) for row in rows))
+    for row, values in zip(table.rows, rows):
+        for cell, value in zip(row.cells, values):
+            cell.text = value
+    return table
+
+
+def generate_pint(path, oic, actividades=10, numero=4, anyo=2024):
+    """
+    Genera un Programa de Intervención (PINT) sintético con las mismas tablas que los documentos reales.
+
+    Args:
+        path (str or file): Ruta o archivo donde se guarda el documento.
+        oic (str): Nombre del ente público.
+        actividades (int): Número de filas de la tabla de actividades, para controlar el tamaño del documento.
+        numero (int): Número de la intervención.
+        anyo (int): Año de la intervención.
+
+    Returns:
+        str or file: El mismo 'path'.
+    """
+    document = docx.Document()
+    document.add_paragraph('Planeación considerada para la ejecución de la Intervención')
+    add_table(document, [
+        ['Ente Público', oic, oic, oic, oic],
+        ['Emisor', oic, oic, oic, oic],
+        ['Número', f'V-{numero:02d}/{anyo}', 'Denominación', 'Intervención sintética', 'Intervención sintética'],
+        ['Clave', '14', 'Tipo de Intervención', 'Verificación', 'Verificación'],
+        ['Área a Verificar / Área Evaluada', 'Dirección de Administración', 'Dirección de Administración', 'Fecha',
+         f'01/07/{anyo}'],
+    ])
+    add_table(document, [['A) Objetivo.'], ['Verificar el cumplimiento de la normatividad aplicable']])
+    add_table(document, [['B) Antecedentes.', 'B) Antecedentes.'], ['Sin antecedentes', '']])
+    add_table(document, [['C) Normatividad'], ['Ley de Auditoría y Control Interno']])
+    add_table(document, [['D) Importancia y Riesgo de la Intervención'], ['Riesgo medio']])
+    add_table(document, [['E) Alcance y periodo de ejecución'],
+                         [f'Se revisará el ejercicio {anyo - 1} durante el tercer trimestre del {anyo}. '
+                          f'Inicio 01/07/{anyo} Término 30/09/{anyo}']])
+    add_table(document, [['F) Fuerza de Trabajo asignada'] * 6,
+                         ['Supervisión', '1', 'Responsable', '1', 'Auditores', '4']])
+    add_table(document, [['G) Actividades']] + [[f'Actividad {i + 1}: revisión de expedientes y registros']
+                                               for i in range(actividades)])
+    add_table(document, [['Elaboró:', '', 'Revisó:', '', 'Autorizó:'],
+                         ['Responsable', '', 'Supervisor', '', 'Titular']])
+    document.save(path)
+    return path
+
+
+def generate_imc(path, oic, filas=0, numero=1, anyo=2024, tipo='Modificación'):
+    """
+    Genera un formato A3 de Incorporación, Modificación o Cancelación (IMC) sintético con las tablas que lee
+    read_format_a3: la tabla del encabezado con el OIC, la tabla del tipo de movimiento y la tabla de datos.
+
+    Args:
+        path (str or file): Ruta o archivo donde se guarda el documento.
+        oic (str): Nombre del OIC.
+        filas (int): Filas adicionales de justificación en la tabla de datos, para controlar el tamaño del documento.
+        numero (int): Número de la auditoría.
+        anyo (int): Año de la auditoría.
+        tipo (str): Tipo de movimiento: 'Incorporación', 'Modificación' o 'Cancelación'.
+
+    Returns:
+        str or file: El mismo 'path'.
+    """
+    document = docx.Document()
+    header = document.sections[0].header
+    header_table = header.add_table(rows=4, cols=1, width=document.sections[0].page_width)
+    for cell, value in zip(header_table.columns[0].cells,
+                           ['Secretaría de la Contraloría General', 'Formato A3', 'Órgano Interno de Control',
+                            f'Órgano Interno de Control en {oic}']):
+        cell.text = value
+
+    add_table(document, [['Programa Anual de Auditoría', str(anyo)]])
+    add_table(document, [['Tipo de movimiento', tipo]])
+    datos = [[''] * 7 for _ in range(13 + filas)]
+    datos[2] = [f'A-{numero}/{anyo}', '1-6-8-10', '', 'Auditoría sintética', '', f'{anyo}/3', f'{anyo}/4']
+    datos[5][0] = f'01/07/{anyo} al 30/09/{anyo}'
+    datos[5][6] = f'01/10/{anyo} al 31/12/{anyo}'
+    datos[8][1] = 'Objetivo original'
+    datos[8][6] = 'Objetivo modificado'
+    datos[11][1] = 'Alcance original'
+    datos[11][6] = 'Alcance modificado'
+    datos[12][6] = 'Justificación de la modificación'
+    for fila in range(13, 13 + filas):
+        datos[fila][6] = f'Justificación adicional {fila - 12}'
+    add_table(document, datos)
+    document.save(path)
+    return path
@@ -0,0 +1,313 @@
+from django.db import transaction
+from django.utils import timezone
+
+from OICSec.funcs.Archivos import stream_zip
+from OICSec.funcs.Cache import document_cache_config
+from OICSec.funcs.Cedula import Concepto, ConceptosLista, SupervisionData, cedula_file_name, render_cedula_cached
+from OICSec.funcs.Ingesta import to_field_value
+from OICSec.funcs.Procesamiento import map_ordered
+from OICSec.models import Auditoria, CargoPersonal, CedulaPersonal, ConceptoCedula, ControlInterno, Intervencion
+
+# Número de conceptos que se envían a la cédula, igual que en el formulario de cedula_view
+NUM_CONCEPTOS = 60
+
+# Tipo de supervisión de cada modelo y relaciones que se necesitan para llenar su cédula
+TIPOS_SUPERVISION = [
+    (1, Auditoria, ['id_materia', 'id_programacion', 'id_enfoque', 'id_temporalidad']),
+    (2, Intervencion, ['id_tipo_intervencion']),
+    (3, ControlInterno, ['id_tipo_revision', 'id_programa_revision']),
+]
+
+# Opción del formulario de cedula_view que indica que no se eligió estado
+SIN_ESTADO = 'Selecciona una opción'
+
+# Tipo de personal de CedulaPersonal y tipo de cargo de su CargoPersonal
+DIRECTOR = (1, 1)
+TITULAR = (2, 6)
+
+
+def nombre_personal(personal):
+    """
+    Obtiene el nombre con el que firma una persona la cédula.
+
+    Args:
+        personal (Personal): Personal con su persona.
+
+    Returns:
+        str: Honorífico, nombre y apellido en mayúsculas.
+    """
+    persona = personal.id_persona
+    return f'{persona.honorifico} {persona.nombre} {persona.apellido}'.upper()
+
+
+def build_supervision_data(kind, model_instance, fiscalizacion, fecha, nombre_director, cargo_director,
+                           nombre_titular, cargo_titular):
+    """
+    Obtiene los datos generales de la cédula de una actividad.
+
+    Args:
+        kind (int): Tipo de supervisión (1: Auditoria, 2: Intervención, 3: Control interno).
+        model_instance (Model): Auditoría, intervención o control interno.
+        fiscalizacion (ActividadFiscalizacion): Actividad de fiscalización de la actividad, con su OIC.
+        fecha (str): Fecha de realización de la cédula en formato dd/mm/aaaa, o ''.
+        nombre_director (str): Nombre del director de coordinación.
+        cargo_director (str): Cargo del director de coordinación.
+        nombre_titular (str): Nombre del titular del OIC.
+        cargo_titular (str): Cargo del titular del OIC.
+
+    Returns:
+        SupervisionData: Datos de la cédula, o None si el tipo no existe.
+    """
+    oic = str(fiscalizacion.id_oic.nombre) if fiscalizacion.id_oic and fiscalizacion.id_oic.nombre else ''
+    comunes = {
+        'OIC': oic,
+        'Nombre': str(model_instance.denominacion) if model_instance.denominacion else '',
+        'Fecha': fecha,
+        'Anyo_Trimestre': f'0{fiscalizacion.trimestre}/{fiscalizacion.anyo}' if fiscalizacion.trimestre else '',
+        'Objetivo': model_instance.objetivo if model_instance.objetivo else '',
+        'Ejercicio': model_instance.ejercicio if model_instance.ejercicio else '',
+        'Nombre_Director': nombre_director,
+        'Cargo_Director': cargo_director,
+        'Nombre_Titular': nombre_titular,
+        'Cargo_Titular': cargo_titular,
+    }
+    if kind == 1:
+        materia = model_instance.id_materia.clave if model_instance.id_materia else None
+        programacion = model_instance.id_programacion.clave if model_instance.id_programacion else None
+        enfoque = model_instance.id_enfoque.clave if model_instance.id_enfoque else None
+        temporalidad = model_instance.id_temporalidad.clave if model_instance.id_temporalidad else None
+        return SupervisionData(
+            Numero=f'A-{model_instance.numero}/{fiscalizacion.anyo}' if all(
+                [model_instance.numero, fiscalizacion.anyo]) else '',
+            Clave=(
+                f'{materia}-{programacion}-{enfoque}-{temporalidad}'
+                if all(
+                    [model_instance.id_materia, model_instance.id_programacion,
+                     model_instance.id_enfoque, model_instance.id_temporalidad]) else ''),
+            Area=model_instance.unidad if model_instance.unidad else '',
+            **comunes
+        )
+    if kind == 2:
+        tipo_clave = model_instance.id_tipo_intervencion.clave if model_instance.id_tipo_intervencion else None
+        clave = 'R' if tipo_clave == 13 else ('V' if tipo_clave == 14 else 'O')
+        return SupervisionData(
+            Numero=f'{clave}-{model_instance.numero}/{fiscalizacion.anyo}',
+            Clave=f'{tipo_clave}' if tipo_clave is not None else '',
+            Area=model_instance.unidad if model_instance.unidad else '',
+            **comunes
+        )
+    if kind == 3:
+        tipo_revision = \
+            f'{model_instance.id_tipo_revision.clave if model_instance.id_tipo_revision else ""}'
+        programa_revision = \
+            f'{model_instance.id_programa_revision.clave if model_instance.id_programa_revision else ""}'
+        clave = f'{tipo_revision}-{programa_revision}' if tipo_revision and programa_revision \
+            else (f'{tipo_revision}' if tipo_revision else (f'{programa_revision}' if programa_revision else ''))
+        return SupervisionData(
+            Numero=f'CI {model_instance.numero}/{fiscalizacion.anyo}',
+            Clave=clave,
+            Area=model_instance.area if model_instance.area else '',
+            **comunes
+        )
+    return None
+
+
+def format_fecha(realizacion):
+    """
+    Obtiene la fecha de realización de una cédula como la escribe cedula_view.
+
+    Args:
+        realizacion (datetime or None): Fecha de realización guardada.
+
+    Returns:
+        str: Fecha en formato dd/mm/aaaa, o '' si no hay fecha.
+    """
+    if realizacion is None:
+        return ''
+    if timezone.is_aware(realizacion):
+        realizacion = timezone.localtime(realizacion)
+    return realizacion.strftime('%d/%m/%Y')
+
+
+def conceptos_por_celda(conceptos):
+    """
+    Agrupa los conceptos guardados de una cédula por celda; si una celda está repetida se toma el primero creado.
+
+    Args:
+        conceptos (Iterable[ConceptoCedula]): Conceptos de la cédula, en orden de creación.
+
+    Returns:
+        dict: ConceptoCedula de cada celda.
+    """
+    por_celda = {}
+    for concepto in conceptos:
+        por_celda.setdefault(concepto.celda, concepto)
+    return por_celda
+
+
+def read_conceptos_form(post):
+    """
+    Obtiene el estado y comentario de cada concepto enviados en el formulario de cedula_view.
+
+    Args:
+        post (QueryDict): Datos del formulario.
+
+    Returns:
+        list[tuple]: Estado y comentario de cada concepto, en el orden de sus celdas.
+    """
+    valores = []
+    for i in range(NUM_CONCEPTOS):
+        estado = post.get(f'estado-{i}')
+        valores.append((estado if estado != SIN_ESTADO else None, post.get(f'comentario-{i}')))
+    return valores
+
+
+def update_conceptos_cedula(conceptos, valores):
+    """
+    Guarda los conceptos de una cédula enviados en el formulario. Los valores se comparan con los conceptos ya
+    cargados y solo los que cambiaron se escriben, con una sola operación dentro de una transacción; las celdas sin
+    concepto guardado solo se envían a la cédula.
+
+    Args:
+        conceptos (dict): ConceptoCedula de cada celda, como lo devuelve conceptos_por_celda.
+        valores (list[tuple]): Estado y comentario de cada concepto, como los devuelve read_conceptos_form.
+
+    Returns:
+        ConceptosLista: Conceptos para generar la cédula, con los valores enviados.
+    """
+    cambiados = []
+    for i, (estado, comentario) in enumerate(valores):
+        concepto = conceptos.get(str(i))
+        if concepto is None:
+            continue
+        estado_guardado = to_field_value(ConceptoCedula, 'estado', estado)
+        if concepto.estado != estado_guardado or concepto.comentario != comentario:
+            concepto.estado = estado_guardado
+            concepto.comentario = comentario
+            cambiados.append(concepto)
+    if cambiados:
+        with transaction.atomic():
+            ConceptoCedula.objects.bulk_update(cambiados, ['estado', 'comentario'])
+    return ConceptosLista(
+        Conceptos=[Concepto(Estado=estado, Comentario=comentario) for estado, comentario in valores]
+    )
+
+
+def load_cedulas(actividades):
+    """
+    Carga los datos de las cédulas de todas las auditorías, intervenciones y controles internos de varias
+    actividades de fiscalización, con una consulta por modelo: las actividades de cada tipo con sus catálogos, los
+    conceptos, el personal que firma y sus cargos.
+
+    Las cédulas se llenan con lo guardado en la base de datos, igual que si se enviara el formulario de
+    cedula_view sin cambios; no se modifica ningún registro. Si una cédula todavía no tiene asignado al director o
+    al titular, su firma queda vacía.
+
+    Args:
+        actividades (list[ActividadFiscalizacion]): Actividades de fiscalización.
+
+    Returns:
+        list[tuple]: Tipo de supervisión, SupervisionData y ConceptosLista de cada cédula, ordenadas por actividad de
+                     fiscalización, tipo y número.
+    """
+    fiscalizaciones = {actividad.pk: actividad for actividad in actividades}
+    instancias = []
+    for kind, model, related in TIPOS_SUPERVISION:
+        query = model.objects.filter(
+            id_actividad_fiscalizacion__in=list(fiscalizaciones),
+            id_cedula__isnull=False,
+        ).select_related('id_cedula', *related).order_by('id_actividad_fiscalizacion', 'numero', 'pk')
+        instancias.extend((kind, instancia) for instancia in query)
+    instancias.sort(key=lambda item: (item[1].id_actividad_fiscalizacion_id, item[0]))
+    cedulas = [instancia.id_cedula_id for _, instancia in instancias]
+
+    conceptos = {}
+    for concepto in ConceptoCedula.objects.filter(id_cedula__in=cedulas).order_by('pk'):
+        conceptos.setdefault(concepto.id_cedula_id, []).append(concepto)
+
+    firmantes = {}
+    query = CedulaPersonal.objects.filter(id_cedula__in=cedulas).select_related('id_personal__id_persona')
+    for cedula_personal in query.order_by('pk'):
+        firmantes.setdefault((cedula_personal.id_cedula_id, cedula_personal.tipo_personal), cedula_personal.id_personal)
+
+    cargos = {}
+    query = CargoPersonal.objects.filter(
+        id_personal__in={personal.pk for personal in firmantes.values() if personal is not None},
+        id_tipo_cargo__in=[DIRECTOR[1], TITULAR[1]],
+    )
+    for cargo in query.order_by('pk'):
+        cargos.setdefault((cargo.id_personal_id, cargo.id_tipo_cargo_id), cargo.nombre)
+
+    def firma(cedula_id, tipo):
+        personal = firmantes.get((cedula_id, tipo[0]))
+        if personal is None:
+            return '', ''
+        return nombre_personal(personal), f'{cargos.get((personal.pk, tipo[1]))}'.upper()
+
+    resultado = []
+    for kind, instancia in instancias:
+        cedula = instancia.id_cedula
+        nombre_director, cargo_director = firma(cedula.pk, DIRECTOR)
+        nombre_titular, cargo_titular = firma(cedula.pk, TITULAR)
+        data = build_supervision_data(kind, instancia, fiscalizaciones[instancia.id_actividad_fiscalizacion_id],
+                                      format_fecha(cedula.realizacion), nombre_director, cargo_director,
+                                      nombre_titular, cargo_titular)
+        conceptos_cedula = conceptos_por_celda(conceptos.get(cedula.pk, []))
+        lista = []
+        for i in range(NUM_CONCEPTOS):
+            concepto = conceptos_cedula.get(str(i))
+            if concepto is None:
+                lista.append(Concepto(Estado=None, Comentario=None))
+            else:
+                estado = str(concepto.estado) if concepto.estado is not None else None
+                lista.append(Concepto(Estado=estado, Comentario=concepto.comentario))
+        resultado.append((kind, data, ConceptosLista(Conceptos=lista)))
+    return resultado
+
+
+def render_cedula_content(kind, data, conceptos, cache_config):
+    """
+    Genera una cédula dentro de un proceso del pool, o la toma de la caché de documentos si ya se generó con los
+    mismos datos; cada proceso lee la plantilla una sola vez.
+
+    Args:
+        kind (int): Tipo de supervisión.
+        data (SupervisionData): Datos generales de la supervisión.
+        conceptos (ConceptosLista): Conceptos de la cédula.
+        cache_config (tuple): Configuración de la caché de documentos del proceso principal.
+
+    Returns:
+        bytes: Contenido de la cédula, o None si no se pudo generar.
+    """
+    buffer = render_cedula_cached(kind=kind, data=data, conceptos=conceptos, cache_config=cache_config)
+    return buffer.getvalue() if buffer is not None else None
+
+
+def render_cedulas(cedulas):
+    """
+    Genera varias cédulas, repartiéndolas en el pool de procesos de Procesamiento si hay más de una.
+
+    Args:
+        cedulas (list[tuple]): Tipo de supervisión, SupervisionData y ConceptosLista de cada cédula.
+
+    Yields:
+        tuple: Nombre del archivo y contenido de cada cédula que se pudo generar, en el orden recibido.
+    """
+    cache_config = document_cache_config()
+    tareas = [(kind, data, conceptos, cache_config) for kind, data, conceptos in cedulas]
+    for (_, data, _, _), content in map_ordered(render_cedula_content, tareas):
+        if content is not None:
+            yield cedula_file_name(data), content
+
+
+def cedulas_zip(actividades):
+    """
+    Genera las cédulas de todas las actividades de varias actividades de fiscalización y las entrega como un zip.
+
+    Args:
+        actividades (list[ActividadFiscalizacion]): Actividades de fiscalización, con su OIC.
+
+    Returns:
+        generator: Partes consecutivas del archivo zip.
+    """
+    return stream_zip(render_cedulas(load_cedulas(actividades)))
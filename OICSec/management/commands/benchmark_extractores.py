@@ -0,0 +1,284 @@
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from OICSec.funcs import IMC, PAA, PACI, PINT
+from OICSec.funcs.Catalogo import invalidate_catalogo, get_catalogo
+from OICSec.funcs.Lector import read_sheets_streaming
+from OICSec.funcs.LectorDocx import read_docx
+from OICSec.funcs.PAA import extract_paa, extract_paa_rows, preprocess_dataframe, get_best_match, EXTRACTOR_CATALOGOS
+from OICSec.funcs.PACI import extract_paci, extract_paci_rows, EXTRACTOR_CATALOGOS as CATALOGOS_PACI
+from OICSec.funcs.PINT import extract_pint, extract_pint_data
+from OICSec.funcs.Sinteticos import generate_paa, generate_paci, generate_pint, generate_imc
+from OICSec.models import Oic
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'fixtures', 'initial_data.json')
+
+
+def measure(func, repeat):
+    """
+    Ejecuta una función varias veces y mide su duración.
+
+    Args:
+        func (callable): Función sin argumentos.
+        repeat (int): Número de ejecuciones.
+
+    Returns:
+        tuple: Resultado de la última ejecución, la duración mínima y la duración promedio en segundos.
+    """
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - start)
+    return result, min(durations), sum(durations) / len(durations)
+
+
+def measure_peak_memory(func):
+    """
+    Ejecuta una función una vez y mide la memoria máxima reservada durante su ejecución.
+
+    Args:
+        func (callable): Función sin argumentos.
+
+    Returns:
+        int: Memoria máxima en bytes.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def stages_excel(paths, rows_func, skip, columns):
+    """
+    Define las etapas de la extracción de un PAA o PACI sobre varios archivos: la lectura de las filas completas,
+    su preprocesamiento, la búsqueda del OIC y la extracción de los datos de cada fila.
+
+    Args:
+        paths (list[str]): Rutas de los archivos.
+        rows_func (callable): extract_paa_rows o extract_paci_rows.
+        skip (int): Filas de encabezado que descarta preprocess_dataframe.
+        columns (int): Columnas que lee 'rows_func'.
+
+    Returns:
+        list[tuple]: Nombre y función de cada etapa; cada función recibe el resultado de la anterior.
+    """
+    return [
+        ('lectura', lambda _: [list(read_sheets_streaming(path)) for path in paths]),
+        ('preprocesamiento', lambda libros: [[preprocess_dataframe(hoja, skip=skip, columns=columns) for hoja in hojas]
+                                             for hojas in libros]),
+        # Como en las cargas reales, los nombres ya buscados se obtienen de la caché del índice de OIC
+        ('oic', lambda libros: [[(get_best_match(organo), df) for organo, df in hojas] for hojas in libros]),
+        ('extraccion', lambda libros: [[rows_func(df) for _, df in hojas] for hojas in libros]),
+    ]
+
+
+def stages_docx(paths, tables_func, extract_func, **read_options):
+    """
+    Define las etapas de la extracción de un PINT o IMC sobre varios documentos: la lectura del XML del documento,
+    la conversión de sus tablas a DataFrames y la extracción de los datos.
+
+    Args:
+        paths (list[str]): Rutas de los documentos.
+        tables_func (callable): Función que convierte el contenido de un documento en los argumentos de
+                                'extract_func'.
+        extract_func (callable): Función que extrae los datos de las tablas.
+        **read_options: Argumentos de read_docx.
+
+    Returns:
+        list[tuple]: Nombre y función de cada etapa; cada función recibe el resultado de la anterior.
+    """
+    return [
+        ('xml', lambda _: [read_docx(path, **read_options) for path in paths]),
+        ('tablas', lambda contenidos: [tables_func(contenido) for contenido in contenidos]),
+        ('extraccion', lambda tablas: [extract_func(*args) for args in tablas]),
+    ]
+
+
+def pint_tables(contenido):
+    return contenido.primer_parrafo, [pd.DataFrame(tabla) for tabla in contenido.tablas]
+
+
+def imc_tables(contenido):
+    return [pd.DataFrame(tabla) for tabla in contenido.tablas_encabezado + contenido.tablas],
+
+
+class Command(BaseCommand):
+    help = ('Mide el desempeño de extract_paa, extract_paci, extract_pint y read_format_a3 sobre documentos '
+            'sintéticos y guarda los resultados en un archivo JSON para compararlos entre versiones.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sheets', type=int, default=4, help='Hojas de cada PAA y PACI.')
+        parser.add_argument('--rows', type=int, default=250, help='Filas de actividades de cada hoja.')
+        parser.add_argument('--docs', type=int, default=5, help='Documentos de cada tipo.')
+        parser.add_argument('--pint-rows', type=int, default=50,
+                            help='Filas de actividades de cada PINT y filas adicionales de cada IMC.')
+        parser.add_argument('--repeat', type=int, default=3, help='Ejecuciones de cada medición.')
+        parser.add_argument('--output', default='benchmark_extractores.json', help='Archivo JSON de resultados.')
+        parser.add_argument('--current-db', action='store_true',
+                            help='Usa la base de datos configurada en lugar de crear una base de datos de prueba '
+                                 'con los catálogos de initial_data.json.')
+
+    def handle(self, *args, **options):
+        old_name = None
+        if not options['current_db']:
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            call_command('loaddata', FIXTURE, verbosity=0)
+        invalidate_catalogo()
+        try:
+            oic = Oic.objects.order_by('pk').values_list('nombre', flat=True).first()
+            if oic is None:
+                self.stderr.write('No hay OIC registrados en la base de datos.')
+                return
+
+            # Se cargan los catálogos antes de medir para que ninguna etapa incluya las consultas a la base de datos
+            for model in {*EXTRACTOR_CATALOGOS, *CATALOGOS_PACI}:
+                get_catalogo(model)
+
+            with tempfile.TemporaryDirectory() as directory:
+                resultados = self.run_benchmarks(directory, oic, options)
+        finally:
+            invalidate_catalogo()
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'commit': get_commit(),
+            'python': platform.python_version(),
+            'parametros': {key: options[key] for key in ('sheets', 'rows', 'docs', 'pint_rows', 'repeat')},
+            'resultados': resultados,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+
+        for nombre, resultado in resultados.items():
+            self.stdout.write(f"{nombre}: {resultado['total_segundos']:.3f} s, "
+                              f"{resultado['filas_por_segundo']:.0f} filas/s, "
+                              f"{resultado['documentos_por_segundo']:.1f} documentos/s, "
+                              f"{resultado['memoria_pico_bytes'] / 1024 / 1024:.1f} MiB")
+        self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['output']}"))
+
+    def run_benchmarks(self, directory, oic, options):
+        """
+        Genera los documentos sintéticos y mide cada función de extracción.
+
+        Args:
+            directory (str): Carpeta temporal para los documentos.
+            oic (str): Nombre del OIC de los documentos.
+            options (dict): Opciones del comando.
+
+        Returns:
+            dict: Resultados de cada función de extracción.
+        """
+        docs = options['docs']
+        sheets, rows, pint_rows = options['sheets'], options['rows'], options['pint_rows']
+
+        paa = [generate_paa(os.path.join(directory, f'paa_{i}.xlsx'), oic, sheets=sheets, rows=rows)
+               for i in range(docs)]
+        paci = [generate_paci(os.path.join(directory, f'paci_{i}.xlsx'), oic, sheets=sheets, rows=rows)
+                for i in range(docs)]
+        pint = [generate_pint(os.path.join(directory, f'pint_{i}.docx'), oic, actividades=pint_rows, numero=i + 1)
+                for i in range(docs)]
+        imc = [generate_imc(os.path.join(directory, f'imc_{i}.docx'), oic, filas=pint_rows, numero=i + 1)
+               for i in range(docs)]
+
+        return {
+            'extract_paa': self.run_benchmark(paa, extract_paa,
+                                              stages_excel(paa, extract_paa_rows, 0, PAA.NUM_COLUMNAS),
+                                              options['repeat']),
+            'extract_paci': self.run_benchmark(paci, extract_paci,
+                                               stages_excel(paci, extract_paci_rows, 1, PACI.NUM_COLUMNAS),
+                                               options['repeat']),
+            'extract_pint': self.run_benchmark(pint, extract_pint,
+                                               stages_docx(pint, pint_tables, extract_pint_data,
+                                                           max_tablas=PINT.NUM_TABLAS),
+                                               options['repeat']),
+            'read_format_a3': self.run_benchmark(imc, IMC.read_format_a3,
+                                                 stages_docx(imc, imc_tables, IMC.process_dfs,
+                                                             max_tablas=IMC.NUM_TABLAS, encabezado=True),
+                                                 options['repeat']),
+        }
+
+    def run_benchmark(self, paths, extract_func, stages, repeat):
+        """
+        Mide una función de extracción completa y cada una de sus etapas sobre los mismos documentos.
+
+        Args:
+            paths (list[str]): Rutas de los documentos.
+            extract_func (callable): Función de extracción que recibe la ruta de un documento.
+            stages (list[tuple]): Etapas de la extracción, obtenidas con stages_excel o stages_docx.
+            repeat (int): Ejecuciones de cada medición.
+
+        Returns:
+            dict: Duración de cada etapa y de la extracción completa, filas y documentos por segundo y memoria máxima.
+        """
+        run_all = lambda: [extract_func(path) for path in paths]
+        results, total, promedio = measure(run_all, repeat)
+        if any(result is None for result in results):
+            self.stderr.write(f'{extract_func.__name__} no reconoció alguno de los documentos sintéticos.')
+
+        etapas = {}
+        value = None
+        for nombre, stage in stages:
+            value, minimo, promedio_etapa = measure(lambda stage=stage, value=value: stage(value), repeat)
+            etapas[nombre] = {'segundos': minimo, 'promedio_segundos': promedio_etapa}
+
+        filas = sum(count_rows(result) for result in results)
+        return {
+            'documentos': len(paths),
+            'filas': filas,
+            'total_segundos': total,
+            'promedio_segundos': promedio,
+            'filas_por_segundo': filas / total if total else 0.0,
+            'documentos_por_segundo': len(paths) / total if total else 0.0,
+            'memoria_pico_bytes': measure_peak_memory(run_all),
+            'etapas': etapas,
+        }
+
+
+def count_rows(result):
+    """
+    Cuenta las filas de actividades del resultado de una función de extracción.
+
+    Args:
+        result: Resultado de extract_paa o extract_paci (lista de [OIC, filas] por hoja), o de extract_pint o
+                read_format_a3 (un diccionario por documento).
+
+    Returns:
+        int: Número de filas.
+    """
+    if result is None:
+        return 0
+    if isinstance(result, dict):
+        return 1
+    return sum(len(filas) for _, filas in result)
+
+
+def get_commit():
+    """
+    Obtiene el commit actual del repositorio para identificar los resultados.
+
+    Returns:
+        str or None: Hash abreviado del commit, o None si no se puede obtener.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
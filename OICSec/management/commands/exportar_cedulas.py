@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from OICSec.funcs.Supervision import cedulas_zip
+from OICSec.models import ActividadFiscalizacion
+
+
+class Command(BaseCommand):
+    help = ('Genera las cédulas de todas las auditorías, intervenciones y controles internos de una actividad de '
+            'fiscalización, o de un trimestre de todos los OIC, en un archivo zip.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--actividad', type=int, help='Id de la actividad de fiscalización.')
+        parser.add_argument('--anyo', type=int, help='Año del trimestre.')
+        parser.add_argument('--trimestre', type=int, help='Trimestre de todos los OIC.')
+        parser.add_argument('--output', required=True, help='Archivo zip de salida.')
+
+    def handle(self, *args, **options):
+        query = ActividadFiscalizacion.objects.select_related('id_oic')
+        if options['actividad'] is not None:
+            actividades = list(query.filter(pk=options['actividad']))
+        elif options['anyo'] is not None and options['trimestre'] is not None:
+            actividades = list(query.filter(anyo=options['anyo'], trimestre=options['trimestre'])
+                               .order_by('id_oic__nombre', 'pk'))
+        else:
+            raise CommandError('Indica --actividad, o --anyo y --trimestre.')
+        if not actividades:
+            raise CommandError('No hay actividades de fiscalización con los datos indicados.')
+
+        size = 0
+        with open(options['output'], 'wb') as output:
+            for chunk in cedulas_zip(actividades):
+                output.write(chunk)
+                size += len(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Cédulas guardadas en {options['output']} ({size} bytes)"))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from OICSec.funcs.Seguimiento import load_minutas, minutas_zip
+from OICSec.models import ActividadFiscalizacion
+
+
+class Command(BaseCommand):
+    help = ('Genera las minutas de un mes de todos los OIC de un trimestre en un archivo zip, con un reporte de las '
+            'minutas que no se pudieron generar.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--anyo', type=int, required=True, help='Año del trimestre.')
+        parser.add_argument('--trimestre', type=int, required=True, help='Trimestre de todos los OIC.')
+        parser.add_argument('--mes', type=int, required=True, choices=[1, 2, 3], help='Mes de la minuta.')
+        parser.add_argument('--output', required=True, help='Archivo zip de salida.')
+
+    def handle(self, *args, **options):
+        actividades = list(ActividadFiscalizacion.objects.filter(anyo=options['anyo'], trimestre=options['trimestre'])
+                           .select_related('id_oic__id_direccion').order_by('id_oic__nombre', 'pk'))
+        if not actividades:
+            raise CommandError('No hay actividades de fiscalización con los datos indicados.')
+
+        minutas = load_minutas(actividades, options['mes'])
+        size = 0
+        with open(options['output'], 'wb') as output:
+            for chunk in minutas_zip(minutas):
+                output.write(chunk)
+                size += len(chunk)
+        for minuta in minutas:
+            if minuta.error:
+                self.stderr.write(f'{minuta.nombre}: {minuta.error}')
+        generadas = sum(1 for minuta in minutas if minuta.error is None)
+        self.stdout.write(self.style.SUCCESS(
+            f"{generadas} de {len(minutas)} minutas guardadas en {options['output']} ({size} bytes)"))
@@ -0,0 +1,68 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Número de conceptos de cada tipo de concepto de la minuta, como TIPOS_CONCEPTO de funcs/Seguimiento.py
+CONCEPTOS_POR_TIPO = {1: 20, 2: 25, 3: 23}
+
+
+def copy_conceptos(apps, schema_editor):
+    """
+    Junta los conceptos de cada (minuta, tipo_concepto) de concepto_minuta en un solo registro de seccion_minuta.
+    Si una clave está repetida se toma el primer concepto creado, igual que al leerlos en la vista.
+    """
+    ConceptoMinuta = apps.get_model('OICSec', 'ConceptoMinuta')
+    SeccionMinuta = apps.get_model('OICSec', 'SeccionMinuta')
+    secciones = {}
+    query = ConceptoMinuta.objects.filter(id_minuta__isnull=False, tipo_concepto__in=list(CONCEPTOS_POR_TIPO))
+    for concepto in query.order_by('pk').iterator():
+        conceptos = secciones.setdefault((concepto.id_minuta_id, concepto.tipo_concepto), {})
+        clave = int(concepto.clave) if concepto.clave and concepto.clave.isdigit() else None
+        if clave is not None and 1 <= clave <= CONCEPTOS_POR_TIPO[concepto.tipo_concepto]:
+            conceptos.setdefault(clave, [concepto.estatus, concepto.comentario])
+    SeccionMinuta.objects.bulk_create([
+        SeccionMinuta(id_minuta_id=id_minuta, tipo_concepto=tipo, conceptos=[
+            conceptos.get(clave, [None, None]) for clave in range(1, CONCEPTOS_POR_TIPO[tipo] + 1)
+        ])
+        for (id_minuta, tipo), conceptos in secciones.items()
+    ], batch_size=500)
+
+
+def restore_conceptos(apps, schema_editor):
+    """
+    Vuelve a escribir en concepto_minuta los conceptos de las minutas que tienen secciones, con un registro por
+    clave.
+    """
+    ConceptoMinuta = apps.get_model('OICSec', 'ConceptoMinuta')
+    SeccionMinuta = apps.get_model('OICSec', 'SeccionMinuta')
+    secciones = list(SeccionMinuta.objects.order_by('pk'))
+    ConceptoMinuta.objects.filter(id_minuta__in={seccion.id_minuta_id for seccion in secciones}).delete()
+    ConceptoMinuta.objects.bulk_create([
+        ConceptoMinuta(clave=str(clave), estatus=estatus, comentario=comentario,
+                       tipo_concepto=seccion.tipo_concepto, id_minuta_id=seccion.id_minuta_id)
+        for seccion in secciones
+        for clave, (estatus, comentario) in enumerate(seccion.conceptos, start=1)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OICSec', '0038_alter_auditoria_estado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeccionMinuta',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('tipo_concepto', models.IntegerField(choices=[(1, 'Auditoria'), (2, 'Intervención'), (3, 'Control')])),
+                ('conceptos', models.JSONField(default=list)),
+                ('id_minuta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='OICSec.minuta')),
+            ],
+            options={
+                'db_table': 'seccion_minuta',
+                'unique_together': {('id_minuta', 'tipo_concepto')},
+            },
+        ),
+        migrations.RunPython(copy_conceptos, restore_conceptos),
+    ]
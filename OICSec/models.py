@@ -334,6 +334,19 @@ class ConceptoMinuta(models.Model):
         db_table = 'concepto_minuta'
 
 
+class SeccionMinuta(models.Model):
+    # Conceptos de un tipo de la minuta del mes 3 en un solo registro: la lista guarda [estatus, comentario] de cada
+    # clave, en orden a partir de la clave 1. Reemplaza a ConceptoMinuta, que se conserva para la migración.
+    id = models.AutoField(primary_key=True)
+    tipo_concepto = models.IntegerField(choices=ConceptoMinuta.TIPO_CHOICES)
+    conceptos = models.JSONField(default=list)
+    id_minuta = models.ForeignKey('Minuta', on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = 'seccion_minuta'
+        unique_together = (('id_minuta', 'tipo_concepto'),)
+
+
 class MinutaPersonal(models.Model):
     TIPO_CHOICES = [
         (1, 'Director Coordinación'),
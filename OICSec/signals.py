@@ -1,13 +1,15 @@
 from django.db.models import Sum
-from django.db.models.signals import post_delete, pre_delete
+from django.db.models.signals import post_delete, pre_delete, post_save
 from django.dispatch import receiver
 from django.contrib import messages
 from axes.signals import user_login_failed
 from axes.models import AccessAttempt
 from django.utils.translation import gettext as _
 
+from .funcs.Catalogo import schedule_invalidate_catalogo
 from .models import Auditoria, Intervencion, ControlInterno, ConceptoCedula, Minuta, ConceptoMinuta, AuditoriaArchivos, \
-    IntervencionArchivos, ControlArchivos
+    IntervencionArchivos, ControlArchivos, Materia, Programacion, Enfoque, Temporalidad, Oic, \
+    TipoRevision, ProgramaRevision, SeccionMinuta
 
 
 def delete_cedula_related_records(cedula):
@@ -53,6 +55,7 @@ def delete_minuta_related_records(actividad):
     minuta = Minuta.objects.filter(id_actividad_fiscalizacion=actividad).first()
     if minuta:
         ConceptoMinuta.objects.filter(id_minuta=minuta).delete()
+        SeccionMinuta.objects.filter(id_minuta=minuta).delete()
         if minuta.id_archivo:
             archivo = minuta.id_archivo
             archivo.delete()
@@ -106,6 +109,25 @@ def delete_related_records(sender, instance, **kwargs):
         delete_minuta_related_records(actividad)
 
 
+@receiver(post_save, sender=Materia)
+@receiver(post_save, sender=Programacion)
+@receiver(post_save, sender=Enfoque)
+@receiver(post_save, sender=Temporalidad)
+@receiver(post_save, sender=Oic)
+@receiver(post_save, sender=TipoRevision)
+@receiver(post_save, sender=ProgramaRevision)
+@receiver(post_delete, sender=Materia)
+@receiver(post_delete, sender=Programacion)
+@receiver(post_delete, sender=Enfoque)
+@receiver(post_delete, sender=Temporalidad)
+@receiver(post_delete, sender=Oic)
+@receiver(post_delete, sender=TipoRevision)
+@receiver(post_delete, sender=ProgramaRevision)
+def invalidate_catalogos(sender, **kwargs):
+    # Los índices en memoria de los catálogos se recargan en la siguiente búsqueda
+    schedule_invalidate_catalogo(sender)
+
+
 @receiver(user_login_failed)
 def check_failed_attempts(sender, credentials, request, **kwargs):
     ip_address = request.META.get('REMOTE_ADDR')
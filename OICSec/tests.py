@@ -1,19 +1,74 @@
 import datetime
+import importlib
+import io
+import json
 import os
-
+import tempfile
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+import docx
+import openpyxl
+import pandas as pd
+from django.apps import apps as django_apps
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.messages import get_messages
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.management import call_command
-from django.test import TestCase, Client
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 from .forms import AuditoriaForm, ControlForm, IntervencionForm
+from .funcs.Cache import ParseCache
+from .funcs import Cedula as cedula_funcs
+from .funcs.Archivos import document_digest, save_generated
+from .funcs.Cedula import Concepto, ConceptosLista, SupervisionData
+from .funcs.Catalogo import CatalogoIndex, get_catalogo, invalidate_catalogo, resolve_oic
+from .funcs.IMC import read_format_a3, read_format_a3_docx
+from .funcs import Minuta as minuta_funcs
+from .funcs import Seguimiento as seguimiento
+from .funcs.Minuta import create_revision, render_minuta, render_minuta_cached
+from .funcs.Lector import HojaActividades, read_sheets_pandas, read_sheets_streaming
+from .funcs.LectorDocx import FormatoDocxError, read_docx
+from .funcs.PAA import extract_paa_rows, extract_paa, preprocess_dataframe
+from .funcs.Ingesta import bulk_create_returning, ingest_auditorias, ingest_controles_internos, \
+    ingest_intervenciones
+from .funcs.Movimientos import CANCELACION, INCORPORACION, MODIFICACION, MovimientoIMC, apply_movimientos, \
+    read_movimiento
+from .funcs.PACI import extract_paci_rows, extract_paci, extract_programa_tipo
+from .funcs.PINT import LabelIndex, extract_data_from_df, extract_pint, extract_pint_docx
+from .funcs import PAA as paa_funcs
+from .funcs import PACI as paci_funcs
+from .funcs import Procesamiento as procesamiento
+from .funcs.Procesamiento import parse_files
+from .funcs.Seguimiento import load_minutas
+from .funcs.Supervision import conceptos_por_celda, load_cedulas, read_conceptos_form, render_cedulas, \
+    update_conceptos_cedula
+from .funcs.Sinteticos import generate_paa, generate_paci, generate_pint, generate_imc
 from .models import ActividadFiscalizacion, Oic, Auditoria, ControlInterno, Intervencion, TipoIntervencion, Cedula, \
-    ConceptoCedula, Minuta, ConceptoMinuta, Archivo, Persona, Personal, CargoPersonal, TipoCargo
+    ConceptoCedula, Minuta, ConceptoMinuta, Archivo, Persona, Personal, CargoPersonal, TipoCargo, Materia, \
+    Programacion, Enfoque, Temporalidad, AuditoriaArchivos, ControlArchivos, IntervencionArchivos, TipoRevision, \
+    ProgramaRevision, CedulaPersonal, Direccion, MinutaPersonal, SeccionMinuta
 from .signals import is_last_record_in_activity
-from .views import convert_to_date, clean_oic_text, get_most_similar_tipo_intervencion, get_cedula_conceptos
+from .views import convert_to_date, clean_oic_text, get_most_similar_tipo_intervencion, get_cedula_conceptos, \
+    get_pint_row
+
+# Las pruebas no usan las cachés en disco del proyecto, para que su resultado no dependa de lo que dejaron
+# ejecuciones anteriores; las pruebas de las cachés configuran su propia carpeta temporal
+sin_cache = override_settings(PARSE_CACHE_DIR=None, DOCUMENT_CACHE_DIR=None)
+
+
+def setUpModule():
+    sin_cache.enable()
+
+
+def tearDownModule():
+    sin_cache.disable()
 
 
 class LoggedIn(TestCase):
@@ -381,6 +436,32 @@ class UploadPaaViewTest(LoggedIn):
         self.assertEqual(response.status_code, 200)
         self.assertIn('excel_processing_error', response.context)
 
+    def test_post_preview_upload_paa_view(self):
+        response = self.client.post(reverse('uploadPaa'), {
+            'excel_files': SimpleUploadedFile('test_paa.xlsx', self.valid_excel_data),
+            'preview': '1'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Auditoria.objects.exists())
+        self.assertFalse(ActividadFiscalizacion.objects.exists())
+        preview = response.context['preview_result'][0]
+        self.assertEqual(preview['archivo'], 'test_paa.xlsx')
+        self.assertTrue(preview['nuevas'])
+        self.assertTrue(preview['actividades_fiscalizacion'])
+        self.assertNotIn('excel_processing_result', response.context)
+
+        self.client.post(reverse('uploadPaa'), {
+            'excel_files': SimpleUploadedFile('test_paa.xlsx', self.valid_excel_data)
+        })
+        response = self.client.post(reverse('uploadPaa'), {
+            'excel_files': SimpleUploadedFile('test_paa.xlsx', self.valid_excel_data),
+            'preview': '1'
+        })
+        preview = response.context['preview_result'][0]
+        self.assertEqual(preview['nuevas'], [])
+        self.assertEqual(preview['modificadas'], [])
+        self.assertEqual(preview['sin_cambios'], Auditoria.objects.count())
+
     def test_post_update_existing_auditoria(self):
         actividad_fiscalizacion = ActividadFiscalizacion.objects.create(
             id_oic=self.oic,
@@ -411,6 +492,542 @@ class UploadPaaViewTest(LoggedIn):
         self.assertIn('excel_processing_result', response.context)
 
 
+class CatalogoIndexTest(TestCase):
+    def setUp(self):
+        invalidate_catalogo()
+        self.addCleanup(invalidate_catalogo)
+        self.materia = Materia.objects.create(clave=1, tipo='Administrativa')
+        Materia.objects.create(clave=5, tipo='Social')
+        self.programacion = Programacion.objects.create(clave=1, tipo='Ordinaria')
+        self.enfoque = Enfoque.objects.create(clave=1, tipo='Estratégica')
+        self.temporalidad = Temporalidad.objects.create(clave=1, tipo='Ex post')
+
+    def test_catalogo_sin_consultas(self):
+        get_catalogo(Materia).match('Social')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_catalogo(Materia).match('administrativa'), self.materia.id)
+
+    def test_extract_paa_rows(self):
+        df = pd.DataFrame([
+            ['A-1/2024', 'Den 1', 'Unidad', 'Obj', 'Ejercicio 2023', 'Administrativa', 'Ordinaria', 'Estratégica',
+             'Ex post', 'Primero'],
+            ['A-12/2024', 'Den 2', 'Unidad', 'Obj', 'Sin año', 'Social', 'Ordinaria', 'Estratégica', 'Ex post',
+             'Tercero'],
+            ['invalido', 'Den 3', 'Unidad', 'Obj', 'Ejercicio 2024', 'Administrativa', 'Ordinaria', 'Estratégica',
+             'Ex post', 'Primero'],
+        ], index=[9, 10, 11])
+        rows = extract_paa_rows(df)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0], {
+            'Numero': '1', 'Año': '2024', 'Denominacion': 'Den 1', 'Unidad': 'Unidad', 'Objetivo': 'Obj',
+            'Alcance': 'Ejercicio 2023', 'Materia': self.materia.id, 'Programacion': self.programacion.id,
+            'Enfoque': self.enfoque.id, 'Temporalidad': self.temporalidad.id, 'Trimestre': 1, 'Ejercicio': '2023'
+        })
+        self.assertEqual((rows[1]['Numero'], rows[1]['Trimestre'], rows[1]['Ejercicio']), ('12', 3, None))
+        self.assertEqual((rows[2]['Numero'], rows[2]['Año'], rows[2]['Materia']), (None, None, self.materia.id))
+
+    def test_extract_paci_rows(self):
+        df = pd.DataFrame([
+            ['01/2024', 'Den 1', 'Obj', 'Área', 'Segundo', 'Seguimiento - Recursos Humanos'],
+            ['2/2024', 'Den 2', 'Obj', 'Área', 'Cuarto', 'Seguimiento'],
+        ])
+        rows = extract_paci_rows(df)
+        self.assertEqual([(row['Numero'], row['Año'], row['Trimestre']) for row in rows],
+                         [('01', '2024', 2), (None, None, 4)])
+        self.assertEqual(rows[1]['programa_revision'], None)
+
+    def test_catalogo_invalidacion(self):
+        self.assertIsNotNone(get_catalogo(Materia).match('Electoral'))
+        electoral = Materia.objects.create(clave=3, tipo='Electoral')
+        self.assertEqual(get_catalogo(Materia).match('Electoral'), electoral.id)
+        electoral.delete()
+        self.assertNotEqual(get_catalogo(Materia).match('Electoral'), electoral.id)
+
+
+class OicResolverTest(TestCase):
+    def setUp(self):
+        invalidate_catalogo()
+        self.addCleanup(invalidate_catalogo)
+        self.salud = Oic.objects.create(nombre='Secretaría de Salud')
+        self.obras = Oic.objects.create(nombre='Secretaría de Obras y Servicios')
+
+    def test_resolve_oic(self):
+        oic, ratio = resolve_oic('Órgano Interno de Control en la Secretaría de Salud de la Ciudad de México')
+        self.assertEqual(oic, self.salud)
+        self.assertGreater(ratio, 0.8)
+
+    def test_resolve_oic_sin_consultas(self):
+        resolve_oic('Secretaria de Obras')
+        with self.assertNumQueries(0):
+            oic, _ = resolve_oic('SECRETARÍA DE OBRAS Y SERVICIOS')
+        self.assertEqual(oic, self.obras)
+
+    def test_resolve_oic_invalidacion(self):
+        self.assertIn(resolve_oic('Secretaría de Movilidad')[0], [self.salud, self.obras])
+        movilidad = Oic.objects.create(nombre='Secretaría de Movilidad')
+        self.assertEqual(resolve_oic('Secretaría de Movilidad')[0], movilidad)
+
+    def test_resolve_oic_sin_registros(self):
+        Oic.objects.all().delete()
+        self.assertEqual(resolve_oic('Secretaría de Salud'), (None, 0.0))
+
+
+class RevisionIndexTest(TestCase):
+    def setUp(self):
+        invalidate_catalogo()
+        self.addCleanup(invalidate_catalogo)
+        self.seguimiento = TipoRevision.objects.create(clave='1', tipo='Seguimiento a acciones de mejora')
+        self.evaluacion = TipoRevision.objects.create(clave='2', tipo='Evaluación de indicadores')
+        self.humanos = ProgramaRevision.objects.create(clave='1', tipo='Recursos Humanos')
+        self.presupuesto = ProgramaRevision.objects.create(clave='2', tipo='Presupuesto')
+
+    def test_extract_programa_tipo(self):
+        self.assertEqual(extract_programa_tipo('Evaluacion de indicadores - presupuesto '),
+                         {'tipo_revision': self.evaluacion.id, 'programa_revision': self.presupuesto.id})
+        self.assertEqual(extract_programa_tipo('Seguimiento a acciones de mejora'),
+                         {'tipo_revision': self.seguimiento.id, 'programa_revision': None})
+
+    def test_textos_repetidos_sin_consultas(self):
+        df = pd.DataFrame([
+            ['01/2024', 'Den', 'Obj', 'Área', 'Primero', 'Seguimiento a acciones de mejora - Recursos Humanos'],
+            ['02/2024', 'Den', 'Obj', 'Área', 'Segundo', 'Evaluación de indicadores - Presupuesto'],
+        ] * 50)
+        extract_paci_rows(df.head(2))
+        with self.assertNumQueries(0), \
+                mock.patch.object(CatalogoIndex, 'match', wraps=CatalogoIndex.match, autospec=True) as match:
+            rows = extract_paci_rows(df)
+        self.assertEqual(match.call_count, 0)
+        self.assertEqual({(row['tipo_revision'], row['programa_revision']) for row in rows},
+                         {(self.seguimiento.id, self.humanos.id), (self.evaluacion.id, self.presupuesto.id)})
+
+    def test_invalidacion(self):
+        self.assertIn(extract_programa_tipo('Otras revisiones - Obra pública')['programa_revision'],
+                      [self.humanos.id, self.presupuesto.id])
+        obra = ProgramaRevision.objects.create(clave='3', tipo='Obra pública')
+        self.assertEqual(extract_programa_tipo('Otras revisiones - Obra pública')['programa_revision'], obra.id)
+
+
+class LabelIndexTest(TestCase):
+    def test_extract_data_from_df(self):
+        df = pd.DataFrame([
+            ['Ente Público', 'Secretaría de Salud', 'Secretaría de Salud', '', ''],
+            ['Número', 'V-04/2024', 'Denominación', 'Revisión de expedientes', 'Revisión de expedientes'],
+            ['Clave', '14', 'Tipo de Intervención', 'Verificación', 'Verificación'],
+        ])
+        data = extract_data_from_df(df, ['Ente Publico', 'Denominación', 'Tipo de Intervención', 'Fecha'])
+        self.assertEqual(data, {'Ente Publico': 'Secretaría de Salud', 'Denominación': 'Revisión de expedientes',
+                                'Tipo de Intervención': 'Verificación', 'Fecha': ''})
+
+    def test_primera_celda_por_filas(self):
+        df = pd.DataFrame([['Supervisión', '1', 'Responsable', '2'], ['Responsable', '3', 'Auditores', '4']])
+        self.assertEqual(LabelIndex(df).find(['Responsable', 'Auditores']), {'Responsable': (0, 2),
+                                                                            'Auditores': (1, 2)})
+        self.assertEqual(extract_data_from_df(df, ['Responsable'])['Responsable'], '2')
+
+
+class LectorDocxTest(TestCase):
+    def docx_tables(self, tables):
+        return [[[cell.text for cell in row.cells] for row in table.rows] for table in tables]
+
+    def test_tablas_iguales_a_python_docx(self):
+        document = docx.Document()
+        document.add_paragraph('Primer\tpárrafo')
+        table = document.add_table(rows=4, cols=4)
+        for i, row in enumerate(table.rows):
+            for j, cell in enumerate(row.cells):
+                cell.text = f'{i}{j}'
+        table.cell(0, 0).merge(table.cell(0, 2))
+        table.cell(1, 1).merge(table.cell(3, 1))
+        table.cell(1, 2).merge(table.cell(2, 3))
+        run = table.cell(3, 3).add_paragraph('segundo').add_run('x')
+        run.add_break()
+        run.add_text('y')
+        otra = document.add_table(rows=1, cols=2)
+        otra.cell(0, 1).add_table(rows=1, cols=1).cell(0, 0).text = 'anidada'
+        header = document.sections[0].header
+        header.add_table(rows=2, cols=1, width=document.sections[0].page_width).cell(1, 0).text = 'OIC'
+        buffer = io.BytesIO()
+        document.save(buffer)
+
+        contenido = read_docx(io.BytesIO(buffer.getvalue()), encabezado=True)
+        document = docx.Document(io.BytesIO(buffer.getvalue()))
+        self.assertEqual(contenido.primer_parrafo, document.paragraphs[0].text)
+        self.assertEqual(contenido.tablas, self.docx_tables(document.tables))
+        self.assertEqual(contenido.tablas_encabezado, self.docx_tables(document.sections[0].header.tables))
+        self.assertEqual(len(read_docx(io.BytesIO(buffer.getvalue()), max_tablas=1).tablas), 1)
+
+    def test_extractores_iguales_a_python_docx(self):
+        pint = generate_pint(io.BytesIO(), 'Secretaría de Salud', actividades=20).getvalue()
+        self.assertEqual(extract_pint(io.BytesIO(pint)), extract_pint_docx(io.BytesIO(pint)))
+        imc = generate_imc(io.BytesIO(), 'Secretaría de Salud', filas=5).getvalue()
+        self.assertEqual(read_format_a3(io.BytesIO(imc)), read_format_a3_docx(io.BytesIO(imc)))
+        fixtures_dir = os.path.join(os.path.dirname(__file__), 'fixtures', 'test_documents')
+        for name in ['test_pint.docx', 'test_pint_invalid.docx']:
+            path = os.path.join(fixtures_dir, name)
+            self.assertEqual(extract_pint(path), extract_pint_docx(path))
+
+    def test_estructura_inesperada_usa_python_docx(self):
+        pint = generate_pint(io.BytesIO(), 'Secretaría de Salud').getvalue()
+        with mock.patch('OICSec.funcs.PINT.read_docx', side_effect=FormatoDocxError('estructura')), \
+                self.assertLogs('OICSec.funcs.PINT', level='WARNING') as logs:
+            self.assertEqual(extract_pint(io.BytesIO(pint)), extract_pint_docx(io.BytesIO(pint)))
+        self.assertIn('estructura', logs.output[0])
+        with self.assertLogs('OICSec.funcs.PINT', level='WARNING'):
+            self.assertIsNone(extract_pint(io.BytesIO(b'no es un docx')))
+
+
+class LectorExcelTest(TestCase):
+    def assertHojasIguales(self, path):
+        for streaming, completa in zip(read_sheets_streaming(path), read_sheets_pandas(path), strict=True):
+            self.assertEqual(streaming.nombre, completa.nombre)
+            self.assertEqual(list(streaming.filas.index), list(completa.filas.index))
+            self.assertEqual(streaming.filas.values.tolist(), completa.filas.values.tolist())
+            self.assertEqual(streaming.anteriores, completa.anteriores)
+
+    def test_lector_fixtures(self):
+        fixtures_dir = os.path.join(os.path.dirname(__file__), 'fixtures', 'test_documents')
+        for name in ['test_paa.xlsx', 'test_paa_invalid.xlsx', 'test_paci.xlsx', 'test_paci_invalid.xlsx']:
+            self.assertHojasIguales(os.path.join(fixtures_dir, name))
+
+    def test_lector_fila_mas_ancha(self):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['Encabezado'])
+        sheet.append(['OIC Test'])
+        sheet.append(['A-1/2024', 'test', 3.0])
+        sheet.append(['A-2/2024', 'test', 4.5])
+        sheet.append(['nota', None, None, 'fuera de la tabla'])
+        sheet.append(['A-3/2024', 'test', 5, 'completa'])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+
+        buffer.seek(0)
+        hoja = next(read_sheets_streaming(buffer))
+        self.assertEqual(list(hoja.filas.index), [4])
+        self.assertEqual(hoja.filas.values.tolist(), [['A-3/2024', 'test', 5, 'completa']])
+        self.assertEqual(hoja.anteriores, ['nota'])
+        buffer.seek(0)
+        self.assertHojasIguales(buffer)
+
+    def test_preprocess_dataframe(self):
+        filas = pd.DataFrame([
+            ['Organo', 'OIC', 1, 'ignorada'],
+            ['A-1/2024', 'Den "1"\ncon\tsaltos', 2.5, 'ignorada'],
+            ['A-2/2024', 'Den 2', 3, 'ignorada'],
+        ], index=[7, 8, 9])
+        hoja = HojaActividades(nombre='PAA', filas=filas, anteriores=['x', 'Órgano Interno de Control en "Salud"', 'y'])
+        organo, df = preprocess_dataframe(hoja, skip=1, columns=3)
+        self.assertEqual(organo, 'salud')
+        self.assertEqual(list(df.index), [8, 9])
+        self.assertEqual(df.values.tolist(), [['A-1/2024', 'Den 1 con saltos', 2.5], ['A-2/2024', 'Den 2', 3]])
+
+
+class ProcesamientoParaleloTest(LoggedIn):
+    def setUp(self):
+        super().setUp()
+        invalidate_catalogo()
+        self.addCleanup(invalidate_catalogo)
+        self.oic = Oic.objects.create(nombre="OIC Test")
+        fixtures_dir = os.path.join(os.path.dirname(__file__), 'fixtures', 'test_documents')
+        with open(os.path.join(fixtures_dir, 'test_paa.xlsx'), 'rb') as excel_file:
+            self.valid_excel_data = excel_file.read()
+        with open(os.path.join(fixtures_dir, 'test_paa_invalid.xlsx'), 'rb') as excel_file:
+            self.invalid_excel_data = excel_file.read()
+
+    def get_files(self):
+        return [
+            SimpleUploadedFile('test_paa.xlsx', self.valid_excel_data),
+            SimpleUploadedFile('test_paa_invalid.xlsx', self.invalid_excel_data),
+            SimpleUploadedFile('test_paa_2.xlsx', self.valid_excel_data),
+        ]
+
+    def test_parse_files_mismo_resultado(self):
+        with override_settings(PARSE_WORKERS=1):
+            serial = parse_files(extract_paa, self.get_files())
+        with override_settings(PARSE_WORKERS=2), self.assertNoLogs('OICSec.funcs.Procesamiento', level='WARNING'):
+            paralelo = parse_files(extract_paa, self.get_files())
+
+        self.assertEqual([r.archivo.name for r in paralelo], ['test_paa.xlsx', 'test_paa_invalid.xlsx', 'test_paa_2.xlsx'])
+        self.assertEqual([r.data for r in paralelo], [r.data for r in serial])
+        self.assertIsNotNone(paralelo[0].data)
+        self.assertIsNone(paralelo[1].data)
+
+    def test_catalogos_de_todas_las_extracciones(self):
+        for module in (paa_funcs, paci_funcs):
+            for model in module.EXTRACTOR_CATALOGOS:
+                self.assertIn(model, procesamiento.CATALOGOS_EXTRACCION)
+        self.assertIn(TipoRevision, procesamiento.CATALOGOS_EXTRACCION)
+        self.assertIn(ProgramaRevision, procesamiento.CATALOGOS_EXTRACCION)
+
+    @override_settings(PARSE_WORKERS=2)
+    def test_map_ordered_toma_tareas_al_vuelo(self):
+        leidas = []
+
+        def tareas():
+            for numero in range(20):
+                leidas.append(numero)
+                yield ('x' * numero,)
+
+        resultados = procesamiento.map_ordered(len, tareas())
+        self.assertEqual(next(resultados), (('',), 0))
+        self.assertLessEqual(len(leidas), 5)
+        self.assertEqual([resultado for _, resultado in resultados], list(range(1, 20)))
+
+    def test_pool_se_recrea(self):
+        pool = procesamiento.get_executor(2)
+        self.assertIs(procesamiento.get_executor(2), pool)
+        otro = procesamiento.get_executor(3)
+        self.assertIsNot(otro, pool)
+        procesamiento.discard_executor(otro)
+        self.assertIsNot(procesamiento.get_executor(3), otro)
+
+    @override_settings(PARSE_WORKERS=2)
+    def test_map_ordered_pool_roto(self):
+        pool = mock.Mock()
+        pool.submit.side_effect = BrokenProcessPool()
+        with mock.patch('OICSec.funcs.Procesamiento.get_executor', return_value=pool), \
+                mock.patch('OICSec.funcs.Procesamiento.discard_executor') as discard_executor:
+            resultados = list(procesamiento.map_ordered(len, [('a',), ('bb',), ('ccc',)]))
+        self.assertEqual([resultado for _, resultado in resultados], [1, 2, 3])
+        discard_executor.assert_called_once_with(pool)
+
+    @override_settings(PARSE_WORKERS=2)
+    def test_upload_paa_varios_archivos(self):
+        response = self.client.post(reverse('uploadPaa'), {'excel_files': self.get_files()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['excel_processing_result'], ['test_paa.xlsx', 'test_paa_2.xlsx'])
+        self.assertEqual(response.context['excel_processing_error'], ['test_paa_invalid.xlsx'])
+        self.assertTrue(Auditoria.objects.filter(id_actividad_fiscalizacion__id_oic=self.oic).exists())
+
+
+class ParseCacheTest(TestCase):
+    def setUp(self):
+        invalidate_catalogo()
+        self.addCleanup(invalidate_catalogo)
+        self.oic = Oic.objects.create(nombre="OIC Test")
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.cache_dir = temp_dir.name
+        fixtures_dir = os.path.join(os.path.dirname(__file__), 'fixtures', 'test_documents')
+        with open(os.path.join(fixtures_dir, 'test_paa.xlsx'), 'rb') as excel_file:
+            self.excel_data = excel_file.read()
+
+    def parse(self):
+        with override_settings(PARSE_CACHE_DIR=self.cache_dir, PARSE_WORKERS=1), \
+                mock.patch('OICSec.funcs.Procesamiento.parse_uncached',
+                           wraps=procesamiento.parse_uncached) as parse_uncached:
+            resultado = parse_files(extract_paa, [SimpleUploadedFile('test_paa.xlsx', self.excel_data)])[0]
+        return resultado, parse_uncached.call_args.args[1]
+
+    def test_archivo_repetido_usa_cache(self):
+        primero, procesados = self.parse()
+        self.assertEqual(len(procesados), 1)
+        segundo, procesados = self.parse()
+        self.assertEqual(procesados, [])
+        self.assertEqual(segundo.data, primero.data)
+        self.assertEqual(segundo.data, extract_paa(io.BytesIO(self.excel_data)))
+
+    def test_cambio_en_catalogo_descarta_cache(self):
+        self.parse()
+        Materia.objects.create(clave=1, tipo='Administrativa')
+        _, procesados = self.parse()
+        self.assertEqual(len(procesados), 1)
+
+    def test_eliminacion_por_tamano(self):
+        cache = ParseCache(self.cache_dir, max_bytes=1500)
+        for numero in range(5):
+            cache.set(f'{numero:064x}', 'x' * 500)
+            os.utime(cache.path(f'{numero:064x}'), (numero, numero))
+        self.assertEqual(cache.get(f'{0:064x}'), (False, None))
+        self.assertEqual(cache.get(f'{4:064x}'), (True, 'x' * 500))
+
+    def test_escritura_no_recorre_carpeta(self):
+        cache = ParseCache(self.cache_dir, max_bytes=1024 * 1024)
+        with mock.patch('OICSec.funcs.Cache.os.walk', wraps=os.walk) as walk:
+            for numero in range(10):
+                cache.set(f'{numero:064x}', 'x' * 500)
+        self.assertEqual(walk.call_count, 1)
+
+
+class DocumentCacheTest(TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.cache_dir = temp_dir.name
+        self.data = SupervisionData(*[f'Dato {i}' for i in range(13)])
+        self.conceptos = ConceptosLista([Concepto('1', f'Comentario {i}') for i in range(3)])
+
+    def render(self):
+        with override_settings(DOCUMENT_CACHE_DIR=self.cache_dir), \
+                mock.patch.object(cedula_funcs, 'render_cedula', wraps=cedula_funcs.render_cedula) as render:
+            buffer = cedula_funcs.render_cedula_cached(1, self.data, self.conceptos)
+        return buffer.getvalue(), render.call_count
+
+    def test_mismos_datos_usan_cache(self):
+        primero, renders = self.render()
+        self.assertEqual(renders, 1)
+        segundo, renders = self.render()
+        self.assertEqual(renders, 0)
+        self.assertEqual(segundo, primero)
+
+    def test_cambio_en_datos_o_plantilla_genera_de_nuevo(self):
+        primero, _ = self.render()
+        self.conceptos.Conceptos[2] = Concepto('0', 'Comentario 2')
+        segundo, renders = self.render()
+        self.assertEqual(renders, 1)
+        self.assertNotEqual(document_digest(segundo), document_digest(primero))
+
+        with mock.patch.object(cedula_funcs, 'file_version', return_value=(0, 0)):
+            _, renders = self.render()
+        self.assertEqual(renders, 1)
+
+    def test_minuta_usa_cache(self):
+        revision = create_revision(auditoria_values=[('Cumple', 'Comentario')])
+        datos = [str(i) for i in range(35)]
+        with override_settings(DOCUMENT_CACHE_DIR=self.cache_dir), \
+                mock.patch('OICSec.funcs.Minuta.render_minuta', wraps=render_minuta) as render:
+            primero = render_minuta_cached(datos, False, revision).getvalue()
+            segundo = render_minuta_cached(datos, False, revision).getvalue()
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(segundo, primero)
+
+
+class BenchmarkExtractoresTest(TestCase):
+    def setUp(self):
+        invalidate_catalogo()
+        self.addCleanup(invalidate_catalogo)
+        call_command('loaddata', 'OICSec/fixtures/initial_data.json')
+        self.oic = Oic.objects.order_by('pk').first()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+
+    def test_documentos_sinteticos(self):
+        paa = generate_paa(io.BytesIO(), self.oic.nombre, sheets=2, rows=3)
+        paa.seek(0)
+        resultado = extract_paa(paa)
+        self.assertEqual([oic for oic, _ in resultado], [self.oic.nombre] * 2)
+        self.assertEqual([len(filas) for _, filas in resultado], [3, 3])
+
+        paci = generate_paci(io.BytesIO(), self.oic.nombre, rows=4)
+        paci.seek(0)
+        self.assertEqual(len(extract_paci(paci)[0][1]), 4)
+
+        pint = generate_pint(io.BytesIO(), self.oic.nombre, actividades=5)
+        pint.seek(0)
+        self.assertEqual(extract_pint(pint)['Numero'], '04')
+
+        imc = generate_imc(io.BytesIO(), self.oic.nombre, filas=2)
+        imc.seek(0)
+        self.assertEqual(read_format_a3(imc)['Numero'], 'A-1/2024')
+
+    def test_comando_guarda_resultados(self):
+        output = os.path.join(self.temp_dir, 'benchmark.json')
+        call_command('benchmark_extractores', sheets=1, rows=5, docs=1, pint_rows=2, repeat=1, output=output,
+                     current_db=True, stdout=io.StringIO())
+        with open(output, encoding='utf-8') as output_file:
+            report = json.load(output_file)
+        self.assertEqual(set(report['resultados']),
+                         {'extract_paa', 'extract_paci', 'extract_pint', 'read_format_a3'})
+        self.assertEqual(report['resultados']['extract_paa']['filas'], 5)
+        self.assertIn('lectura', report['resultados']['extract_paci']['etapas'])
+        self.assertGreater(report['resultados']['read_format_a3']['memoria_pico_bytes'], 0)
+
+
+class IngestaTest(TestCase):
+    def setUp(self):
+        invalidate_catalogo()
+        self.addCleanup(invalidate_catalogo)
+        self.oic = Oic.objects.create(nombre='OIC Test')
+        self.materia = Materia.objects.create(clave=1, tipo='Administrativa')
+        self.archivo = SimpleUploadedFile('ingesta_paa.xlsx', b'contenido')
+
+    def get_rows(self, total):
+        return [{
+            'Numero': str(numero), 'Año': '2024', 'Denominacion': f'Auditoría {numero}', 'Unidad': 'Unidad',
+            'Objetivo': 'Objetivo', 'Alcance': 'Ejercicio 2023', 'Materia': self.materia.id, 'Programacion': None,
+            'Enfoque': None, 'Temporalidad': None, 'Trimestre': numero % 4 + 1, 'Ejercicio': '2023'
+        } for numero in range(1, total + 1)]
+
+    def test_ingest_auditorias_consultas(self):
+        with CaptureQueriesContext(connection) as queries:
+            ingest_auditorias([['OIC Test', self.get_rows(200)]], self.archivo)
+        # Los conceptos se insertan en lotes cuyo tamaño depende del motor de base de datos
+        conceptos = [q for q in queries.captured_queries if 'concepto_cedula' in q['sql']]
+        self.assertLess(len(queries) - len(conceptos), 15)
+        self.assertLessEqual(len(conceptos), 200 * 60 // 200)
+        self.assertEqual(Auditoria.objects.filter(estado=1).count(), 200)
+        self.assertEqual(ActividadFiscalizacion.objects.count(), 4)
+        self.assertEqual(ConceptoCedula.objects.count(), 200 * 60)
+        self.assertEqual(AuditoriaArchivos.objects.filter(tipo=0).count(), 200)
+
+    @mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', property(lambda self: False))
+    def test_ingest_auditorias_consultas_sin_llaves_devueltas(self):
+        # Como en MySQL, bulk_create no asigna las llaves de los registros creados
+        with CaptureQueriesContext(connection) as queries:
+            ingest_auditorias([['OIC Test', self.get_rows(200)]], self.archivo)
+        conceptos = [q for q in queries.captured_queries if 'concepto_cedula' in q['sql']]
+        self.assertLess(len(queries) - len(conceptos), 25)
+        self.assertEqual(Auditoria.objects.filter(estado=1).count(), 200)
+        self.assertEqual(Cedula.objects.count(), 200)
+        self.assertEqual(len(set(Auditoria.objects.values_list('id_cedula', flat=True))), 200)
+        self.assertEqual(ConceptoCedula.objects.filter(id_cedula__auditoria__numero=7).count(), 60)
+
+    @mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', property(lambda self: False))
+    def test_bulk_create_returning_insercion_concurrente(self):
+        Cedula.objects.create()
+        bulk_create = Cedula.objects.bulk_create
+
+        def bulk_create_concurrente(objs, **kwargs):
+            # Otra conexión crea una cédula durante la inserción
+            Cedula.objects.create()
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(Cedula.objects, 'bulk_create', side_effect=bulk_create_concurrente):
+            cedulas = bulk_create_returning(Cedula, [Cedula() for _ in range(3)])
+        # La cédula de la otra conexión se deshace junto con la inserción, porque en la prueba comparten transacción
+        self.assertEqual(Cedula.objects.count(), 4)
+        self.assertEqual(len({cedula.pk for cedula in cedulas}), 3)
+        self.assertTrue(all(Cedula.objects.filter(pk=cedula.pk).exists() for cedula in cedulas))
+
+    def test_ingest_auditorias_actualiza_cambios(self):
+        ingest_auditorias([['OIC Test', self.get_rows(20)]], self.archivo)
+        rows = self.get_rows(20)
+        rows[3]['Denominacion'] = 'Modificada'
+
+        with CaptureQueriesContext(connection) as queries:
+            ingest_auditorias([['OIC Test', rows]], self.archivo)
+        self.assertLess(len(queries), 15)
+        self.assertEqual(Auditoria.objects.count(), 20)
+        self.assertEqual(Cedula.objects.count(), 20)
+        self.assertEqual(Auditoria.objects.get(numero=4).denominacion, 'Modificada')
+        self.assertEqual(AuditoriaArchivos.objects.count(), 20)
+
+    def test_ingest_auditorias_guarda_archivo_una_vez(self):
+        with mock.patch.object(self.archivo, 'chunks', wraps=self.archivo.chunks) as chunks:
+            ingest_auditorias([['OIC Test', self.get_rows(50)]], self.archivo)
+        self.assertEqual(chunks.call_count, 1)
+        self.assertEqual(Archivo.objects.filter(nombre='ingesta_paa.xlsx').count(), 1)
+        self.assertEqual(AuditoriaArchivos.objects.values('id_archivo').distinct().count(), 1)
+
+    def test_ingest_auditorias_filas_repetidas(self):
+        rows = self.get_rows(2)
+        repetida = dict(rows[0], Denominacion='Última')
+        ingest_auditorias([['OIC Test', rows + [repetida]]], self.archivo)
+        self.assertEqual(Auditoria.objects.count(), 2)
+        self.assertEqual(Auditoria.objects.get(numero=1).denominacion, 'Última')
+
+    def test_ingest_controles_internos(self):
+        rows = [{'Numero': '01', 'Año': '2024', 'Denominacion': 'Control', 'Objetivo': 'Objetivo', 'Area': 'Área',
+                 'Trimestre': 2, 'tipo_revision': None, 'programa_revision': None}]
+        ingest_controles_internos([['OIC Test', rows]], self.archivo)
+        control = ControlInterno.objects.get()
+        self.assertEqual(control.numero, 1)
+        self.assertEqual(control.id_actividad_fiscalizacion.id_oic, self.oic)
+        self.assertEqual(ConceptoCedula.objects.filter(id_cedula=control.id_cedula).count(), 55)
+        self.assertTrue(ControlArchivos.objects.filter(id_control=control, tipo=0).exists())
+
+
 class UploadPaciViewTest(LoggedIn):
     def setUp(self):
         super().setUp()
@@ -531,11 +1148,51 @@ class UploadPintViewTestCase(LoggedIn):
         self.assertTrue(Cedula.objects.exists())
         self.assertTrue(ConceptoCedula.objects.exists())
 
+    def test_upload_pint_view_preview(self):
+        fixtures_dir = os.path.join(os.path.dirname(__file__), 'fixtures', 'test_documents')
+        with open(os.path.join(fixtures_dir, 'test_pint.docx'), 'rb') as word_file:
+            file_content = word_file.read()
+        actividad_fiscalizacion = ActividadFiscalizacion.objects.create(id_oic=self.oic, anyo=2024, trimestre=3)
+        Intervencion.objects.create(numero=4, id_actividad_fiscalizacion=actividad_fiscalizacion,
+                                    denominacion="Denominación Original")
+
+        response = self.client.post(reverse('uploadPint'), {
+            'word_files': [SimpleUploadedFile("test_pint.docx", file_content)],
+            'preview': '1'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Intervencion.objects.get().denominacion, "Denominación Original")
+        self.assertFalse(IntervencionArchivos.objects.exists())
+        preview = response.context['preview_result'][0]
+        self.assertEqual(preview['nuevas'], [])
+        cambios = {cambio['campo']: cambio for cambio in preview['modificadas'][0]['cambios']}
+        self.assertEqual(cambios['Denominacion']['anterior'], "Denominación Original")
+
     def test_upload_pint_view_no_files(self):
         response = self.client.post(reverse('uploadPint'), {})
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Error al procesar los archivos')
 
+    @override_settings(PARSE_WORKERS=1)
+    def test_upload_pint_view_tipo_inexistente(self):
+        archivos = [SimpleUploadedFile(f'pint_{numero}.docx', generate_pint(io.BytesIO(), self.oic.nombre,
+                                                                            numero=numero).getvalue())
+                    for numero in (1, 2, 3)]
+
+        def get_pint_row_clave(word_processing_result, tipo_intervenciones=None):
+            if word_processing_result['Numero'] == '02':
+                word_processing_result = dict(word_processing_result, Clave='99')
+            return get_pint_row(word_processing_result, tipo_intervenciones)
+
+        with mock.patch('OICSec.views.get_pint_row', side_effect=get_pint_row_clave):
+            response = self.client.post(reverse('uploadPint'), {'word_files': archivos})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['word_processing_result'], ['pint_1.docx', 'pint_3.docx'])
+        self.assertEqual(response.context['word_processing_error'], ['pint_2.docx'])
+        self.assertEqual(sorted(Intervencion.objects.values_list('numero', flat=True)), [1, 3])
+
     def test_post_update_existing_intervencion(self):
         actividad_fiscalizacion = ActividadFiscalizacion.objects.create(
             id_oic=self.oic,
@@ -566,6 +1223,119 @@ class UploadPintViewTestCase(LoggedIn):
         self.assertEqual(response.status_code, 200)
         self.assertIn('word_processing_result', response.context)
 
+    def test_ingest_intervenciones_en_lote(self):
+        invalidate_catalogo()
+        self.addCleanup(invalidate_catalogo)
+        tipo_intervenciones = list(TipoIntervencion.objects.all())
+        documentos = []
+        for numero in range(1, 21):
+            content = generate_pint(io.BytesIO(), self.oic.nombre, numero=numero).getvalue()
+            row = get_pint_row(extract_pint(io.BytesIO(content)), tipo_intervenciones)
+            documentos.append((row, SimpleUploadedFile(f'pint_lote_{numero}.docx', content)))
+        actividad_fiscalizacion = ActividadFiscalizacion.objects.create(id_oic=self.oic, anyo=2024, trimestre=3)
+        existente = Intervencion.objects.create(numero=1, id_actividad_fiscalizacion=actividad_fiscalizacion,
+                                                denominacion="Denominación Original")
+        resolve_oic(self.oic.nombre)
+
+        with CaptureQueriesContext(connection) as queries:
+            intervenciones = ingest_intervenciones(documentos)
+
+        consultas = [q for q in queries.captured_queries if 'concepto_cedula' not in q['sql']]
+        self.assertLessEqual(len(consultas), 12)
+        self.assertEqual(intervenciones[0], existente)
+        existente.refresh_from_db()
+        self.assertEqual(existente.denominacion, 'Intervención sintética')
+        self.assertEqual(existente.id_tipo_intervencion, self.tipo_intervencion)
+        self.assertEqual(Intervencion.objects.count(), 20)
+        self.assertEqual(ActividadFiscalizacion.objects.count(), 1)
+        self.assertEqual(ConceptoCedula.objects.count(), 19 * 54)
+        self.assertEqual(
+            {(a.id_intervencion.numero, a.id_archivo.nombre) for a in IntervencionArchivos.objects.all()},
+            {(numero, f'pint_lote_{numero}.docx') for numero in range(1, 21)})
+
+
+class UploadImcViewTest(LoggedIn):
+
+    def setUp(self):
+        super().setUp()
+        self.oic = Oic.objects.create(nombre='OIC Test')
+        for model, clave in ((Materia, 1), (Programacion, 6), (Enfoque, 8), (Temporalidad, 10)):
+            model.objects.create(clave=clave, tipo=f'Tipo {clave}')
+
+    def get_file(self, numero, tipo):
+        content = generate_imc(io.BytesIO(), self.oic.nombre, numero=numero, tipo=tipo).getvalue()
+        return SimpleUploadedFile(f'imc_{tipo}_{numero}.docx', content)
+
+    def get_movimiento(self, numero, tipo):
+        archivo = self.get_file(numero, tipo)
+        movimiento = read_movimiento(archivo, read_format_a3(io.BytesIO(archivo.read())))
+        archivo.seek(0)
+        return movimiento
+
+    def test_read_movimiento(self):
+        movimiento = self.get_movimiento(5, 'Cancelación')
+        self.assertEqual(movimiento.tipo, CANCELACION)
+        self.assertEqual(movimiento.actividad, (2024, 3, self.oic.pk))
+        self.assertEqual(movimiento.numero, 5)
+        self.assertEqual(movimiento.claves, ['1', '6', '8', '10'])
+        self.assertEqual(movimiento.objetivo, 'Objetivo modificado')
+
+    def test_upload_imc_view(self):
+        response = self.client.post(reverse('uploadIMC'), {'excel_files': [self.get_file(1, 'Incorporación')]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['excel_processing_result'], ['imc_Incorporación_1.docx'])
+        auditoria = Auditoria.objects.get()
+        self.assertEqual((auditoria.numero, auditoria.estado), (1, 1))
+        self.assertEqual(auditoria.id_materia.clave, 1)
+        self.assertEqual(ConceptoCedula.objects.filter(id_cedula=auditoria.id_cedula).count(), 60)
+        self.assertEqual(AuditoriaArchivos.objects.get().tipo, 1)
+
+    def test_upload_imc_view_error(self):
+        response = self.client.post(reverse('uploadIMC'), {'excel_files': [self.get_file(1, 'Cancelación')]})
+
+        self.assertEqual(response.context['excel_processing_error'], ['imc_Cancelación_1.docx'])
+        mensajes = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertIn('Error en imc_Cancelación_1.docx: No hay auditorias activas contenidas con los datos '
+                      'solicitados', mensajes)
+        self.assertFalse(Auditoria.objects.exists())
+
+    def test_apply_movimientos_en_lote(self):
+        actividad = ActividadFiscalizacion.objects.create(id_oic=self.oic, anyo=2024, trimestre=3)
+        existente = Auditoria.objects.create(numero=1, estado=1, objetivo='Original',
+                                             id_actividad_fiscalizacion=actividad)
+        movimientos = [self.get_movimiento(numero, 'Incorporación') for numero in range(2, 12)]
+        movimientos += [
+            self.get_movimiento(1, 'Modificación'),
+            self.get_movimiento(1, 'Incorporación'),
+            self.get_movimiento(2, 'Cancelación'),
+            self.get_movimiento(2, 'Cancelación'),
+            self.get_movimiento(3, 'Modificación'),
+            MovimientoIMC(archivo=self.get_file(20, 'Incorporación'), error='Error al leer el archivo'),
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            apply_movimientos(movimientos)
+
+        consultas = [q for q in queries.captured_queries if 'concepto_cedula' not in q['sql']]
+        self.assertLessEqual(len(consultas), 24)
+        self.assertEqual([m.error is None for m in movimientos], [True] * 11 + [False, True, False, True, False])
+        self.assertEqual(movimientos[11].error, 'Ya se encuentra una auditoria presente con los valores '
+                                                'recolectados, favor de verificar.')
+        self.assertEqual(movimientos[13].error, 'No hay auditorias activas contenidas con los datos solicitados')
+        self.assertEqual(movimientos[15].error, 'Error al leer el archivo')
+
+        existente.refresh_from_db()
+        self.assertEqual(existente.objetivo, 'Objetivo modificado')
+        self.assertEqual(Auditoria.objects.count(), 11)
+        self.assertEqual(ActividadFiscalizacion.objects.count(), 1)
+        self.assertEqual(Auditoria.objects.get(numero=2).estado, 0)
+        self.assertEqual(ConceptoCedula.objects.count(), 10 * 60)
+        self.assertEqual(
+            sorted((a.id_auditoria.numero, a.tipo) for a in AuditoriaArchivos.objects.all()),
+            sorted([(numero, INCORPORACION) for numero in range(2, 12)] + [(1, MODIFICACION), (2, CANCELACION),
+                                                                           (3, MODIFICACION)]))
+
 
 def create_and_register_file(related_instance, filename):
     file_path = ''
@@ -732,6 +1502,364 @@ class GetCedulaConceptosTestCase(LoggedIn):
         self.assertEqual(conceptos_dict, expected_dict)
 
 
+class PlantillaSupervisionTest(TestCase):
+
+    def setUp(self):
+        cedula_funcs.invalidate_plantilla()
+        self.addCleanup(cedula_funcs.invalidate_plantilla)
+
+    def test_plantilla_se_lee_una_vez(self):
+        data = SupervisionData(*[f'Dato {i}' for i in range(13)])
+        conceptos = ConceptosLista([Concepto('1', '') for _ in range(5)])
+        with mock.patch.object(cedula_funcs, 'load_workbook', wraps=cedula_funcs.load_workbook) as load:
+            paths = [cedula_funcs.cedula(kind, data, conceptos) for kind in (1, 3, 1, 2)]
+        self.addCleanup(lambda: [os.remove(path) for path in set(paths)])
+
+        self.assertEqual(load.call_count, 1)
+        workbook = openpyxl.load_workbook(paths[-1])
+        self.assertEqual([sheet.sheet_state for sheet in workbook],
+                         ['hidden', 'visible', 'hidden', 'hidden'])
+        self.assertEqual(workbook['Intervención']['C11'].value, 'Dato 0')
+        self.assertEqual(workbook['Intervención']['E31'].value, 'a')
+
+    def test_copias_independientes(self):
+        plantilla = cedula_funcs.get_plantilla()
+        workbook = plantilla.workbook(1)
+        workbook['Auditoria']['C11'] = 'Modificado'
+
+        self.assertIsNone(plantilla.workbook(1)['Auditoria']['C11'].value)
+        self.assertIsNone(plantilla.workbook(4))
+
+    def test_plantilla_se_recarga_al_cambiar(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'plantilla.xlsx')
+            with open(cedula_funcs.TEMPLATE_PATH, 'rb') as origen, open(path, 'wb') as destino:
+                destino.write(origen.read())
+            plantilla = cedula_funcs.get_plantilla(path)
+            self.assertIs(cedula_funcs.get_plantilla(path), plantilla)
+
+            mtime = os.stat(path).st_mtime_ns + 10 ** 9
+            os.utime(path, ns=(mtime, mtime))
+            self.assertIsNot(cedula_funcs.get_plantilla(path), plantilla)
+
+
+class PlantillaMinutaTest(TestCase):
+
+    def setUp(self):
+        minuta_funcs.invalidate_plantilla()
+        self.addCleanup(minuta_funcs.invalidate_plantilla)
+        self.data = [f'Dato {i + 1}' for i in range(35)]
+        self.revision = [(f'Estatus {i + 1}', f'Comentario {i + 1}') for i in range(25)]
+
+    def read(self, buffer):
+        document = docx.Document(buffer)
+        text = '\n'.join(paragraph.text for paragraph in document.paragraphs)
+        tables = [[cell.text for row in table.rows for cell in row.cells] for table in document.tables]
+        return text, tables
+
+    def test_reemplaza_marcadores(self):
+        revision = create_revision(auditoria_values=self.revision[:20], control_interno_values=self.revision[:23])
+        text, tables = self.read(render_minuta(self.data, False, revision))
+
+        # La tabla de intervenciones no tiene datos y se elimina
+        self.assertEqual(len(tables), 3)
+        self.assertIn('AUDITORÍA', tables[0][0])
+        self.assertIn('CONTROL INTERNO', tables[1][0])
+        self.assertIn('Estatus 20', tables[0])
+        self.assertIn('Comentario 23', tables[1])
+        self.assertIn('Dato 34', tables[2][0])
+        self.assertIn('Dato 1', text)
+        for content in [text] + [cell for table in tables for cell in table]:
+            self.assertNotRegex(content, r'\b[PEC]\d{2}\b')
+
+    def test_plantilla_se_indexa_una_vez(self):
+        self.data[0] = 'Primer valor'
+        with mock.patch.object(minuta_funcs, 'PlantillaMinuta', wraps=minuta_funcs.PlantillaMinuta) as plantilla:
+            primero = render_minuta(self.data, True)
+            self.data[0] = 'Otro valor'
+            segundo = render_minuta(self.data, True)
+
+        # Cada minuta parte de una copia de la plantilla, sin los valores de la anterior
+        self.assertEqual(plantilla.call_count, 1)
+        self.assertIn('Primer valor', self.read(primero)[0])
+        self.assertNotIn('Primer valor', self.read(segundo)[0])
+        self.assertIn('Otro valor', self.read(segundo)[0])
+
+    def test_saltos_de_linea(self):
+        self.data[0] = 'Primera línea\r\nSegunda línea\tcon tabulador'
+        document = docx.Document(render_minuta(self.data, True))
+        paragraph = next(paragraph for paragraph in document.paragraphs if 'Primera línea' in paragraph.text)
+        self.assertIn('Primera línea\nSegunda línea\tcon tabulador', paragraph.text)
+
+        with zipfile.ZipFile(render_minuta(self.data, True)) as archivo:
+            nombres = archivo.namelist()
+        self.assertEqual(len(nombres), len(set(nombres)))
+        self.assertIn('word/document.xml', nombres)
+
+
+class DocumentoGeneradoTest(TestCase):
+
+    def setUp(self):
+        self.data = SupervisionData(*[f'Dato {i}' for i in range(13)])
+        self.conceptos = ConceptosLista([Concepto('1', '') for _ in range(5)])
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        media_dir = mock.patch('OICSec.funcs.Archivos.MEDIA_DIR', self.directory.name)
+        media_dir.start()
+        self.addCleanup(media_dir.stop)
+
+    def test_document_digest_ignora_fecha_de_guardado(self):
+        primera = cedula_funcs.render_cedula(1, self.data, self.conceptos).getvalue()
+        segunda = cedula_funcs.render_cedula(1, self.data, self.conceptos).getvalue()
+        self.data.Nombre = 'Otro nombre'
+        distinta = cedula_funcs.render_cedula(1, self.data, self.conceptos).getvalue()
+
+        self.assertEqual(document_digest(primera), document_digest(segunda))
+        self.assertNotEqual(document_digest(primera), document_digest(distinta))
+
+    def test_save_generated_solo_si_cambia(self):
+        content = cedula_funcs.render_cedula(1, self.data, self.conceptos).getvalue()
+        path, escrito = save_generated(content, 'cedulas', 'cedula.xlsx')
+        self.assertTrue(escrito)
+        mtime = os.stat(path).st_mtime_ns
+
+        content = cedula_funcs.render_cedula(1, self.data, self.conceptos).getvalue()
+        self.assertEqual(save_generated(content, 'cedulas', 'cedula.xlsx'), (path, False))
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+
+        self.data.Nombre = 'Otro nombre'
+        content = cedula_funcs.render_cedula(1, self.data, self.conceptos).getvalue()
+        self.assertEqual(save_generated(content, 'cedulas', 'cedula.xlsx'), (path, True))
+        with open(path, 'rb') as saved:
+            self.assertEqual(saved.read(), content)
+        self.assertEqual(os.listdir(os.path.dirname(path)), ['cedula.xlsx'])
+
+    def test_save_generated_no_deja_temporales(self):
+        with mock.patch('OICSec.funcs.Archivos.os.replace', side_effect=OSError('Disco lleno')):
+            with self.assertRaises(OSError):
+                save_generated(b'contenido', 'minutas', 'minuta.docx')
+        self.assertEqual(os.listdir(os.path.join(self.directory.name, 'minutas')), [])
+
+
+class CedulasLoteTest(LoggedIn):
+
+    def setUp(self):
+        super().setUp()
+        direccion = Direccion.objects.create(direccion='A')
+        self.oic = Oic.objects.create(nombre='OIC Test', id_direccion=direccion)
+        self.actividad = ActividadFiscalizacion.objects.create(id_oic=self.oic, anyo=2024, trimestre=3)
+        firmantes = {}
+        for tipo_personal, cargo_id, nombre in ((1, 1, 'Ana'), (2, 6, 'Luis')):
+            tipo_cargo = TipoCargo.objects.create(id=cargo_id, nombre=f'Cargo {cargo_id}')
+            persona = Persona.objects.create(honorifico='Lic.', nombre=nombre, apellido='Pérez')
+            personal = Personal.objects.create(estado=1, id_oic=self.oic, id_persona=persona)
+            CargoPersonal.objects.create(nombre=f'Cargo de {nombre}', id_tipo_cargo=tipo_cargo, id_personal=personal)
+            firmantes[tipo_personal] = personal
+
+        self.auditoria = Auditoria.objects.create(numero=7, denominacion='Auditoría', id_cedula=Cedula.objects.create(),
+                                                  id_actividad_fiscalizacion=self.actividad)
+        ConceptoCedula.objects.create(id_cedula=self.auditoria.id_cedula, celda='0', estado=1, comentario='Bien')
+        ConceptoCedula.objects.create(id_cedula=self.auditoria.id_cedula, celda='1', estado=0)
+        for tipo_personal, personal in firmantes.items():
+            CedulaPersonal.objects.create(tipo_personal=tipo_personal, id_cedula=self.auditoria.id_cedula,
+                                          id_personal=personal)
+        tipo_intervencion = TipoIntervencion.objects.create(clave=14, tipo='Verificación')
+        Intervencion.objects.create(numero=2, id_tipo_intervencion=tipo_intervencion, id_cedula=Cedula.objects.create(),
+                                    id_actividad_fiscalizacion=self.actividad)
+        ControlInterno.objects.create(numero=3, id_cedula=Cedula.objects.create(),
+                                      id_actividad_fiscalizacion=self.actividad)
+        ControlInterno.objects.create(numero=4, id_actividad_fiscalizacion=self.actividad)
+
+    def read_zip(self, content):
+        with zipfile.ZipFile(io.BytesIO(content)) as archivo_zip:
+            return {name: archivo_zip.read(name) for name in archivo_zip.namelist()}
+
+    def test_load_cedulas(self):
+        with self.assertNumQueries(6):
+            cedulas = load_cedulas([self.actividad])
+
+        self.assertEqual([kind for kind, _, _ in cedulas], [1, 2, 3])
+        _, data, conceptos = cedulas[0]
+        self.assertEqual(data.Numero, 'A-7/2024')
+        self.assertEqual(data.Nombre_Director, 'LIC. ANA PÉREZ')
+        self.assertEqual(data.Cargo_Titular, 'CARGO DE LUIS')
+        self.assertEqual(len(conceptos.Conceptos), 60)
+        self.assertEqual(conceptos.Conceptos[0], Concepto(Estado='1', Comentario='Bien'))
+        self.assertEqual(conceptos.Conceptos[1], Concepto(Estado='0', Comentario=None))
+        self.assertEqual(conceptos.Conceptos[2], Concepto(Estado=None, Comentario=None))
+        self.assertEqual(cedulas[1][1].Numero, 'V-2/2024')
+        self.assertEqual(cedulas[1][1].Nombre_Director, '')
+
+    def test_update_conceptos_cedula(self):
+        conceptos = conceptos_por_celda(ConceptoCedula.objects.filter(id_cedula=self.auditoria.id_cedula))
+        post = {f'estado-{i}': 'Selecciona una opción' for i in range(60)}
+        post.update({'estado-0': '1', 'comentario-0': 'Bien', 'estado-1': '2', 'comentario-1': 'Falta',
+                     'estado-5': '0'})
+        valores = read_conceptos_form(post)
+
+        with CaptureQueriesContext(connection) as queries:
+            conceptos_lista = update_conceptos_cedula(conceptos, valores)
+
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(conceptos_lista.Conceptos[1], Concepto(Estado='2', Comentario='Falta'))
+        self.assertEqual(conceptos_lista.Conceptos[5], Concepto(Estado='0', Comentario=None))
+        self.assertEqual(conceptos_lista.Conceptos[6], Concepto(Estado=None, Comentario=None))
+        guardados = ConceptoCedula.objects.filter(id_cedula=self.auditoria.id_cedula).order_by('celda')
+        self.assertEqual([(c.celda, c.estado, c.comentario) for c in guardados],
+                         [('0', 1, 'Bien'), ('1', 2, 'Falta')])
+
+        with self.assertNumQueries(0):
+            update_conceptos_cedula(conceptos, valores)
+
+    @override_settings(PARSE_WORKERS=1)
+    def test_cedulas_periodo_view(self):
+        response = self.client.get(reverse('cedulas_periodo', kwargs={'actividad_id': self.actividad.id}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIn('attachment; filename=', response['Content-Disposition'])
+        archivos = self.read_zip(b''.join(response.streaming_content))
+        self.assertEqual(sorted(archivos), ['Supervision - A-7_2024 - OIC Test - 03_2024.xlsx',
+                                            'Supervision - CI 3_2024 - OIC Test - 03_2024.xlsx',
+                                            'Supervision - V-2_2024 - OIC Test - 03_2024.xlsx'])
+        workbook = openpyxl.load_workbook(io.BytesIO(archivos['Supervision - A-7_2024 - OIC Test - 03_2024.xlsx']))
+        self.assertEqual(workbook['Auditoria']['E30'].value, 'a')
+        self.assertEqual(workbook['Auditoria']['J30'].value, 'Bien')
+        self.assertEqual(workbook['Auditoria']['F31'].value, 'r')
+        self.assertEqual(workbook['Auditoria']['B132'].value, 'LIC. ANA PÉREZ')
+
+    def test_cedulas_trimestre_view_sin_actividades(self):
+        response = self.client.get(reverse('cedulas_trimestre', kwargs={'anyo': 2023, 'trimestre': 1}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_render_cedulas_paralelo(self):
+        cedulas = load_cedulas([self.actividad])
+        with override_settings(PARSE_WORKERS=1):
+            serial = list(render_cedulas(cedulas))
+        with override_settings(PARSE_WORKERS=2), self.assertNoLogs('OICSec.funcs.Procesamiento', level='WARNING'):
+            paralelo = list(render_cedulas(cedulas))
+
+        self.assertEqual([nombre for nombre, _ in paralelo], [nombre for nombre, _ in serial])
+        self.assertEqual([document_digest(content) for _, content in paralelo],
+                         [document_digest(content) for _, content in serial])
+
+    @override_settings(PARSE_WORKERS=1)
+    def test_exportar_cedulas(self):
+        otra = ActividadFiscalizacion.objects.create(id_oic=Oic.objects.create(nombre='OIC Test'), anyo=2024,
+                                                     trimestre=3)
+        Auditoria.objects.create(numero=7, id_cedula=Cedula.objects.create(), id_actividad_fiscalizacion=otra)
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'cedulas.zip')
+            call_command('exportar_cedulas', anyo=2024, trimestre=3, output=output, stdout=io.StringIO())
+            with open(output, 'rb') as archivo_zip:
+                archivos = self.read_zip(archivo_zip.read())
+
+        self.assertEqual(len(archivos), 4)
+        self.assertIn('Supervision - A-7_2024 - OIC Test - 03_2024 (2).xlsx', archivos)
+
+
+class MinutasLoteTest(LoggedIn):
+
+    def setUp(self):
+        super().setUp()
+        direccion = Direccion.objects.create(direccion='B')
+        self.oic = Oic.objects.create(nombre='OIC Test (Sector)', id_direccion=direccion)
+        self.actividad = ActividadFiscalizacion.objects.create(id_oic=self.oic, anyo=2024, trimestre=3)
+        self.vacia = ActividadFiscalizacion.objects.create(id_oic=Oic.objects.create(nombre='OIC Vacío'), anyo=2024,
+                                                           trimestre=3)
+        Auditoria.objects.create(numero=7, denominacion='Obra pública', estado=1, id_actividad_fiscalizacion=self.actividad)
+        Auditoria.objects.create(numero=8, denominacion='Cancelada', estado=0, id_actividad_fiscalizacion=self.actividad)
+        tipo_intervencion = TipoIntervencion.objects.create(clave=14, tipo='Verificación')
+        Intervencion.objects.create(numero=2, denominacion='Almacenes', id_tipo_intervencion=tipo_intervencion,
+                                    id_actividad_fiscalizacion=self.actividad)
+
+        inicio = timezone.make_aware(datetime.datetime(2024, 9, 26, 10, 0))
+        fin = timezone.make_aware(datetime.datetime(2024, 9, 26, 12, 0))
+        self.minutas = {mes: Minuta.objects.create(mes=mes, inicio=inicio, fin=fin,
+                                                   id_actividad_fiscalizacion=self.actividad) for mes in (1, 3)}
+        for tipo_personal, nombre in ((1, 'Juan'), (2, 'Ana'), (3, 'Luis'), (4, 'María')):
+            persona = Persona.objects.create(honorifico='Lic.', nombre=nombre, apellido='Pérez')
+            personal = Personal.objects.create(estado=1, id_oic=self.oic, id_persona=persona)
+            CargoPersonal.objects.create(nombre=f'Cargo de {nombre}', id_personal=personal)
+            for minuta in self.minutas.values():
+                MinutaPersonal.objects.create(tipo_personal=tipo_personal, id_minuta=minuta, id_personal=personal)
+        SeccionMinuta.objects.create(tipo_concepto=1, conceptos=[[0, 'Bien'], [3, None]], id_minuta=self.minutas[3])
+
+    def read_zip(self, content):
+        with zipfile.ZipFile(io.BytesIO(content)) as archivo_zip:
+            return {name: archivo_zip.read(name) for name in archivo_zip.namelist()}
+
+    def test_load_minutas(self):
+        with self.assertNumQueries(7):
+            minutas = load_minutas([self.actividad, self.vacia], 3)
+
+        minuta, vacia = minutas
+        self.assertIsNone(minuta.error)
+        self.assertFalse(minuta.kind)
+        self.assertEqual(minuta.nombre, 'Minuta - OIC Test (Sector) - M3T3 - 2024.docx')
+        self.assertEqual(minuta.data[0], 'diez')
+        self.assertEqual(minuta.data[6], 'Juan Pérez')
+        self.assertEqual(minuta.data[19], 'Cargo de María')
+        self.assertEqual(minuta.data[23], 'OIC Test')
+        self.assertEqual(minuta.data[25], 'la auditoría número A-7/2024 denominada Obra pública y la intervención '
+                                          'número V-2/2024 denominada Almacenes mismas que se ejecutan')
+        self.assertEqual(minuta.data[33], 'B')
+        auditoria = minuta.revision.auditoria_data['A']
+        self.assertEqual(len(auditoria), 20)
+        self.assertEqual(auditoria['01'], {'E': 'Cumple', 'C': 'Bien'})
+        self.assertEqual(auditoria['02'], {'E': 'Pendiente', 'C': ''})
+        self.assertEqual(len(minuta.revision.intervencion_data['I']), 25)
+        self.assertIsNone(minuta.revision.control_interno_data)
+        self.assertEqual(vacia.error, 'El periodo no tiene un OIC con dirección asignada')
+
+    def test_load_minutas_sin_captura(self):
+        MinutaPersonal.objects.filter(id_minuta=self.minutas[1], tipo_personal=2).delete()
+        self.vacia.id_oic.id_direccion = Direccion.objects.create(direccion='A')
+        self.vacia.id_oic.save()
+
+        errores = [minuta.error for minuta in load_minutas([self.actividad, self.vacia], 1)]
+        self.assertEqual(errores, ['La minuta no tiene asignado al JUD de coordinación',
+                                   'No hay actividades de fiscalización activas en el periodo'])
+        errores = [minuta.error for minuta in load_minutas([self.actividad], 2)]
+        self.assertEqual(errores, ['No se ha capturado la minuta del mes'])
+
+    @override_settings(PARSE_WORKERS=1)
+    def test_minutas_trimestre_view(self):
+        response = self.client.get(reverse('minutas_trimestre', kwargs={'anyo': 2024, 'trimestre': 3, 'mes': 3}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archivos = self.read_zip(b''.join(response.streaming_content))
+        self.assertEqual(sorted(archivos), ['Minuta - OIC Test (Sector) - M3T3 - 2024.docx', 'Reporte.txt'])
+        document = docx.Document(io.BytesIO(archivos['Minuta - OIC Test (Sector) - M3T3 - 2024.docx']))
+        self.assertIn('Juan Pérez', '\n'.join(paragraph.text for paragraph in document.paragraphs))
+        self.assertEqual(len(document.tables), 3)
+        reporte = archivos['Reporte.txt'].decode('utf-8')
+        self.assertIn('Minuta - OIC Test (Sector) - M3T3 - 2024.docx: generada', reporte)
+        self.assertIn('Minuta - OIC Vacío - M3T3 - 2024.docx: El periodo no tiene un OIC con dirección asignada',
+                      reporte)
+        self.assertIn('1 de 2 minutas generadas', reporte)
+
+    def test_minutas_trimestre_view_mes_invalido(self):
+        response = self.client.get(reverse('minutas_trimestre', kwargs={'anyo': 2024, 'trimestre': 3, 'mes': 4}))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(PARSE_WORKERS=1)
+    def test_exportar_minutas(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'minutas.zip')
+            call_command('exportar_minutas', anyo=2024, trimestre=3, mes=1, output=output, stdout=stdout,
+                         stderr=stderr)
+            with open(output, 'rb') as archivo_zip:
+                archivos = self.read_zip(archivo_zip.read())
+
+        self.assertIn('Minuta - OIC Test (Sector) - M1T3 - 2024.docx', archivos)
+        self.assertIn('1 de 2 minutas guardadas', stdout.getvalue())
+        self.assertIn('OIC Vacío', stderr.getvalue())
+
+
 class CedulaViewTests(LoggedIn):
 
     def setUp(self):
@@ -823,7 +1951,7 @@ class CedulaViewTests(LoggedIn):
         # Verifica el tipo MIME para archivos Excel
         self.assertEqual(response['Content-Type'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
         # Verifica que el archivo tenga algún contenido
-        self.assertGreater(len(response.content), 0)
+        self.assertGreater(len(b''.join(response.streaming_content)), 0)
 
         # Verifica que los conceptos se actualizaron en la base de datos
         concepto1_actualizado = ConceptoCedula.objects.get(celda='0')
@@ -1044,11 +2172,139 @@ class MinutaViewPostTests(LoggedIn):
         self.assertEqual(response['Content-Type'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
 
         # Verifica que el archivo tenga algún contenido
-        self.assertGreater(len(response.content), 0)
+        self.assertGreater(len(b''.join(response.streaming_content)), 0)
 
         # Verifica que los conceptos de la minuta mensual se actualizaron en la base de datos
-        concepto_actualizado = ConceptoMinuta.objects.get(clave='1', id_minuta=Minuta.objects.get(id_actividad_fiscalizacion=self.actividad), tipo_concepto=1)
-        self.assertEqual(concepto_actualizado.comentario, 'Comentario actualizado B0')
+        seccion = SeccionMinuta.objects.get(id_minuta=Minuta.objects.get(id_actividad_fiscalizacion=self.actividad), tipo_concepto=1)
+        self.assertEqual(seccion.conceptos[0][1], 'Comentario actualizado B0')
+
+
+class MinutaMesConsultasTest(LoggedIn):
+
+    def setUp(self):
+        super().setUp()
+        direccion = Direccion.objects.create(direccion='A')
+        oic_direccion = Oic.objects.create(nombre='A', id_direccion=direccion)
+        self.oic = Oic.objects.create(nombre='OIC Test', id_direccion=direccion)
+        self.actividad = ActividadFiscalizacion.objects.create(id_oic=self.oic, anyo=2024, trimestre=3)
+        Auditoria.objects.create(numero=1, denominacion='Auditoría 1', estado=1,
+                                 id_actividad_fiscalizacion=self.actividad)
+        self.personal = {}
+        for cargo_id, oic, nombre in ((1, oic_direccion, 'Juan'), (2, oic_direccion, 'Ana'), (6, self.oic, 'Luis'),
+                                      (7, self.oic, 'María')):
+            tipo_cargo = TipoCargo.objects.create(id=cargo_id, nombre=f'Cargo {cargo_id}')
+            persona = Persona.objects.create(honorifico='Lic.', nombre=nombre, apellido='Pérez')
+            personal = Personal.objects.create(estado=1, id_oic=oic, id_persona=persona)
+            CargoPersonal.objects.create(nombre=f'Cargo de {nombre}', id_tipo_cargo=tipo_cargo, id_personal=personal)
+            self.personal[cargo_id] = personal
+        self.url = reverse('minuta_mes', args=[self.actividad.id, 3])
+
+    def count_get(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_consultas_fijas(self):
+        primera, response = self.count_get()
+        self.assertEqual(MinutaPersonal.objects.count(), 4)
+        self.assertEqual(SeccionMinuta.objects.count(), 1)
+        self.assertEqual(len(response.context['conceptos']['Auditoria']), 20)
+        self.assertEqual(response.context['JUDC'], [self.personal[2]])
+        self.assertEqual(response.context['personal'], [self.personal[7]])
+        self.assertEqual(response.context['director'], self.personal[1].id_persona)
+
+        segunda, _ = self.count_get()
+        tipo_intervencion = TipoIntervencion.objects.create(clave=13, tipo='Revisión')
+        for numero in range(2, 8):
+            Auditoria.objects.create(numero=numero, estado=1, id_actividad_fiscalizacion=self.actividad)
+            Intervencion.objects.create(numero=numero, id_tipo_intervencion=tipo_intervencion,
+                                        id_actividad_fiscalizacion=self.actividad)
+            ControlInterno.objects.create(numero=numero, id_actividad_fiscalizacion=self.actividad)
+        # La siguiente visita crea las secciones de intervenciones y controles internos con una sola inserción y las
+        # vuelve a leer
+        tercera, _ = self.count_get()
+        cuarta, response = self.count_get()
+
+        self.assertLessEqual(primera, 14)
+        self.assertEqual(tercera, segunda + 2)
+        self.assertEqual(cuarta, segunda)
+        self.assertEqual(len(response.context['actividades']), 19)
+        self.assertEqual(sorted(SeccionMinuta.objects.values_list('tipo_concepto', flat=True)), [1, 2, 3])
+        self.assertEqual([len(seccion.conceptos) for seccion in SeccionMinuta.objects.order_by('tipo_concepto')],
+                         [20, 25, 23])
+
+    def test_secciones_creadas_por_otra_peticion(self):
+        self.count_get()
+        existente = SeccionMinuta.objects.get()
+        existente.conceptos[0] = [0, 'Bien']
+        existente.save()
+        load_secciones = seguimiento.load_secciones
+        # Simula que otra petición creó la sección entre la lectura y la inserción
+        with mock.patch('OICSec.funcs.Seguimiento.load_secciones',
+                        side_effect=[{}, load_secciones([existente.id_minuta_id])]):
+            _, response = self.count_get()
+        self.assertEqual(SeccionMinuta.objects.get().pk, existente.pk)
+        self.assertEqual(response.context['conceptos']['Auditoria']['1'], {'estado': 0, 'comentario': 'Bien'})
+
+    def test_post_guarda_solo_conceptos_cambiados(self):
+        self.client.get(self.url)
+        post_data = {
+            'estado-A1': '0',
+            'comentario-A1': 'Completo',
+            'JUDC': self.personal[2].id,
+            'personal': self.personal[7].id,
+            'inicio': '2024-09-26T10:00',
+            'fin': '2024-09-26T12:00'
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data=post_data)
+        self.assertEqual(response.status_code, 200)
+        b''.join(response.streaming_content)
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "seccion_minuta"')]
+        self.assertEqual(len(updates), 1)
+        self.assertLessEqual(len(queries), 20)
+        seccion = SeccionMinuta.objects.get(id_minuta__id_actividad_fiscalizacion=self.actividad, tipo_concepto=1)
+        self.assertEqual(seccion.conceptos[0], [0, 'Completo'])
+        self.assertEqual(seccion.conceptos[1], [None, ''])
+        self.assertEqual(MinutaPersonal.objects.filter(tipo_personal__in=[2, 4]).count(), 2)
+
+
+class SeccionMinutaMigracionTest(TestCase):
+
+    def setUp(self):
+        self.migracion = importlib.import_module('OICSec.migrations.0039_seccionminuta')
+        actividad = ActividadFiscalizacion.objects.create(anyo=2024, trimestre=3)
+        self.minuta = Minuta.objects.create(mes=3, id_actividad_fiscalizacion=actividad)
+
+    def test_copia_conceptos(self):
+        ConceptoMinuta.objects.create(clave='2', estatus=1, comentario='Falta', tipo_concepto=1, id_minuta=self.minuta)
+        ConceptoMinuta.objects.create(clave='2', estatus=0, tipo_concepto=1, id_minuta=self.minuta)
+        ConceptoMinuta.objects.create(clave='23', estatus=2, tipo_concepto=3, id_minuta=self.minuta)
+        ConceptoMinuta.objects.create(clave='30', estatus=2, tipo_concepto=3, id_minuta=self.minuta)
+
+        self.migracion.copy_conceptos(django_apps, None)
+
+        secciones = {seccion.tipo_concepto: seccion for seccion in SeccionMinuta.objects.filter(id_minuta=self.minuta)}
+        self.assertEqual(sorted(secciones), [1, 3])
+        self.assertEqual(len(secciones[1].conceptos), 20)
+        self.assertEqual(secciones[1].conceptos[:3], [[None, None], [1, 'Falta'], [None, None]])
+        self.assertEqual(len(secciones[3].conceptos), 23)
+        self.assertEqual(secciones[3].conceptos[22], [2, None])
+
+    def test_restaura_conceptos(self):
+        conceptos = [[None, None] for _ in range(20)]
+        conceptos[0] = [0, 'Bien']
+        SeccionMinuta.objects.create(tipo_concepto=1, conceptos=conceptos, id_minuta=self.minuta)
+        ConceptoMinuta.objects.create(clave='1', estatus=3, tipo_concepto=1, id_minuta=self.minuta)
+
+        self.migracion.restore_conceptos(django_apps, None)
+
+        query = ConceptoMinuta.objects.filter(id_minuta=self.minuta, tipo_concepto=1)
+        self.assertEqual(query.count(), 20)
+        concepto = query.get(clave='1')
+        self.assertEqual((concepto.estatus, concepto.comentario), (0, 'Bien'))
 
 
 class PerfilViewTests(LoggedIn):
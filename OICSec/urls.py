@@ -108,6 +108,12 @@ urlpatterns = [
          actividades_view, name='periodos'),
     path("periodos/<int:actividad_id>",
          estructuras_periodos_view, name='estructuras_periodos'),
+    path("periodos/<int:actividad_id>/cedulas/",
+         cedulas_periodo_view, name='cedulas_periodo'),
+    path("periodos/cedulas/<int:anyo>/<int:trimestre>/",
+         cedulas_trimestre_view, name='cedulas_trimestre'),
+    path("periodos/minutas/<int:anyo>/<int:trimestre>/mes/<int:mes>/",
+         minutas_trimestre_view, name='minutas_trimestre'),
     path("IMC/",
          upload_imc_view, name="uploadIMC"),
     path("estadisticas/",
@@ -11,22 +11,30 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.core.paginator import Paginator
 from django.db import transaction
-from django.http import HttpResponse, FileResponse, Http404, JsonResponse
+from django.http import HttpResponse, FileResponse, Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
 from django.utils.timezone import now
-from num2words import num2words
 
 from OICSec.forms import AuditoriaForm, ControlForm, IntervencionForm, PersonaForm, CargoPersonalForm, CrearTitularForm, \
     OicForm, ActividadForm
-from OICSec.funcs.Actividad import get_actividades
+from OICSec.funcs.Archivos import save_generated
+from OICSec.funcs.Catalogo import clean_oic_text, resolve_oic
+from OICSec.funcs.Procesamiento import parse_files
+from OICSec.funcs.Supervision import build_supervision_data, cedulas_zip, conceptos_por_celda, read_conceptos_form, \
+    update_conceptos_cedula
 from OICSec.funcs.Cedula import SupervisionData, ConceptosLista, Concepto
-from OICSec.funcs.Cedula import cedula as create_cedula
+from OICSec.funcs.Cedula import cedula_file_name, render_cedula_cached
 from OICSec.funcs.IMC import read_format_a3
-from OICSec.funcs.Minuta import create_revision, minuta as create_minuta_doc
-from OICSec.funcs.PAA import extract_paa, extract_number_and_year
+from OICSec.funcs.Ingesta import ingest_auditorias, ingest_controles_internos, ingest_intervenciones, \
+    preview_auditorias, preview_controles_internos, preview_intervencion
+from OICSec.funcs.Movimientos import MovimientoIMC, apply_movimientos, read_movimiento
+from OICSec.funcs.Minuta import create_revision, minuta_file_name, render_minuta_cached
+from OICSec.funcs.PAA import extract_paa
 from OICSec.funcs.PACI import extract_paci
 from OICSec.funcs.PINT import extract_pint
+from OICSec.funcs.Seguimiento import ESTADOS_CONCEPTO, FIRMANTES_DIRECCION, POSICION_WORD, TIPOS_CONCEPTO, \
+    build_minuta_data, load_minuta_contexto, load_minutas, minutas_zip, save_secciones
 from OICSec.models import *
 
 
@@ -209,44 +217,55 @@ def intervencion_detalle_view(request, intervencion_id):
 
 
 @login_required
-def upload_view(request, extract_func, template_name, create_func):
+def upload_view(request, extract_func, template_name, create_func, preview_func):
     """
     Vista genérica para manejar la subida y procesamiento de archivos Excel.
     :param request: objeto HttpRequest
     :param extract_func: función para extraer datos del archivo Excel (extract_paci o extract_paa)
     :param template_name: nombre de la plantilla HTML para renderizar
     :param create_func: Función específica para crear los objetos (auditoria o control interno).
+    :param preview_func: Función que calcula los cambios sin guardarlos, para la vista previa.
     """
     lista_oics = Oic.objects.all()
 
     if request.method == 'POST':
-        return handle_post_request(request, lista_oics, extract_func, template_name, create_func)
+        return handle_post_request(request, lista_oics, extract_func, template_name, create_func, preview_func)
     elif request.method == 'GET':
         return render(request, template_name, {'lista_oics': lista_oics})
 
 
-def handle_post_request(request, lista_oics, extract_func, template_name, create_func):
+def handle_post_request(request, lista_oics, extract_func, template_name, create_func, preview_func):
     excel_files = request.FILES.getlist('excel_files')
+    preview = 'preview' in request.POST
     context = {
         'lista_oics': lista_oics,
+        'preview': preview,
     }
     processed_files = []
     error_files = []
+    preview_files = []
     if not excel_files:
         context['excel_processing_error'] = ['Ningún archivo fue seleccionado.']
         return render(request, template_name, context=context)
 
     try:
-        for excel_file in excel_files:
-            data = extract_func(excel_file)
+        # La extracción se reparte entre procesos; la escritura se hace aquí en el orden de los archivos
+        for resultado in parse_files(extract_func, excel_files):
+            excel_file = resultado.archivo
+            data = resultado.data
 
             if data is None:
                 error_files.append(excel_file.name)
+            elif preview:
+                # En la vista previa solo se consultan los cambios, no se escribe nada
+                preview_files.append(dict(preview_func(data), archivo=excel_file.name))
             else:
                 processed_files.append(excel_file.name)
                 with transaction.atomic():
-                    process_data(data, lista_oics, create_func, excel_file)
+                    process_data(data, create_func, excel_file)
 
+        if preview_files:
+            context['preview_result'] = preview_files
         if processed_files:
             context['excel_processing_result'] = processed_files
         if error_files:
@@ -265,189 +284,31 @@ def render_error(request, lista_oics, template_name, error_message):
     })
 
 
-def process_data(data, lista_oics, create_func, excel_file):
+def process_data(data, create_func, excel_file):
     """
         Función genérica para procesar datos extraídos del Excel y crear los objetos correspondientes.
         :param data: Datos extraídos del Excel.
-        :param lista_oics: Lista de OICs.
-        :param create_func: Función específica para crear los objetos (auditoria o control interno).
+        :param create_func: Función que guarda en conjunto todas las filas del archivo (auditorías o controles internos).
         :param excel_file: Archivo de excel que se guardara en el sistema de archivos
         """
-    for excel_processing_result in data:
-        similar_oic = get_most_similar_oic(excel_processing_result[0], lista_oics)
+    create_func(data, excel_file)
 
-        for item_data in excel_processing_result[1]:
-            actividad_fiscalizacion = get_or_create_actividad_fiscalizacion(item_data, similar_oic)
-            create_func(item_data, actividad_fiscalizacion, excel_file)
 
-
-def get_most_similar_oic(excel_oic_name, lista_oics):
-    max_similarity = 0
-    similar_oic = None
-    for oic in lista_oics:
-        similarity = SequenceMatcher(None, clean_oic_text(excel_oic_name), oic.nombre).ratio()
-        if similarity > max_similarity:
-            max_similarity = similarity
-            similar_oic = oic
+def get_most_similar_oic(excel_oic_name):
+    similar_oic, _ = resolve_oic(excel_oic_name)
     return similar_oic
 
 
-def get_or_create_actividad_fiscalizacion(data, oic):
-    actividad_fiscalizacion, created = ActividadFiscalizacion.objects.get_or_create(
-        anyo=data['Año'],
-        trimestre=data['Trimestre'],
-        id_oic=oic
-    )
-    return actividad_fiscalizacion
-
-
-def create_or_update_auditoria(auditoria_data, actividad_fiscalizacion, excel_file):
-    # Se preparan los datos para ser guardados
-    materia_obj = get_related_object(Materia, auditoria_data["Materia"])
-    programacion_obj = get_related_object(Programacion, auditoria_data["Programacion"])
-    enfoque_obj = get_related_object(Enfoque, auditoria_data["Enfoque"])
-    temporalidad_obj = get_related_object(Temporalidad, auditoria_data["Temporalidad"])
-    # Se busca si no existe una auditoria con el numero, y actividad de fiscalizacion iguales
-    auditoria = Auditoria.objects.filter(numero=auditoria_data["Numero"], id_actividad_fiscalizacion=actividad_fiscalizacion).first()
-
-    # Si no existe algun coincidente se crea una nueva auditoria, en caso contrario, se actualizan los datos
-    if auditoria is None:
-        cedula_obj = Cedula.objects.create()
-        auditoria = Auditoria.objects.create(
-            denominacion=auditoria_data["Denominacion"],
-            numero=auditoria_data["Numero"],
-            objetivo=auditoria_data["Objetivo"],
-            alcance=auditoria_data["Alcance"],
-            ejercicio=auditoria_data["Ejercicio"],
-            unidad=auditoria_data["Unidad"],
-            id_actividad_fiscalizacion=actividad_fiscalizacion,
-            id_materia=materia_obj,
-            id_programacion=programacion_obj,
-            id_enfoque=enfoque_obj,
-            id_temporalidad=temporalidad_obj,
-            id_cedula=cedula_obj,
-            estado=1
-        )
-        create_conceptos_cedula(cedula_obj, 60)
-    else:
-        # Actualizar los datos de la auditoria existente
-        auditoria.denominacion = auditoria_data["Denominacion"]
-        auditoria.objetivo = auditoria_data["Objetivo"]
-        auditoria.alcance = auditoria_data["Alcance"]
-        auditoria.ejercicio = auditoria_data["Ejercicio"]
-        auditoria.unidad = auditoria_data["Unidad"]
-        auditoria.id_materia = materia_obj
-        auditoria.id_programacion = programacion_obj
-        auditoria.id_enfoque = enfoque_obj
-        auditoria.id_temporalidad = temporalidad_obj
-        auditoria.save()
-
-    auditoria_archivo = AuditoriaArchivos.objects.filter(tipo=0, id_auditoria=auditoria).first()
-
-    base_dir = os.path.dirname(__file__)
-    rel_path = '../media/auditoria/'
-    destino = os.path.normpath(os.path.join(base_dir, rel_path))
-
-    os.makedirs(destino, exist_ok=True)
-
-    output_filename = f'{excel_file.name}'
-    output_path = os.path.join(destino, output_filename)
-
-    with open(output_path, 'wb+') as destination:
-        for chunk in excel_file.chunks():
-            destination.write(chunk)
-
-    if auditoria_archivo is None:
-        archivo_obj = Archivo.objects.filter(nombre = output_filename).first()
-        if not archivo_obj:
-            archivo_obj = Archivo.objects.create(
-                archivo=output_path,
-                nombre=output_filename
-            )
-
-        if not AuditoriaArchivos.objects.filter(id_auditoria=auditoria).exists():
-            AuditoriaArchivos.objects.create(
-                tipo=0,
-                id_auditoria=auditoria,
-                id_archivo=archivo_obj
-            )
-
-
-def create_or_update_control_interno(control_data, actividad_fiscalizacion, excel_file):
-    tipo_revision_obj = get_related_object(TipoRevision, control_data.get("tipo_revision"))
-    programa_revision_obj = get_related_object(ProgramaRevision, control_data.get("programa_revision"))
-
-    control_interno = ControlInterno.objects.filter(numero=control_data["Numero"], id_actividad_fiscalizacion=actividad_fiscalizacion).first()
-    if control_interno is None:
-        cedula_obj = Cedula.objects.create()
-        control_interno = ControlInterno.objects.create(
-            numero=control_data["Numero"],
-            area=control_data["Area"],
-            denominacion=control_data["Denominacion"],
-            objetivo=control_data["Objetivo"],
-            id_actividad_fiscalizacion=actividad_fiscalizacion,
-            id_tipo_revision=tipo_revision_obj,
-            id_programa_revision=programa_revision_obj,
-            id_cedula=cedula_obj
-        )
-        create_conceptos_cedula(cedula_obj, 55)
-    else:
-        control_interno.area = control_data["Area"]
-        control_interno.denominacion = control_data["Denominacion"]
-        control_interno.objetivo = control_data["Objetivo"]
-        control_interno.id_tipo_revision = tipo_revision_obj
-        control_interno.id_programa_revision = programa_revision_obj
-        control_interno.save()
-
-    control_archivo = ControlArchivos.objects.filter(tipo=0, id_control=control_interno).first()
-    base_dir = os.path.dirname(__file__)
-    rel_path = '../media/controlinterno/'
-    destino = os.path.normpath(os.path.join(base_dir, rel_path))
-
-    # Se crea el directorio si no existe
-    os.makedirs(destino, exist_ok=True)
-
-    output_filename = f'{excel_file.name}'
-    output_path = os.path.join(destino, output_filename)
-
-    with open(output_path, 'wb+') as destination:
-        for chunk in excel_file.chunks():
-            destination.write(chunk)
-    if control_archivo is None:
-        archivo_obj = Archivo.objects.filter(nombre = output_filename).first()
-        if not archivo_obj:
-            archivo_obj = Archivo.objects.create(
-                archivo=output_path,
-                nombre=output_filename
-            )
-
-        if not ControlArchivos.objects.filter(id_control=control_interno).exists():
-            ControlArchivos.objects.create(
-                tipo=0,
-                id_control=control_interno,
-                id_archivo=archivo_obj
-            )
-
-
-def get_related_object(model, obj_id):
-    return model.objects.get(id=obj_id) if obj_id else None
-
-
-def create_conceptos_cedula(cedula, num_celdas):
-    ConceptoCedula.objects.bulk_create([
-        ConceptoCedula(celda=str(i), id_cedula=cedula)
-        for i in range(num_celdas)
-    ])
-    
-
 @login_required
 def upload_paci_view(request):
-    return upload_view(request, extract_func=extract_paci, template_name='upload_paci.html', create_func=create_or_update_control_interno)
+    return upload_view(request, extract_func=extract_paci, template_name='upload_paci.html', create_func=ingest_controles_internos,
+                       preview_func=preview_controles_internos)
 
 
 @login_required
 def upload_paa_view(request):
-    return upload_view(request, extract_func=extract_paa, template_name='upload_paa.html', create_func=create_or_update_auditoria)
+    return upload_view(request, extract_func=extract_paa, template_name='upload_paa.html', create_func=ingest_auditorias,
+                       preview_func=preview_auditorias)
 
 
 @login_required
@@ -465,239 +326,46 @@ def upload_imc_view(request):
             return render(request, 'IMC.html', context=context)
 
 
-        for word_file in word_files:
+        movimientos = []
+        for resultado in parse_files(read_format_a3, word_files):
+            word_file = resultado.archivo
             try:
-                data = read_format_a3(word_file)
-
-                if data is None:
+                if resultado.error is not None:
+                    raise ValueError(resultado.error)
+                if resultado.data is None:
                     raise ValueError(f'Error al leer el archivo: {word_file.name}')
-                else:
-                    # Se debería de hacer un procedimiento extra para identificar a que tipo de modelo pertenece, pero ahora solo funciona con auditorias
-                    kind = get_kind_imc(data.get('Tipo'))
-                    similar_oic = get_most_similar_oic(data.get('OIC'), lista_oics)
-                    num_year = extract_number_and_year(data.get('Numero'))
-                    numero = num_year['Numero']
-                    anyo = num_year['Año']
-                    denominacion = data.get('Denominacion')
-                    trimestre = data.get('Año/Trimestre').get('Ejecucion').split('/')[1]
-                    objetivo_modificado = data.get('Objeto').get('Modificado')
-                    alcance_modificado = data.get('Alcance').get('Modificado')
-                    clave = data.get('Clave').split('-')
-
-                    with transaction.atomic():
-                        if kind == 1: # incorporación
-                            actividad_fiscalizacion = ActividadFiscalizacion.objects.filter(
-                                anyo=anyo,
-                                trimestre=trimestre,
-                                id_oic=similar_oic
-                            ).first()
-                            if actividad_fiscalizacion:
-                                auditoria = Auditoria.objects.filter(
-                                    numero=numero,
-                                    id_actividad_fiscalizacion=actividad_fiscalizacion,
-                                ).first()
-                                if auditoria:
-                                    raise ValueError(f'Ya se encuentra una auditoria presente con los valores recolectados, favor de verificar.')
-                            materia_obj = get_object_or_404(Materia, clave=clave[0])
-                            programacion_obj = get_object_or_404(Programacion, clave=clave[1])
-                            enfoque_obj = get_object_or_404(Enfoque, clave=clave[2])
-                            temporalidad_obj = get_object_or_404(Temporalidad, clave=clave[3])
-                            cedula_obj = Cedula.objects.create()
-                            auditoria = Auditoria.objects.create(
-                                denominacion=denominacion,
-                                numero=numero,
-                                objetivo=objetivo_modificado,
-                                alcance=alcance_modificado,
-                                id_actividad_fiscalizacion=get_or_create_actividad_fiscalizacion({'Año': anyo, 'Trimestre': trimestre}, similar_oic),
-                                id_materia=materia_obj,
-                                id_programacion=programacion_obj,
-                                id_enfoque=enfoque_obj,
-                                id_temporalidad=temporalidad_obj,
-                                id_cedula=cedula_obj,
-                                estado=1
-                            )
-                            create_conceptos_cedula(cedula_obj, 60)
-
-                            auditoria_archivo = AuditoriaArchivos.objects.filter(tipo=1, id_auditoria=auditoria).first()
-
-                            base_dir = os.path.dirname(__file__)
-                            rel_path = '../media/IMC/'
-                            destino = os.path.normpath(os.path.join(base_dir, rel_path))
-
-                            os.makedirs(destino, exist_ok=True)
-
-                            output_filename = f'{word_file.name}'
-                            output_path = os.path.join(destino, output_filename)
-
-                            with open(output_path, 'wb+') as destination:
-                                for chunk in word_file.chunks():
-                                    destination.write(chunk)
-
-                            if auditoria_archivo is None:
-                                archivo_obj = Archivo.objects.filter(nombre = output_filename).first()
-                                if not archivo_obj:
-                                    archivo_obj = Archivo.objects.create(
-                                        archivo=output_path,
-                                        nombre=output_filename
-                                    )
-
-                                if not AuditoriaArchivos.objects.filter(id_auditoria=auditoria).exists():
-                                    AuditoriaArchivos.objects.create(
-                                        tipo=1,
-                                        id_auditoria=auditoria,
-                                        id_archivo=archivo_obj
-                                    )
-                            processed_files.append(word_file.name)
-
-                        if kind == 2: # cancelación
-                            actividad_fiscalizacion = ActividadFiscalizacion.objects.filter(
-                                anyo=anyo,
-                                trimestre=trimestre,
-                                id_oic=similar_oic
-                            ).first()
-                            if actividad_fiscalizacion:
-                                auditoria = Auditoria.objects.filter(
-                                    numero=numero,
-                                    id_actividad_fiscalizacion=actividad_fiscalizacion,
-                                    estado=1
-                                ).first()
-                                if auditoria:
-                                    auditoria.estado = 0
-                                    auditoria.save()
-
-                                    auditoria_archivo = AuditoriaArchivos.objects.filter(tipo=2, id_auditoria=auditoria).first()
-                                    base_dir = os.path.dirname(__file__)
-                                    rel_path = '../media/IMC/'
-                                    destino = os.path.normpath(os.path.join(base_dir, rel_path))
-
-                                    os.makedirs(destino, exist_ok=True)
-
-                                    output_filename = f'{word_file.name}'
-                                    output_path = os.path.join(destino, output_filename)
-
-                                    with open(output_path, 'wb+') as destination:
-                                        for chunk in word_file.chunks():
-                                            destination.write(chunk)
-
-                                    if auditoria_archivo is None:
-                                        archivo_obj = Archivo.objects.filter(nombre=output_filename).first()
-                                        if not archivo_obj:
-                                            archivo_obj = Archivo.objects.create(
-                                                archivo=output_path,
-                                                nombre=output_filename
-                                            )
-
-                                        if not AuditoriaArchivos.objects.filter(id_auditoria=auditoria, tipo=2).exists():
-                                            AuditoriaArchivos.objects.create(
-                                                tipo=2,
-                                                id_auditoria=auditoria,
-                                                id_archivo=archivo_obj
-                                            )
-
-                                    processed_files.append(word_file.name)
-                                else:
-                                    raise ValueError(f'No hay auditorias activas contenidas con los datos solicitados')
-                            else:
-                                raise ValueError(f'No hay auditorias activas contenidas con los datos solicitados')
-                        if kind == 3: # modificación
-                            actividad_fiscalizacion = ActividadFiscalizacion.objects.filter(
-                                anyo=anyo,
-                                trimestre=trimestre,
-                                id_oic=similar_oic
-                            ).first()
-                            if actividad_fiscalizacion:
-                                auditoria = Auditoria.objects.filter(
-                                    numero=numero,
-                                    id_actividad_fiscalizacion=actividad_fiscalizacion,
-                                    estado=1
-                                ).first()
-                                if auditoria:
-                                    auditoria.objetivo=objetivo_modificado
-                                    auditoria.alcance=alcance_modificado
-                                    auditoria.save()
-
-                                    auditoria_archivo = AuditoriaArchivos.objects.filter(tipo=3, id_auditoria=auditoria).first()
-                                    base_dir = os.path.dirname(__file__)
-                                    rel_path = '../media/IMC/'
-                                    destino = os.path.normpath(os.path.join(base_dir, rel_path))
-
-                                    os.makedirs(destino, exist_ok=True)
-
-                                    output_filename = f'{word_file.name}'
-                                    output_path = os.path.join(destino, output_filename)
-
-                                    with open(output_path, 'wb+') as destination:
-                                        for chunk in word_file.chunks():
-                                            destination.write(chunk)
-
-                                    if auditoria_archivo is None:
-                                        archivo_obj = Archivo.objects.filter(nombre=output_filename).first()
-                                        if not archivo_obj:
-                                            archivo_obj = Archivo.objects.create(
-                                                archivo=output_path,
-                                                nombre=output_filename
-                                            )
-
-                                        if not AuditoriaArchivos.objects.filter(id_auditoria=auditoria, tipo=3).exists():
-                                            AuditoriaArchivos.objects.create(
-                                                tipo=3,
-                                                id_auditoria=auditoria,
-                                                id_archivo=archivo_obj
-                                            )
-
-                                    processed_files.append(word_file.name)
-                                else:
-                                    raise ValueError(f'No hay auditorias activas contenidas con los datos solicitados')
-                            else:
-                                raise ValueError(f'No hay auditorias activas contenidas con los datos solicitados')
-
+                # Se debería de hacer un procedimiento extra para identificar a que tipo de modelo pertenece, pero ahora solo funciona con auditorias
+                movimientos.append(read_movimiento(word_file, resultado.data))
             except Exception as e:
-                messages.error(request, f'Error en {word_file.name}: {e}')
-                error_files.append(word_file.name)
-
-            if processed_files:
-                context['excel_processing_result'] = processed_files
-            if error_files:
-                context['excel_processing_error'] = error_files
-
-            return render(request, 'IMC.html', context=context)
-
-    if request.method == 'GET':
-        return render(request, 'IMC.html')
-
-
-def get_kind_imc(tipo_str):
-    tipos = {
-        'incorporación': 1,
-        'cancelación': 2,
-        'modificación': 3
-    }
-    best_match = None
-    highest_ratio = 0
-    for tipo in tipos:
-        similarity_ratio = SequenceMatcher(None, tipo_str, tipo).ratio()
-        if similarity_ratio > highest_ratio:
-            highest_ratio = similarity_ratio
-            best_match = tipo
-    return tipos[best_match] if best_match else None
+                movimientos.append(MovimientoIMC(archivo=word_file, error=str(e)))
 
+        try:
+            apply_movimientos(movimientos)
+        except Exception as e:
+            for movimiento in movimientos:
+                movimiento.error = movimiento.error or str(e)
 
-def clean_oic_text(organo: str):
-    phrases_to_remove = [
-        'órgano interno de control en',
-        'de la ciudad de méxico'
-    ]
+        for movimiento in movimientos:
+            if movimiento.error is None:
+                processed_files.append(movimiento.archivo.name)
+            else:
+                messages.error(request, f'Error en {movimiento.archivo.name}: {movimiento.error}')
+                error_files.append(movimiento.archivo.name)
 
-    text = organo.lower()
+        if processed_files:
+            context['excel_processing_result'] = processed_files
+        if error_files:
+            context['excel_processing_error'] = error_files
 
-    for phrase in phrases_to_remove:
-        text = re.sub(re.escape(phrase), '', text)
+        return render(request, 'IMC.html', context=context)
 
-    return text.strip()
+    if request.method == 'GET':
+        return render(request, 'IMC.html')
 
 
-def get_most_similar_tipo_intervencion(tipo_str):
-    tipo_intervenciones = TipoIntervencion.objects.all()
+def get_most_similar_tipo_intervencion(tipo_str, tipo_intervenciones=None):
+    if tipo_intervenciones is None:
+        tipo_intervenciones = TipoIntervencion.objects.all()
     max_similarity = 0
     tipo_intervencion_obj = None
 
@@ -710,6 +378,42 @@ def get_most_similar_tipo_intervencion(tipo_str):
     return tipo_intervencion_obj
 
 
+def get_tipo_intervencion(word_processing_result, tipo_intervenciones=None):
+    """
+    Obtiene el tipo de intervención de un PINT por su clave o, si no la tiene, por el nombre más parecido.
+    :param word_processing_result: Datos devueltos por extract_pint.
+    :param tipo_intervenciones: Tipos de intervención ya cargados, para no consultarlos en cada archivo de una carga.
+    :return: Tipo de intervención, o None si el PINT no tiene clave ni tipo.
+    """
+    if word_processing_result.get("Clave"):
+        if tipo_intervenciones is None:
+            return TipoIntervencion.objects.get(clave=word_processing_result["Clave"])
+        clave = TipoIntervencion._meta.get_field('clave').to_python(word_processing_result["Clave"])
+        for tipo in tipo_intervenciones:
+            if tipo.clave == clave:
+                return tipo
+        raise TipoIntervencion.DoesNotExist(f'No existe el tipo de intervención con clave {clave}')
+    elif word_processing_result.get('Tipo de Intervención'):
+        return get_most_similar_tipo_intervencion(word_processing_result['Tipo de Intervención'], tipo_intervenciones)
+    return None
+
+
+def get_pint_row(word_processing_result, tipo_intervenciones=None):
+    """
+    Prepara los datos extraídos de un PINT con los valores que se guardan en la intervención.
+    :param word_processing_result: Datos devueltos por extract_pint.
+    :param tipo_intervenciones: Tipos de intervención ya cargados, ver get_tipo_intervencion.
+    :return: Diccionario con las fechas convertidas y la llave del tipo de intervención.
+    """
+    tipo_intervencion_obj = get_tipo_intervencion(word_processing_result, tipo_intervenciones)
+    return dict(
+        word_processing_result,
+        Inicio=convert_to_date(word_processing_result.get('Inicio')),
+        Termino=convert_to_date(word_processing_result.get('Termino')),
+        tipo_intervencion=tipo_intervencion_obj.pk if tipo_intervencion_obj else None
+    )
+
+
 @login_required
 def upload_pint_view(request):
     lista_oics = Oic.objects.all()
@@ -724,6 +428,9 @@ def upload_pint_view(request):
 
     if request.method == 'POST':
         word_files = request.FILES.getlist('word_files')
+        preview = 'preview' in request.POST
+        preview_files = []
+        context['preview'] = preview
 
         # Verifica si no se han seleccionado archivos
         if not word_files:
@@ -736,128 +443,40 @@ def upload_pint_view(request):
             return render(request, 'upload_pint.html', context=context)
 
         try:
-            for word_file in word_files:
-                word_processing_result = extract_pint(word_file)
+            # Los tipos de intervención se cargan una sola vez para todos los archivos
+            tipo_intervenciones = list(TipoIntervencion.objects.all())
+            documentos = []
+
+            for resultado in parse_files(extract_pint, word_files):
+                word_file = resultado.archivo
+                word_processing_result = resultado.data
 
                 # Si el resultado es None, hubo un error al procesar el archivo
                 if word_processing_result is None:
                     error_files.append(word_file.name)
+                    continue
+
+                # Un archivo con un tipo de intervención que no existe se reporta sin descartar los demás
+                try:
+                    pint_row = get_pint_row(word_processing_result, tipo_intervenciones)
+                except Exception:
+                    error_files.append(word_file.name)
+                    continue
+                if preview:
+                    # En la vista previa solo se consultan los cambios, no se escribe nada
+                    preview_files.append(dict(preview_intervencion(pint_row), archivo=word_file.name))
                 else:
                     processed_files.append(word_file.name)  # Archivo procesado con éxito
-                    max_similarity = 0
-
-                    # Buscar el OIC más similar
-                    for oic in lista_oics:
-                        similarity = SequenceMatcher(None, clean_oic_text(word_processing_result.get('Ente Público')), oic.nombre).ratio()
-                        if similarity > max_similarity:
-                            max_similarity = similarity
-                            similar_oic = oic
-
-                    oic_selected = similar_oic if similar_oic else None
-
-                    # Verificar actividad de fiscalización
-                    actividad_fiscalizacion = ActividadFiscalizacion.objects.filter(
-                        anyo=word_processing_result['Año'],
-                        trimestre=word_processing_result['Trimestre'],
-                        id_oic=oic_selected
-                    ).first()
-
-                    # Si no existe actividad de fiscalización, crearla
-                    if not actividad_fiscalizacion:
-                        actividad_fiscalizacion = ActividadFiscalizacion.objects.create(
-                            anyo=word_processing_result['Año'],
-                            trimestre=word_processing_result['Trimestre'],
-                            id_oic=oic_selected
-                        )
-
-                    # Verificar tipo de intervención
-                    tipo_intervencion_obj = None
-                    if word_processing_result.get("Clave"):
-                        tipo_intervencion_obj = TipoIntervencion.objects.get(clave=word_processing_result["Clave"])
-                    elif word_processing_result.get('Tipo de Intervención'):
-                        tipo_intervencion_obj = get_most_similar_tipo_intervencion(
-                            word_processing_result['Tipo de Intervención'])
-
-                    # Verificar si ya existe la intervención, si no, crearla
-                    intervencion = Intervencion.objects.filter(
-                        numero=word_processing_result['Numero'],
-                        id_actividad_fiscalizacion=actividad_fiscalizacion
-                    ).first()
-
-                    if intervencion is None:
-                        # Crear nueva intervención
-                        cedula_obj = Cedula.objects.create()
-                        intervencion = Intervencion.objects.create(
-                            unidad=word_processing_result.get('Área'),
-                            numero=word_processing_result.get('Numero'),
-                            denominacion=word_processing_result.get('Denominación'),
-                            ejercicio=word_processing_result.get('Ejercicio'),
-                            alcance=word_processing_result.get('Alcance y periodo'),
-                            antecedentes=word_processing_result.get('Antecedentes'),
-                            fuerza_auditores=word_processing_result.get('Auditores'),
-                            fuerza_responsables=word_processing_result.get('Responsable'),
-                            fuerza_supervision=word_processing_result.get('Supervisión'),
-                            inicio=convert_to_date(word_processing_result.get('Inicio')),
-                            termino=convert_to_date(word_processing_result.get('Termino')),
-                            objetivo=word_processing_result.get('Objetivo'),
-                            id_actividad_fiscalizacion=actividad_fiscalizacion,
-                            id_tipo_intervencion=tipo_intervencion_obj,
-                            id_cedula=cedula_obj
-                        )
-
-                        # Crear conceptos de cédula asociados
-                        for i in range(54):
-                            ConceptoCedula.objects.create(
-                                celda=str(i),
-                                estado=None,
-                                comentario=None,
-                                id_cedula=cedula_obj
-                            )
-                    else:
-                        # Actualizar intervención existente
-                        intervencion.unidad = word_processing_result.get('Área')
-                        intervencion.denominacion = word_processing_result.get('Denominación')
-                        intervencion.ejercicio = word_processing_result.get('Ejercicio')
-                        intervencion.alcance = word_processing_result.get('Alcance y periodo')
-                        intervencion.antecedentes = word_processing_result.get('Antecedentes')
-                        intervencion.fuerza_auditores = word_processing_result.get('Auditores')
-                        intervencion.fuerza_responsables = word_processing_result.get('Responsable')
-                        intervencion.fuerza_supervision = word_processing_result.get('Supervisión')
-                        intervencion.inicio = convert_to_date(word_processing_result.get('Inicio'))
-                        intervencion.termino = convert_to_date(word_processing_result.get('Termino'))
-                        intervencion.objetivo = word_processing_result.get('Objetivo')
-                        intervencion.id_tipo_intervencion = tipo_intervencion_obj
-                        intervencion.save()
-
-                    intervencion_archivo = IntervencionArchivos.objects.filter(tipo=0, id_intervencion=intervencion).first()
-                    base_dir = os.path.dirname(__file__)
-                    rel_path = '../media/intervenciones/'
-                    destino = os.path.normpath(os.path.join(base_dir, rel_path))
-
-                    os.makedirs(destino, exist_ok=True)
-
-                    output_filename = f'{word_file.name}'
-                    output_path = os.path.join(destino, output_filename)
-
-                    with open(output_path, 'wb+') as destination:
-                        for chunk in word_file.chunks():
-                            destination.write(chunk)
-                    if intervencion_archivo is None:
-                        archivo_obj = Archivo.objects.filter(nombre=output_filename).first()
-                        if not archivo_obj:
-                            archivo_obj = Archivo.objects.create(
-                                archivo=output_path,
-                                nombre=output_filename
-                            )
-
-                        if not IntervencionArchivos.objects.filter(id_intervencion=intervencion).exists():
-                            IntervencionArchivos.objects.create(
-                                tipo=0,
-                                id_intervencion=intervencion,
-                                id_archivo=archivo_obj
-                            )
+                    documentos.append((pint_row, word_file))
+
+            # Todas las intervenciones de la carga se guardan en conjunto
+            if documentos:
+                with transaction.atomic():
+                    ingest_intervenciones(documentos)
 
             # Agregar listas de archivos procesados y con error al contexto
+            if preview_files:
+                context['preview_result'] = preview_files
             if processed_files:
                 context['word_processing_result'] = processed_files
             if error_files:
@@ -898,7 +517,7 @@ def delete_controlinterno(request, pk):
 
 def get_cedula_conceptos(model_instance):
     cedula = get_object_or_404(Cedula, pk=model_instance.id_cedula_id)
-    conceptos = ConceptoCedula.objects.filter(id_cedula=cedula.id)
+    conceptos = list(ConceptoCedula.objects.filter(id_cedula=cedula.id).order_by('pk'))
     conceptos_dict = {
         concepto.celda: {
             'estado': concepto.estado,
@@ -910,28 +529,11 @@ def get_cedula_conceptos(model_instance):
 
 
 def update_conceptos(conceptos, request):
-    data = []
-    for i in range(60):
-        estado = request.POST.get(f'estado-{i}') if request.POST.get(f'estado-{i}') != 'Selecciona una opción' else None
-        comentario = request.POST.get(f'comentario-{i}')
-        # Se actualizan los valores en la base de datos
-        try:
-            concepto = conceptos.get(celda=str(i))
-            concepto.estado = estado
-            concepto.comentario = comentario
-            concepto.save()
-        except ConceptoCedula.DoesNotExist:
-            pass
-        # Se preparan para la generación del archivo
-        data.append((estado, comentario))
-    conceptos_lista = ConceptosLista(
-        Conceptos=[Concepto(Estado=estado, Comentario=comentario) for estado, comentario in data]
-    )
-    return conceptos_lista
+    # Solo se escriben los conceptos que cambiaron y los valores enviados se usan para generar el archivo
+    return update_conceptos_cedula(conceptos_por_celda(conceptos), read_conceptos_form(request.POST))
 
 
 def get_supervision_data(kind, model_instance, fiscalizacion, request):
-    data = None
     fecha_str = request.POST.get('fecha')
     fecha = datetime.datetime.strptime(fecha_str, '%Y-%m-%d').strftime('%d/%m/%Y') if fecha_str else ''
     if fecha_str:
@@ -947,86 +549,26 @@ def get_supervision_data(kind, model_instance, fiscalizacion, request):
     titular = CedulaPersonal.objects.get(tipo_personal=2, id_cedula=model_instance.id_cedula).id_personal
     nombre_titular = f'{titular.id_persona.honorifico} {titular.id_persona.nombre} {titular.id_persona.apellido}'.upper()
     cargo_titular = f'{CargoPersonal.objects.get(id_personal=titular, id_tipo_cargo=6).nombre}'.upper()
-    if kind == 1:
-        materia = model_instance.id_materia.clave if model_instance.id_materia else None
-        programacion = model_instance.id_programacion.clave if model_instance.id_programacion else None
-        enfoque = model_instance.id_enfoque.clave if model_instance.id_enfoque else None
-        temporalidad = model_instance.id_temporalidad.clave if model_instance.id_temporalidad else None
-        data = SupervisionData(
-            OIC=str(
-                model_instance.id_actividad_fiscalizacion.id_oic.nombre)
-            if model_instance.id_actividad_fiscalizacion.id_oic.nombre else '',
-            Numero=f'A-{model_instance.numero}/{fiscalizacion.anyo}' if all(
-                [model_instance.numero, fiscalizacion.anyo]) else '',
-            Nombre=str(model_instance.denominacion) if model_instance.denominacion else '',
-            Fecha=fecha,
-            Clave=(
-                f'{materia}-{programacion}-{enfoque}-{temporalidad}'
-                if all(
-                    [model_instance.id_materia, model_instance.id_programacion,
-                     model_instance.id_enfoque, model_instance.id_temporalidad]) else ''),
-            Anyo_Trimestre=f'0{fiscalizacion.trimestre}/{fiscalizacion.anyo}' if fiscalizacion.trimestre else '',
-            Objetivo=model_instance.objetivo if model_instance.objetivo else '',
-            Area=model_instance.unidad if model_instance.unidad else '',
-            Ejercicio=model_instance.ejercicio if model_instance.ejercicio else '',
-            Nombre_Director=nombre_director,
-            Cargo_Director=cargo_director,
-            Nombre_Titular=nombre_titular,
-            Cargo_Titular=cargo_titular
-        )
-    elif kind == 2:
-        clave = 'R' if model_instance.id_tipo_intervencion.clave == 13 else (
-            'V' if model_instance.id_tipo_intervencion.clave == 14 else 'O')
-        data = SupervisionData(
-            OIC=str(
-                model_instance.id_actividad_fiscalizacion.id_oic.nombre)
-            if model_instance.id_actividad_fiscalizacion.id_oic.nombre else '',
-            Numero=f'{clave}-{model_instance.numero}/{fiscalizacion.anyo}',
-            Nombre=str(model_instance.denominacion) if model_instance.denominacion else '',
-            Fecha=fecha,
-            Clave=f'{model_instance.id_tipo_intervencion.clave}',
-            Anyo_Trimestre=f'0{fiscalizacion.trimestre}/{fiscalizacion.anyo}' if fiscalizacion.trimestre else '',
-            Objetivo=model_instance.objetivo if model_instance.objetivo else '',
-            Area=model_instance.unidad if model_instance.unidad else '',
-            Ejercicio=model_instance.ejercicio if model_instance.ejercicio else '',
-            Nombre_Director=nombre_director,
-            Cargo_Director=cargo_director,
-            Nombre_Titular=nombre_titular,
-            Cargo_Titular=cargo_titular
-        )
-    elif kind == 3:
-        tipo_revision = \
-            f'{model_instance.id_tipo_revision.clave if model_instance.id_tipo_revision else ""}'
-        programa_revision = \
-            f'{model_instance.id_programa_revision.clave if model_instance.id_programa_revision else ""}'
-        clave = f'{tipo_revision}-{programa_revision}' if tipo_revision and programa_revision \
-            else (f'{tipo_revision}' if tipo_revision else (f'{programa_revision}' if programa_revision else ''))
-        data = SupervisionData(
-            OIC=str(
-                model_instance.id_actividad_fiscalizacion.id_oic.nombre)
-            if model_instance.id_actividad_fiscalizacion.id_oic.nombre else '',
-            Numero=f'CI {model_instance.numero}/{fiscalizacion.anyo}',
-            Nombre=str(model_instance.denominacion) if model_instance.denominacion else '',
-            Fecha=fecha,
-            Clave=clave,
-            Anyo_Trimestre=f'0{fiscalizacion.trimestre}/{fiscalizacion.anyo}' if fiscalizacion.trimestre else '',
-            Objetivo=model_instance.objetivo if model_instance.objetivo else '',
-            Area=model_instance.area if model_instance.area else '',
-            Ejercicio=model_instance.ejercicio if model_instance.ejercicio else '',
-            Nombre_Director=nombre_director,
-            Cargo_Director=cargo_director,
-            Nombre_Titular=nombre_titular,
-            Cargo_Titular=cargo_titular
-        )
-    return data
+    return build_supervision_data(kind, model_instance, fiscalizacion, fecha, nombre_director, cargo_director,
+                                  nombre_titular, cargo_titular)
 
 
-def save_minuta_and_respond(file_path, model_instance):
-    archivo = model_instance.id_archivo
-    file_name = ''
-    if file_path:
-        file_name = os.path.basename(file_path)
-    if not archivo:
+def save_document_and_respond(buffer, file_name, media_dir, model_instance, error_message):
+    """
+        Guarda un documento generado en memoria si su contenido cambió, lo relaciona con su registro y lo envía
+        como descarga directamente desde memoria, sin volver a leerlo del disco.
+        :param buffer: Contenido del documento generado, o None si no se pudo generar.
+        :param file_name: Nombre del archivo.
+        :param media_dir: Carpeta dentro de media donde se guarda el documento.
+        :param model_instance: Cédula o minuta a la que pertenece el documento.
+        :param error_message: Mensaje de la respuesta si el documento no se pudo generar.
+        """
+    if buffer is None:
+        # Manejar el caso en el que no se haya generado el archivo
+        return HttpResponse(error_message, status=500)
+
+    file_path, _ = save_generated(buffer.getvalue(), media_dir, file_name)
+    if not model_instance.id_archivo:
         archivo = Archivo.objects.create(
             archivo=file_path,
             nombre=file_name
@@ -1034,44 +576,21 @@ def save_minuta_and_respond(file_path, model_instance):
         model_instance.id_archivo = archivo
         model_instance.save()
 
-    if file_path:
-        # Cargar el archivo y enviarlo como respuesta para descargar
-        with open(file_path, 'rb') as file:
-            response = HttpResponse(
-                file.read(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            file_name = os.path.basename(file_path)
-            response['Content-Disposition'] = f'attachment; filename="{file_name}"'
-            return response
-    else:
-        # Manejar el caso en el que no se haya generado el archivo
-        return HttpResponse("No se pudo generar la minuta.", status=500)
+    response = FileResponse(
+        buffer,
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+    return response
 
 
-def save_file_and_respond(file_path, model_instance, data):
-    archivo = model_instance.id_archivo
-    if not archivo:
-        archivo = Archivo.objects.create(
-            archivo=file_path,
-            nombre=f"Supervision - {data.Numero} - {data.OIC} - {data.Anyo_Trimestre}.xlsx"
-        )
-        model_instance.id_archivo = archivo
-        model_instance.save()
+def save_minuta_and_respond(buffer, model_instance, file_name):
+    return save_document_and_respond(buffer, file_name, 'minutas', model_instance, "No se pudo generar la minuta.")
 
-    if file_path:
-        # Cargar el archivo y enviarlo como respuesta para descargar
-        with open(file_path, 'rb') as file:
-            response = HttpResponse(
-                file.read(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            file_name = os.path.basename(file_path)
-            response['Content-Disposition'] = f'attachment; filename="{file_name}"'
-            return response
-    else:
-        # Manejar el caso en el que no se haya generado el archivo
-        return HttpResponse("No se pudo generar la cédula.", status=500)
+
+def save_file_and_respond(buffer, model_instance, data):
+    return save_document_and_respond(buffer, cedula_file_name(data), 'cedulas', model_instance,
+                                     "No se pudo generar la cédula.")
 
 
 @login_required
@@ -1116,8 +635,8 @@ def cedula_view(request, model, id_model):
         
         conceptos_lista = update_conceptos(conceptos, request)
         supervision_data = get_supervision_data(kind, model_instance, fiscalizacion, request)
-        file_path = create_cedula(kind=kind, data=supervision_data, conceptos=conceptos_lista)
-        return save_file_and_respond(file_path, cedula, supervision_data)
+        buffer = render_cedula_cached(kind=kind, data=supervision_data, conceptos=conceptos_lista)
+        return save_file_and_respond(buffer, cedula, supervision_data)
 
 
 def get_or_create_cedula_personal(cedula, tipo_personal, cargo_id, oic):
@@ -1139,6 +658,45 @@ def get_or_create_cedula_personal(cedula, tipo_personal, cargo_id, oic):
         )
     return cedula_personal
 
+def zip_response(chunks, file_name):
+    """
+        Envía un archivo zip que se construye mientras se envía.
+        :param chunks: Partes consecutivas del archivo zip.
+        :param file_name: Nombre del archivo zip.
+        """
+    response = StreamingHttpResponse(chunks, content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+    return response
+
+
+@login_required
+def cedulas_periodo_view(request, actividad_id):
+    fiscalizacion = get_object_or_404(ActividadFiscalizacion.objects.select_related('id_oic'), pk=actividad_id)
+    file_name = f'Cedulas - {fiscalizacion.id_oic.nombre if fiscalizacion.id_oic else ""} - ' \
+                f'0{fiscalizacion.trimestre}_{fiscalizacion.anyo}.zip'
+    return zip_response(cedulas_zip([fiscalizacion]), file_name.replace('/', '_'))
+
+
+@login_required
+def cedulas_trimestre_view(request, anyo, trimestre):
+    actividades = list(ActividadFiscalizacion.objects.filter(anyo=anyo, trimestre=trimestre)
+                       .select_related('id_oic').order_by('id_oic__nombre', 'pk'))
+    if not actividades:
+        raise Http404('No hay actividades de fiscalización en el periodo seleccionado.')
+    return zip_response(cedulas_zip(actividades), f'Cedulas - 0{trimestre}_{anyo}.zip')
+
+
+@login_required
+def minutas_trimestre_view(request, anyo, trimestre, mes):
+    if mes not in (1, 2, 3):
+        raise Http404('El mes de la minuta debe ser 1, 2 o 3.')
+    actividades = list(ActividadFiscalizacion.objects.filter(anyo=anyo, trimestre=trimestre)
+                       .select_related('id_oic__id_direccion').order_by('id_oic__nombre', 'pk'))
+    if not actividades:
+        raise Http404('No hay actividades de fiscalización en el periodo seleccionado.')
+    return zip_response(minutas_zip(load_minutas(actividades, mes)), f'Minutas - M{mes}T{trimestre} - {anyo}.zip')
+
+
 @login_required
 def auditoria_cedula_view(request, auditoria_id):
     return cedula_view(request, model=Auditoria, id_model=auditoria_id)
@@ -1163,98 +721,69 @@ def minuta_view(request, fiscalizacion_id):
     return render(request, 'minuta.html', context)
 
 
-def get_or_create_minuta_personal(minuta, tipo_personal, cargo_id, oic):
-    minuta_personal = MinutaPersonal.objects.filter(id_minuta=minuta, tipo_personal=tipo_personal).first()
-    if not minuta_personal:
-        cargo = TipoCargo.objects.filter(id=cargo_id).first()
-        if tipo_personal in [1, 2]:
-            direccion = oic.id_direccion.direccion
-            personal_actual = Personal.objects.filter(id_oic__id_direccion__direccion=direccion, estado=1,
-                                                      cargopersonal__id_tipo_cargo=cargo).first()
-        else:
-            personal_actual = Personal.objects.filter(id_oic=oic, estado=1, cargopersonal__id_tipo_cargo=cargo).first()
-        if not personal_actual:
-            return 'Error'
-        minuta_personal = MinutaPersonal.objects.create(
-            tipo_personal=tipo_personal,
-            id_minuta=minuta,
-            id_personal=personal_actual
-        )
-    return minuta_personal
-
-
-def get_personal_list(oic, cargo_id, minuta_personal):
-    personal_list = Personal.objects.filter(id_oic=oic, estado=1, cargopersonal__id_tipo_cargo=cargo_id)
-    if minuta_personal.id_personal.estado == 0:
-        personal_list = (personal_list | Personal.objects.filter(id=minuta_personal.id_personal.id)).distinct()
-    return personal_list
-
-
-def update_conceptos_minuta(request, conceptos, auditoria_band, control_band, intervencion_band):
-    estados = {
-        '0': 'Cumple',
-        '1': 'No cumple',
-        '2': 'No aplica',
-        '3': 'Pendiente'
-    }
+def update_conceptos_minuta(request, contexto):
+    """
+        Actualiza los conceptos de la minuta del mes 3 con los del formulario y obtiene los datos de revisión del
+        documento. Solo se guardan las secciones que cambiaron, con una sola actualización múltiple.
+        :param request: Solicitud con el formulario de la minuta.
+        :param contexto: MinutaContexto con las secciones de conceptos de la minuta.
+        """
+    cambiadas = []
 
-    def process_conceptos(conceptos_instance, prefix, count):
+    def process_conceptos(tipo, prefix, count):
         conceptos_list = []
+        guardados = []
         for i in range(1, count + 1):
             estado = request.POST.get(f'estado-{prefix}{i}') if request.POST.get(
                 f'estado-{prefix}{i}') != 'Selecciona una opción' else None
             comentario = request.POST.get(f'comentario-{prefix}{i}') if request.POST.get(
                 f'comentario-{prefix}{i}') else ''
-            # Se actualizan los valores en la base de datos
-            try:
-                concepto = conceptos_instance.get(clave=str(i))
-                concepto.estatus = estado
-                concepto.comentario = comentario
-                concepto.save()
-            except ConceptoMinuta.DoesNotExist:
-                pass
+            guardados.append([int(estado) if estado else None, comentario])
             # Se preparan para la generación del archivo
-            conceptos_list.append((estados.get(estado) if estado else '', comentario))
+            conceptos_list.append((ESTADOS_CONCEPTO.get(estado, '') if estado else '', comentario))
+        # Se actualiza la sección completa si alguno de sus conceptos cambió; los tipos sin sección se omiten
+        seccion = contexto.secciones.get(tipo)
+        if seccion is not None and seccion.pk is not None and seccion.conceptos != guardados:
+            seccion.conceptos = guardados
+            cambiadas.append(seccion)
         return None if not conceptos_list else conceptos_list
 
     # Procesar conceptos por tipo
-    auditoria_list = process_conceptos(conceptos.filter(tipo_concepto=1), 'A', 20) if auditoria_band else None
-    intervencion_list = process_conceptos(conceptos.filter(tipo_concepto=2), 'I', 25) if intervencion_band else None
-    control_list = process_conceptos(conceptos.filter(tipo_concepto=3), 'C', 23) if control_band else None
+    valores = {tipo: process_conceptos(tipo, prefix, count)
+               for tipo, prefix, count in TIPOS_CONCEPTO if tipo in contexto.tipos}
+    save_secciones(cambiadas)
 
     revision = create_revision(
-        auditoria_values=auditoria_list,
-        intervencion_values=intervencion_list,
-        control_interno_values=control_list
+        auditoria_values=valores.get(1),
+        intervencion_values=valores.get(2),
+        control_interno_values=valores.get(3)
     )
     return revision
 
 
-def limpiar_cadena(cadena):
-    patron_parentesis = r'\([^)]*\)'
-    cadena_sin_parentesis = re.sub(patron_parentesis, '', cadena)
-    cadena_limpia = re.sub(r'\s+', ' ', cadena_sin_parentesis).strip()
-    return cadena_limpia
-
-
-def update_data_minuta(request, minuta, mes, actividades):
-    # Se borra el anterior personal y se coloca uno nuevo
-    MinutaPersonal.objects.filter(id_minuta=minuta, tipo_personal=2).delete()
+def update_data_minuta(request, contexto):
+    """
+        Actualiza el personal y el horario de la minuta con los del formulario y obtiene los datos del documento.
+        :param request: Solicitud con el formulario de la minuta.
+        :param contexto: MinutaContexto de la minuta.
+        """
+    minuta = contexto.minuta
     id_judc = request.POST.get('JUDC', None)
-    judc = get_object_or_404(Personal, id=id_judc)
-    MinutaPersonal.objects.create(
-        tipo_personal=2,
-        id_minuta=minuta,
-        id_personal=judc
-    )
-    MinutaPersonal.objects.filter(id_minuta=minuta, tipo_personal=4).delete()
     id_personal = request.POST.get('personal', None)
-    personal = get_object_or_404(Personal, id=id_personal)
-    MinutaPersonal.objects.create(
-        tipo_personal=4,
-        id_minuta=minuta,
-        id_personal=personal
-    )
+    seleccion = {str(personal.pk): personal for personal in Personal.objects.filter(
+        pk__in=[value for value in (id_judc, id_personal) if value]).select_related('id_persona')}
+    judc = seleccion.get(str(id_judc))
+    personal = seleccion.get(str(id_personal))
+    if judc is None or personal is None:
+        raise Http404('No se encontró el personal seleccionado.')
+
+    # Se borra el anterior personal y se coloca uno nuevo
+    with transaction.atomic():
+        MinutaPersonal.objects.filter(id_minuta=minuta, tipo_personal__in=[2, 4]).delete()
+        MinutaPersonal.objects.bulk_create([
+            MinutaPersonal(tipo_personal=2, id_minuta=minuta, id_personal=judc),
+            MinutaPersonal(tipo_personal=4, id_minuta=minuta, id_personal=personal)
+        ])
     inicio_str = request.POST.get("inicio")
     fin_str = request.POST.get("fin")
     time_inicio = timezone.make_aware(datetime.datetime.strptime(inicio_str, "%Y-%m-%dT%H:%M"))
@@ -1265,257 +794,91 @@ def update_data_minuta(request, minuta, mes, actividades):
         minuta.fin = time_fin
     minuta.save()
     # Una vez ya teniendo actualizados los datos de la minuta, preparamos los datos para la generacion del archivo
-    director = MinutaPersonal.objects.get(id_minuta=minuta, tipo_personal=1).id_personal
-    titular = MinutaPersonal.objects.get(id_minuta=minuta, tipo_personal=3).id_personal
-    fiscalizacion = minuta.id_actividad_fiscalizacion
-    # Se acomodan de acuerdo a la documentacion
-    meses_word = {
-        1: "enero", 2: "febrero", 3: "marzo", 4: "abril", 5: "mayo", 6: "junio", 7: "julio", 8: "agosto",
-        9: "septiembre", 10: "octubre", 11: "noviembre", 12: "diciembre"
-    }
-    posicion_word = {
-        1: 'primer',
-        2: 'segundo',
-        3: 'tercer',
-        4: 'cuarto'
-    }
-
-    lista_actividades, text_numero_actividades = get_actividades_lista(actividades)
-
-    data = [
-        num2words(time_inicio.hour, lang='es'),  # P01
-        num2words(time_inicio.day, lang='es'),  # P02
-        meses_word.get(time_inicio.month),  # P03
-        num2words(time_inicio.year, lang='es'),  # P04
-        "el/la",  # P05
-        director.id_persona.honorifico,  # P06
-        f'{director.id_persona.nombre} {director.id_persona.apellido}',  # P07
-        CargoPersonal.objects.get(id_personal=director).nombre,  # P08
-        "el/la",  # P09
-        judc.id_persona.honorifico,  # P10
-        f'{judc.id_persona.nombre} {judc.id_persona.apellido}',  # P11
-        CargoPersonal.objects.get(id_personal=judc).nombre,  # P12
-        "el/la",  # P13
-        titular.id_persona.honorifico,  # P14
-        f'{titular.id_persona.nombre} {titular.id_persona.apellido}',  # P15
-        CargoPersonal.objects.get(id_personal=titular).nombre,  # P16
-        "el/la",  # P17
-        personal.id_persona.honorifico,  # P18
-        f'{personal.id_persona.nombre} {personal.id_persona.apellido}',  # P19
-        CargoPersonal.objects.get(id_personal=personal).nombre,  # P20
-        num2words(mes, lang='es'),  # P21
-        posicion_word.get(fiscalizacion.trimestre),  # P22
-        num2words(fiscalizacion.anyo if fiscalizacion.anyo else 0, lang='es'),  # P23
-        limpiar_cadena(fiscalizacion.id_oic.nombre),  # P24
-        text_numero_actividades,  # P25
-        lista_actividades,  # P26
-        num2words(time_fin.hour, lang='es'),  # P27
-        num2words(time_fin.day, lang='es').upper(),  # P28
-        meses_word.get(time_fin.month).upper(),  # P29
-        time_fin.year  # P30
-    ]
-
-    # Caso de mes 1 y 2
-    if mes == 1:
-        data.append('DOCUMENTACIÓN')  # P31
-        data.append('la documentacion')  # P32
-    elif mes == 2:
-        data.append('PAPELES DE TRABAJO')  # P31
-        data.append('los papeles de trabajo')  # P32
-    elif mes == 3:
-        # P31 y P32 no existen en el mes 3
-        data.append('')
-        data.append('')
-
-    data.append(limpiar_cadena(fiscalizacion.id_oic.nombre).upper()) # P33
-    data.append(minuta.id_actividad_fiscalizacion.id_oic.id_direccion.direccion) # P34
-
-    return data
-
-
-def get_actividades_lista(actividades):
-    lista_actividades = ''
-    numero_actividades = len(actividades)
-    for n in range(numero_actividades):
-        tipo = actividades[n].tipo
-        denominacion = actividades[n].denominacion
-        numero = actividades[n].numero
-        articulo = "el" if tipo == "control interno" else "la"
-        articulo_final = "o" if tipo == "control interno" else "a"
-        lista_actividades += f"{articulo} {tipo} número {numero} denominad{articulo_final} {denominacion}"
-        if n == numero_actividades - 2:
-            lista_actividades += " y "
-        elif n < numero_actividades - 2:
-            lista_actividades += ", "
-    lista_actividades += " misma"
-    if numero_actividades > 1:
-        lista_actividades += "s que se ejecutan"
-    else:
-        lista_actividades += " que se ejecuta"
-    text_numero_actividades = 'está'
-    if numero_actividades > 1:
-        text_numero_actividades += 'n'
-        numero_text = num2words(numero_actividades, lang='es')
-    else:
-        numero_text = 'una'
-    text_numero_actividades += f' ejecutando {numero_text} actividad'
-    if numero_actividades > 1:
-        text_numero_actividades += 'es'
-    return lista_actividades, text_numero_actividades
+    firmantes = dict(contexto.firmantes)
+    firmantes[2] = judc
+    firmantes[4] = personal
+    cargos = {}
+    query = CargoPersonal.objects.filter(id_personal__in=[personal_minuta.pk for personal_minuta in firmantes.values()])
+    for cargo in query.order_by('pk'):
+        cargos.setdefault(cargo.id_personal_id, cargo.nombre)
+    return build_minuta_data(contexto.fiscalizacion, minuta, contexto.mes, contexto.actividades, firmantes, cargos)
 
 
 @login_required
 def minuta_mes_view(request, fiscalizacion_id, mes):
-    fiscalizacion = get_object_or_404(ActividadFiscalizacion, pk=fiscalizacion_id)
-    auditoria = Auditoria.objects.filter(id_actividad_fiscalizacion=fiscalizacion, estado=1)
-    intervencion = Intervencion.objects.filter(id_actividad_fiscalizacion=fiscalizacion)
-    control_interno = ControlInterno.objects.filter(id_actividad_fiscalizacion=fiscalizacion)
-    oic = fiscalizacion.id_oic
-    auditoria_band = auditoria.first() is not None
-    intervencion_band = intervencion.first() is not None
-    control_band = control_interno.first() is not None
-    if not auditoria_band and not intervencion_band and not control_band:
+    fiscalizacion = get_object_or_404(ActividadFiscalizacion.objects.select_related('id_oic__id_direccion'),
+                                      pk=fiscalizacion_id)
+    contexto = load_minuta_contexto(fiscalizacion, mes)
+    if contexto is None:
         messages.error(request, 'Hubo un error en la creación de la minuta, no hay actividades de fiscalización activas del periodo seleccionado.')
         return redirect('home')
 
-    minuta = Minuta.objects.filter(id_actividad_fiscalizacion=fiscalizacion, mes=mes).first()
-    if not minuta:
-        minuta = Minuta.objects.create(
-            inicio=None,
-            fin=None,
-            id_actividad_fiscalizacion=fiscalizacion,
-            id_archivo=None,
-            mes=mes
-        )
-
-    actividades = get_actividades(auditoria, intervencion, control_interno)
-    trimestre_opts = {1: 'primer', 2: 'segundo', 3: 'tercer', 4: 'cuarto'}
-    trimestre_word = trimestre_opts.get(fiscalizacion.trimestre)
+    oic = fiscalizacion.id_oic
+    minuta = contexto.minuta
+    firmantes = contexto.firmantes
+    if any(tipo in FIRMANTES_DIRECCION for tipo in contexto.faltantes):
+        messages.error(request,
+                       'Hubo un error con el personal de la dirección, verifica que estos estén registrados '
+                       'correctamente.')
+        return redirect('personal_direccion', oic.id_direccion.direccion)
+    if contexto.faltantes:
+        messages.error(request,
+                       'Hubo un error con el personal del OIC, verifica que estos esten registrados correctamente.')
+        return redirect('personal_oic', oic.id)
+
+    trimestre_word = POSICION_WORD.get(fiscalizacion.trimestre)
     anyo = fiscalizacion.anyo
 
     if request.method == 'POST':
         # Actualizar la minuta con los datos del formulario
-        data = update_data_minuta(request, minuta, mes, actividades)
+        data = update_data_minuta(request, contexto)
         revision = None
         kind = True
         if mes == 3:
             kind = False
-            conceptos, _ = get_minuta_conceptos(minuta)
-            revision = update_conceptos_minuta(request, conceptos, auditoria_band, control_band, intervencion_band)
-        output_path = create_minuta_doc(
+            revision = update_conceptos_minuta(request, contexto)
+        buffer = render_minuta_cached(
             data=data,
             kind=kind,
+            revision=revision
+        )
+        file_name = minuta_file_name(
             oic=fiscalizacion.id_oic.nombre,
             mes=mes,
             trimestre=str(fiscalizacion.trimestre),
-            anyo=str(anyo),
-            revision=revision
+            anyo=str(anyo)
         )
-        return save_minuta_and_respond(output_path, minuta)
+        return save_minuta_and_respond(buffer, minuta, file_name)
 
     else:
         minuta_inicio = minuta.inicio if minuta.inicio else datetime.datetime.now()
         minuta_fin = minuta.fin if minuta.fin else datetime.datetime.now()
 
-        minuta_director = get_or_create_minuta_personal(minuta, 1, 1, oic)
-        minuta_judc = get_or_create_minuta_personal(minuta, 2, 2, oic)
-        minuta_titular = get_or_create_minuta_personal(minuta, 3, 6, oic)
-        minuta_personaloic = get_or_create_minuta_personal(minuta, 4, 7, oic)
-        if minuta_director == 'Error' or minuta_judc == 'Error':
-            messages.error(request,
-                           'Hubo un error con el personal de la dirección, verifica que estos estén registrados '
-                           'correctamente.')
-            return redirect('personal_direccion', oic.id_direccion.direccion)
-        if minuta_titular == 'Error' or minuta_personaloic == 'Error':
-            messages.error(request,
-                           'Hubo un error con el personal del OIC, verifica que estos esten registrados correctamente.')
-            return redirect('personal_oic', oic.id)
-        judc = get_personal_list(Oic.objects.get(nombre=oic.id_direccion.direccion), 2, minuta_judc)
-        personal = get_personal_list(oic, 7, minuta_personaloic)
-
         context = {
             'mes': mes,
-            'actividades': actividades,
+            'actividades': contexto.actividades,
             'oic': fiscalizacion.id_oic.nombre,
             'trimestre_word': trimestre_word,
             'anyo': anyo,
-            'director': minuta_director.id_personal.id_persona,
-            'titular': minuta_titular.id_personal.id_persona,
-            'JUDC_actual': minuta_judc.id_personal.id_persona,
-            'personal_actual': minuta_personaloic.id_personal.id_persona,
-            'JUDC': judc,
-            'personal': personal,
+            'director': firmantes[1].id_persona,
+            'titular': firmantes[3].id_persona,
+            'JUDC_actual': firmantes[2].id_persona,
+            'personal_actual': firmantes[4].id_persona,
+            'JUDC': contexto.judc,
+            'personal': contexto.personal,
             'minuta_inicio': minuta_inicio,
             'minuta_fin': minuta_fin,
-            'auditoria_band': auditoria_band,
-            'intervencion_band': intervencion_band,
-            'control_band': control_band
+            'auditoria_band': 1 in contexto.tipos,
+            'intervencion_band': 2 in contexto.tipos,
+            'control_band': 3 in contexto.tipos
         }
 
         if mes == 3:
-            _, conceptos_dic = get_minuta_conceptos(minuta)
-            # Crea conceptos si no los hay y los agrega al dict de ser necesario
-            band = False
-            # Si no hay conceptos de la actividad de fiscalizacion se necesitan crearlos
-            if auditoria_band:
-                if conceptos_dic.get('Auditoria') == {}:
-                    band = True
-                    for i in range(1, 21):
-                        ConceptoMinuta.objects.create(
-                            clave=str(i),
-                            estatus=None,
-                            comentario=None,
-                            tipo_concepto=1,
-                            id_minuta=minuta
-                        )
-            if intervencion_band:
-                if conceptos_dic.get('Intervención') == {}:
-                    band = True
-                    for i in range(1, 26):
-                        ConceptoMinuta.objects.create(
-                            clave=str(i),
-                            estatus=None,
-                            comentario=None,
-                            tipo_concepto=2,
-                            id_minuta=minuta
-                        )
-            if control_band:
-                if conceptos_dic.get('Control') == {}:
-                    band = True
-                    for i in range(1, 24):
-                        ConceptoMinuta.objects.create(
-                            clave=str(i),
-                            estatus=None,
-                            comentario=None,
-                            tipo_concepto=3,
-                            id_minuta=minuta
-                        )
-            # Se reescriben en caso de que se hayan generado nuevos conceptos
-            if band:
-                _, conceptos_dic = get_minuta_conceptos(minuta)
-            context.update({'conceptos': conceptos_dic})
+            context.update({'conceptos': contexto.conceptos_dict()})
         context.update({'archivo': minuta.id_archivo})
         return render(request, 'minuta_mes.html', context)
 
 
-def get_minuta_conceptos(minuta):
-    conceptos = ConceptoMinuta.objects.filter(id_minuta=minuta.id)
-    conceptos_dict = {
-        'Auditoria': {},
-        'Intervención': {},
-        'Control': {}
-    }
-    for concepto in conceptos:
-        tipo = dict(ConceptoMinuta.TIPO_CHOICES).get(concepto.tipo_concepto)
-        if tipo:
-            conceptos_dict[tipo][concepto.clave] = {
-                'estado': concepto.estatus,
-                'comentario': concepto.comentario if concepto.comentario is not None else ''
-            }
-
-    return conceptos, conceptos_dict
-
-
 @login_required
 def perfil_view(request):
     if request.method == 'POST':
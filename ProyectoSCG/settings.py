@@ -162,4 +162,14 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Número de procesos para extraer los archivos subidos (PAA, PACI, PINT, IMC); None usa hasta 4 núcleos
+PARSE_WORKERS = None
+
+# Caché en disco de los resultados de extracción de archivos idénticos; None la desactiva
+PARSE_CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'extracciones')
+PARSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Caché en disco de las cédulas y minutas generadas a partir de los mismos datos; None la desactiva
+DOCUMENT_CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'documentos')
+DOCUMENT_CACHE_MAX_BYTES = 512 * 1024 * 1024